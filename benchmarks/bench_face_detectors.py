@@ -0,0 +1,154 @@
+"""
+Benchmark face detectors: ms/frame and recall on a labelled sample set
+
+The sample set is the bundled guest photos in tests/benchmarks/data (boxes
+in faces.json) plus generated 720p frames of the synthetic guest at several
+sizes, positions, head tilts (up to 30°) and lighting levels. A labelled
+face counts as found when a detection's center falls inside its box;
+detections matching no face are counted as false positives.
+
+The YuNet detector needs face_detection_yunet_2023mar.onnx from the OpenCV
+model zoo at `ai.face_detection_model` (or --model); it is skipped otherwise.
+
+Usage: python benchmarks/bench_face_detectors.py [--backends haar,yunet] [--model PATH]
+           [--repeat 3] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from src.ai.face_detection import DEFAULT_DNN_MODEL, DnnFaceDetector, HaarFaceDetector  # noqa: E402
+from src.camera.sources import draw_face  # noqa: E402
+from src.utils.config import get_settings  # noqa: E402
+
+DATA_DIR = ROOT / "tests" / "benchmarks" / "data"
+
+
+def bundled_samples():
+    with open(DATA_DIR / "faces.json", 'r', encoding='utf-8') as f:
+        labels = json.load(f)
+    return [(name, cv2.imread(str(DATA_DIR / name)), [tuple(box) for box in boxes])
+            for name, boxes in labels.items()]
+
+
+def synthetic_samples(width=1280, height=720):
+    """The synthetic guest, tilted and scaled like real guests lean into the guide"""
+    rng = np.random.default_rng(7)
+    gradient = np.linspace(70, 180, width, dtype=np.uint8)
+    background = np.dstack([np.tile(gradient, (height, 1))] * 3)
+    background[..., 0] = 140
+
+    samples = []
+    for size in (140, 200, 280):
+        for angle in (0, 15, -15, 30, -30):
+            for light in (1.0, 0.55):
+                cx = int(width * rng.uniform(0.35, 0.65))
+                cy = int(height * rng.uniform(0.4, 0.6))
+                frame = draw_face(background.copy(), cx, cy, size)
+                if angle:
+                    rotation = cv2.getRotationMatrix2D((cx, cy), angle, 1.0)
+                    frame = cv2.warpAffine(frame, rotation, (width, height),
+                                           borderMode=cv2.BORDER_REPLICATE)
+                if light != 1.0:
+                    frame = cv2.convertScaleAbs(frame, alpha=light)
+                noise = rng.integers(0, 10, frame.shape, dtype=np.uint8)
+                frame = cv2.add(frame, noise)
+                box = (cx - size // 2, cy - int(size * 0.7), size, int(size * 1.4))
+                samples.append((f"synthetic_{size}px_{angle:+d}deg_{light:.2f}", frame, [box]))
+    return samples
+
+
+def match(detections, labels):
+    """(found, false positives): a label is found by a detection centered inside it"""
+    found = set()
+    false_positives = 0
+    for (x, y, w, h) in detections:
+        cx, cy = x + w / 2, y + h / 2
+        hits = [i for i, (lx, ly, lw, lh) in enumerate(labels)
+                if lx <= cx <= lx + lw and ly <= cy <= ly + lh and i not in found]
+        if hits:
+            found.add(hits[0])
+        else:
+            false_positives += 1
+    return len(found), false_positives
+
+
+def run(detector, samples, repeat):
+    times, found, total, false_positives = [], 0, 0, 0
+    missed = []
+    detector.detect(samples[0][1])  # Warm up
+    for name, frame, labels in samples:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            detections = detector.detect(frame, gray)
+            times.append(time.perf_counter() - started)
+        hit, fp = match(detections, labels)
+        found += hit
+        total += len(labels)
+        false_positives += fp
+        if hit < len(labels):
+            missed.append(name)
+
+    return {
+        'ms_p50': round(statistics.median(times) * 1000, 2),
+        'ms_max': round(max(times) * 1000, 2),
+        'recall': round(found / total, 3),
+        'found': found,
+        'faces': total,
+        'false_positives': false_positives,
+        'missed': missed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--backends', default='haar,yunet')
+    parser.add_argument('--model', default=get_settings().get('ai.face_detection_model',
+                                                              DEFAULT_DNN_MODEL))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    samples = bundled_samples() + synthetic_samples()
+    faces = sum(len(labels) for _, _, labels in samples)
+    print(f"📊 {len(samples)} frames, {faces} labelled faces (720p)")
+    print(f"  {'detector':<10} {'p50 ms':>8} {'max ms':>8} {'recall':>8} {'false +':>8}")
+
+    results = {}
+    for backend in args.backends.split(','):
+        backend = backend.strip()
+        if backend == 'haar':
+            detector = HaarFaceDetector()
+        elif backend == 'yunet':
+            if not os.path.exists(args.model):
+                print(f"  {backend:<10} skipped: model {args.model} not found")
+                continue
+            detector = DnnFaceDetector(args.model)
+        else:
+            parser.error(f"unknown backend {backend}")
+
+        result = results[backend] = run(detector, samples, args.repeat)
+        print(f"  {backend:<10} {result['ms_p50']:8.2f} {result['ms_max']:8.2f} "
+              f"{result['recall']:8.1%} {result['false_positives']:8d}")
+        if result['missed']:
+            print(f"    missed: {', '.join(result['missed'])}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
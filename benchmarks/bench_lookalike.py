@@ -0,0 +1,63 @@
+"""
+Benchmark lookalike search on a large synthetic embedding index
+
+Usage: python benchmarks/bench_lookalike.py [--players 50000] [--dim 128] [--queries 500]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.ai.face_embedding import EmbeddingIndex
+
+
+def time_queries(label, index, queries, **kwargs):
+    index.search(queries[0], **kwargs)  # Touch the mapped pages once
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings = np.array(timings)
+    print(f"  {label:<30} p50 {np.percentile(timings, 50):6.2f} ms"
+          f"   p99 {np.percentile(timings, 99):6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=50000)
+    parser.add_argument('--dim', type=int, default=128)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.players, args.dim)).astype(np.float32)
+    embeddings = [(i + 1, 'male' if i % 2 == 0 else 'female', vectors[i])
+                  for i in range(args.players)]
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    recent = set(range(1, 51))
+
+    print(f"📊 Index: {args.players} players x {args.dim} dims, {args.queries} queries")
+    start = time.perf_counter()
+    index = EmbeddingIndex.build(embeddings)
+    print(f"  {'build':<30} {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = Path(tmp) / "player_embeddings"
+        index.save(prefix)
+        mapped = EmbeddingIndex.load(prefix, mmap=True)
+
+        time_queries("in-memory, top-1", index, queries)
+        time_queries("mmap, top-1", mapped, queries)
+        time_queries("mmap, gender filter", mapped, queries, gender='female')
+        time_queries("mmap, top-5 skipping 50 recent", mapped, queries, k=5, exclude_ids=recent)
+        del mapped
+
+
+if __name__ == "__main__":
+    main()
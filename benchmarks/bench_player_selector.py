@@ -0,0 +1,104 @@
+"""
+Benchmark PlayerSelector.select_player and stat generation on a large synthetic roster
+
+Usage: python benchmarks/bench_player_selector.py [--players 50000] [--picks 20000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.player_selector import PlayerSelector
+
+POSITIONS = ['ST', 'RW', 'LW', 'CAM', 'CM', 'CDM', 'CB', 'LB', 'RB', 'GK']
+CLUBS = [f"Club {i}" for i in range(200)]
+
+
+def make_roster(count, seed=0):
+    rng = random.Random(seed)
+    data = {'male_players': [], 'female_players': []}
+    for i in range(count):
+        key = 'male_players' if i % 2 == 0 else 'female_players'
+        data[key].append({
+            'id': i + 1,
+            'name': f"Player {i + 1}",
+            'position': rng.choice(POSITIONS),
+            'country': 'Uzbekistan',
+            'club': rng.choice(CLUBS),
+            'base_stats': {s: rng.randint(40, 95) for s in ('PAC', 'SHO', 'PAS', 'DRI', 'DEF', 'PHY')},
+            'image': 'default.png'
+        })
+    return data
+
+
+def legacy_select(players_data, history, gender):
+    """The pre-index algorithm, kept for comparison"""
+    if gender == 'male':
+        pool = players_data['male_players']
+    elif gender == 'female':
+        pool = players_data['female_players']
+    else:
+        pool = players_data['male_players'] + players_data['female_players']
+    available = [p for p in pool if p['id'] not in history]
+    if not available:
+        available = pool
+        history.clear()
+    selected = random.choice(available)
+    history.append(selected['id'])
+    if len(history) > 50:
+        history.pop(0)
+    return selected
+
+
+def time_picks(label, pick, picks):
+    genders = ['male', 'female', 'unknown']
+    start = time.perf_counter()
+    for i in range(picks):
+        pick(genders[i % 3])
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed / picks * 1e6:10.2f} µs/pick")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=50000)
+    parser.add_argument('--picks', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"📊 Roster: {args.players} players, {args.picks} picks")
+    data = make_roster(args.players)
+
+    start = time.perf_counter()
+    uniform = PlayerSelector(players_data=data, seed=1)
+    print(f"  {'index build (uniform)':<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    start = time.perf_counter()
+    by_rating = PlayerSelector(players_data=data, weight_by='rating', seed=1)
+    print(f"  {'index build (rating)':<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+    time_picks("indexed uniform", uniform.select_player, args.picks)
+    time_picks("indexed rating-weighted", by_rating.select_player, args.picks)
+    time_picks("indexed by position", lambda g: uniform.select_player(g, position='GK'), args.picks)
+
+    history = []
+    legacy_picks = max(1, args.picks // 20)
+    time_picks("legacy list scan", lambda g: legacy_select(data, history, g), legacy_picks)
+
+    print(f"\n📊 Stat generation for {args.players} cards")
+    base_stats = [p['base_stats'] for p in uniform.players]
+    start = time.perf_counter()
+    for stats in base_stats:
+        uniform.generate_stats(stats)
+    print(f"  {'generate_stats loop':<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    start = time.perf_counter()
+    uniform.generate_stats_batch(base_stats, seed=1)
+    print(f"  {'generate_stats_batch dicts':<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    start = time.perf_counter()
+    uniform.generate_stats_batch(base_stats, seed=1, as_arrays=True)
+    print(f"  {'generate_stats_batch arrays':<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
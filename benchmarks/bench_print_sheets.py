@@ -0,0 +1,79 @@
+"""
+Benchmark print throughput (sheets/minute) per layout using the file-sink printer
+
+Usage: python benchmarks/bench_print_sheets.py [--cards 24] [--format png|bmp]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.print_layout import PrintRasterCache, get_layout
+from src.utils.printer import FileSinkPrinterBackend, PrintJob, PrintSpooler
+
+
+class FastSinkBackend(FileSinkPrinterBackend):
+    """File sink that can skip PNG compression so the layout work dominates"""
+
+    def __init__(self, directory, fmt):
+        super().__init__(directory)
+        self.fmt = fmt
+
+    def print_image(self, image, job_name, copies=1):
+        for copy in range(copies):
+            image.save(self.directory / f"{job_name}_{copy + 1}.{self.fmt}", self.fmt.upper())
+            self.pages_printed += 1
+
+
+def make_cards(directory, count):
+    paths = []
+    for i in range(count):
+        card = Image.new("RGB", (1200, 1800), (200, 30 + i * 7 % 200, 40))
+        draw = ImageDraw.Draw(card)
+        draw.ellipse([300, 300, 900, 900], fill=(240, 200, 160))
+        draw.text((100, 1500), f"CARD {i + 1}", fill="white")
+        path = Path(directory) / f"card_{i + 1}.png"
+        card.save(path)
+        paths.append(str(path))
+    return paths
+
+
+def run(label, spooler, jobs):
+    start = time.perf_counter()
+    for job in jobs:
+        spooler._process(job)  # Run inline so the timing is exact
+    elapsed = time.perf_counter() - start
+    failed = [job for job in jobs if job.status != PrintJob.DONE]
+    print(f"  {label:<34} {len(jobs) / elapsed * 60:8.1f} sheets/min"
+          f"   ({elapsed / len(jobs) * 1000:7.1f} ms/sheet){'  FAILED' if failed else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--cards', type=int, default=24)
+    parser.add_argument('--format', choices=['png', 'bmp'], default='bmp')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cards = make_cards(tmp, args.cards)
+        backend = FastSinkBackend(Path(tmp) / "printed", args.format)
+        print(f"📊 {args.cards} cards, file sink writing {args.format.upper()}")
+
+        for name in ('single_a5', 'a4_4up', 'a4_4up_cut', 'a4_9up_cut'):
+            layout = get_layout(name)
+            # Room for every card at A5 so the reprint pass is fully cached
+            spooler = PrintSpooler(backend, raster_cache=PrintRasterCache(max_mb=args.cards * 16))
+            sheets = [cards[i:i + layout.slots] for i in range(0, len(cards), layout.slots)]
+
+            run(f"{name} cold cache", spooler, [PrintJob(s, layout=layout) for s in sheets])
+            run(f"{name} reprint (cached)", spooler, [PrintJob(s, layout=layout) for s in sheets])
+            spooler.stop()
+
+
+if __name__ == "__main__":
+    main()
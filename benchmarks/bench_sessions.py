@@ -0,0 +1,227 @@
+"""
+End-to-end session throughput: drives KioskWindow offscreen with a virtual camera
+
+Each session scripts what a guest does: tap start, stand in the guide until
+auto-capture fires, tap a gender, wait for the card, (optionally print) and
+tap finish. Reports sessions/hour, time spent per screen and RSS growth.
+
+Usage: python benchmarks/bench_sessions.py [--sessions 20] [--source synthetic|replay]
+           [--replay PATH] [--tap-delay 0.5] [--print] [--overlap] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from PySide6.QtCore import QCoreApplication, QObject, Qt, QTimer  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from src.utils.config import get_settings  # noqa: E402
+from src.utils.logger import setup_logger  # noqa: E402
+from src.utils.memory import rss_mb  # noqa: E402
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class SessionDriver(QObject):
+    """Polls the window's current screen and plays the guests' part"""
+
+    def __init__(self, window, sessions, tap_delay=0.5, print_cards=False, timeout=60.0):
+        super().__init__()
+        self.window = window
+        self.sessions = sessions
+        self.tap_delay = tap_delay
+        self.print_cards = print_cards
+        self.timeout = timeout
+
+        self.completed = []  # Seconds from tapping start to tapping finish
+        self.visits = {}  # screen -> seconds per visit
+        self.memory = []  # (sessions done, rss_mb)
+        self.started_sessions = 0
+        self.timed_out = False
+        # With overlapped sessions cards come back in capture order
+        self._starts = deque()
+        self._screen = None
+        self._view = None
+        self._entered = 0.0
+        self._acted = False
+        self._card_seen = False
+        self._last_progress = 0.0
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.step)
+
+    def start(self):
+        self.memory.append((0, rss_mb()))
+        self.started = self._last_progress = time.perf_counter()
+        self.timer.start(5)
+
+    def screen_name(self):
+        w = self.window
+        return {
+            id(w.home_screen): 'home',
+            id(w.camera_screen): 'camera',
+            id(w.gender_screen): 'gender',
+            id(w.processing_screen): 'processing',
+            id(w.result_screen): 'result',
+        }.get(id(w.stacked_widget.currentWidget()), 'other')
+
+    def step(self):
+        now = time.perf_counter()
+        screen = self.screen_name()
+        # A queued card can replace the previous one without leaving the result screen
+        view = (screen, id(self.window.card_paths))
+        if view != self._view:
+            if self._screen is not None:
+                self.visits.setdefault(self._screen, []).append(now - self._entered)
+            self._view, self._screen, self._entered, self._acted = view, screen, now, False
+            self._card_seen = False
+            self._last_progress = now
+
+        if len(self.completed) >= self.sessions or now - self._last_progress > self.timeout:
+            self.timed_out = len(self.completed) < self.sessions
+            if self.timed_out:
+                print(f"  ⚠️ no progress for {self.timeout:.0f} s on '{screen}', stopping")
+            self.timer.stop()
+            QApplication.instance().quit()
+            return
+
+        if self._acted:
+            return
+        w = self.window
+        if screen == 'home':
+            if self.started_sessions < self.sessions:
+                self._acted = True
+                self.started_sessions += 1
+                self._starts.append(now)
+                w.start_btn.click()
+        elif screen == 'gender' and now - self._entered >= self.tap_delay:
+            self._acted = True
+            (w.male_btn if self.started_sessions % 2 else w.female_btn).click()
+        elif screen == 'result' and w._card_load_started is None:
+            # Card is on screen: the guest looks at it, maybe prints, then finishes
+            if not self._card_seen:
+                self._card_seen = True
+                self.visits.setdefault('result_load', []).append(now - self._entered)
+            if now - self._entered >= self.tap_delay:
+                self._acted = True
+                if self.print_cards:
+                    w.print_btn.click()
+                self._finish_session(now)
+                w.finish_btn.click()
+
+    def _finish_session(self, now):
+        total = now - self._starts.popleft()
+        self.completed.append(total)
+        self.memory.append((len(self.completed), rss_mb()))
+        print(f"  session {len(self.completed):>3}: {total:6.2f} s   "
+              f"rss {self.memory[-1][1]:7.1f} MB")
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        sessions = len(self.completed)
+        summary = {
+            'sessions': sessions,
+            'timed_out': self.timed_out,
+            'elapsed_s': round(elapsed, 2),
+            'sessions_per_hour': round(sessions / elapsed * 3600, 1) if elapsed else 0.0,
+            'screens': {},
+            'memory_mb': [(n, round(mb, 1)) for n, mb in self.memory],
+        }
+        print(f"\n📊 {sessions} sessions in {elapsed:.1f} s "
+              f"→ {summary['sessions_per_hour']:.0f} sessions/hour")
+        print(f"  {'screen':<12} {'p50 s':>8} {'p95 s':>8} {'max s':>8}")
+        rows = dict(self.visits, total=self.completed)
+        for screen in ('camera', 'gender', 'processing', 'result_load', 'result', 'total'):
+            values = rows.get(screen)
+            if not values:
+                continue
+            summary['screens'][screen] = {
+                'p50': round(statistics.median(values), 3),
+                'p95': round(percentile(values, 0.95), 3),
+                'max': round(max(values), 3),
+            }
+            row = summary['screens'][screen]
+            print(f"  {screen:<12} {row['p50']:8.3f} {row['p95']:8.3f} {row['max']:8.3f}")
+
+        if len(self.memory) > 2:
+            first, last = self.memory[1][1], self.memory[-1][1]  # Skip warm-up growth
+            per_session = (last - first) / max(1, len(self.memory) - 2)
+            summary['rss_growth_mb_per_session'] = round(per_session, 3)
+            print(f"  rss {self.memory[0][1]:.1f} → {last:.1f} MB "
+                  f"({per_session:+.2f} MB/session after the first)")
+        return summary
+
+
+def configure(args):
+    """Point the app at a virtual camera and keep background jobs out of the timing"""
+    data = get_settings().data
+    camera = data.setdefault('camera', {})
+    camera['source'] = args.source
+    if args.replay:
+        camera['replay_path'] = args.replay
+    data.setdefault('printing', {})['backend'] = 'file'
+    data.setdefault('export', {})['auto_sync'] = False
+    data.setdefault('telemetry', {})['http_port'] = 0
+    data.setdefault('session', {})['overlap'] = args.overlap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--source', choices=['synthetic', 'replay'], default='synthetic')
+    parser.add_argument('--replay', help="Video or image sequence for --source replay")
+    parser.add_argument('--tap-delay', type=float, default=0.5,
+                        help="Seconds a guest takes to tap gender and finish")
+    parser.add_argument('--print', dest='print_cards', action='store_true')
+    parser.add_argument('--overlap', action='store_true',
+                        help="Render cards in the background while the next guest captures")
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--json', help="Also write the summary to this file")
+    args = parser.parse_args()
+
+    setup_logger()
+    configure(args)
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv)
+
+    from src.ui.kiosk_window import KioskWindow
+
+    window = KioskWindow()
+    window.show()
+    window._start_warmup()
+    # Let warm-up finish so the first session isn't measuring model loading
+    deadline = time.perf_counter() + 120
+    while not all(window.warmup.is_ready(name) for name in window.warmup.futures):
+        app.processEvents()
+        time.sleep(0.01)
+        if time.perf_counter() > deadline:
+            break
+
+    driver = SessionDriver(window, args.sessions, args.tap_delay, args.print_cards, args.timeout)
+    print(f"📊 Running {args.sessions} sessions with the {args.source} camera")
+    QTimer.singleShot(0, driver.start)
+    app.exec()
+
+    summary = driver.report()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    window.camera_manager.stop_camera()
+    window.warmup.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,12 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from PySide6.QtWidgets import QApplication
-from src.ui.kiosk_window import KioskWindow
+from src.utils.startup import StartupTimeline
+
+# Started before any heavy import so the timeline covers the whole launch
+timeline = StartupTimeline()
+
 from src.utils.logger import setup_logger
-from src.utils.auto_start import setup_auto_start
 
 
 def main():
@@ -22,8 +24,17 @@ def main():
     logger = setup_logger()
     logger.info("Starting FIFA Photo Booth Application")
 
+    # Only the GUI is imported up front; cv2, rembg and DeepFace warm up
+    # in the background once the home screen has been painted
+    QtWidgets = timeline.timed_import("PySide6.QtWidgets")
+    kiosk_window = timeline.timed_import("src.ui.kiosk_window")
+
+    # WebEngine is imported after the app exists, which needs shared GL contexts
+    from PySide6.QtCore import Qt, QCoreApplication
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+
     # Create application
-    app = QApplication(sys.argv)
+    app = QtWidgets.QApplication(sys.argv)
     app.setApplicationName("FIFA Photo Booth")
     app.setApplicationVersion("1.0.0")
 
@@ -34,11 +45,12 @@ def main():
             app.setStyleSheet(f.read())
 
     # Create and show main window
-    window = KioskWindow()
+    window = kiosk_window.KioskWindow(timeline=timeline)
     window.show()
 
     # Setup auto-start for kiosk mode
-    setup_auto_start()
+    auto_start = timeline.timed_import("src.utils.auto_start")
+    auto_start.setup_auto_start()
 
     logger.info("Application started successfully")
 
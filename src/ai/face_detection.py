@@ -0,0 +1,122 @@
+"""
+Face detectors for the camera preview and the OpenCV fallback paths
+
+Both implementations take a BGR frame and return boxes as (x, y, w, h):
+
+- HaarFaceDetector: OpenCV's frontal-face cascade; fast on small frames,
+  misses tilted and partly turned faces
+- DnnFaceDetector: OpenCV's YuNet CNN (cv2.FaceDetectorYN) on CPU, run on
+  a downscaled copy of the frame so its cost doesn't grow with resolution
+
+Selected with `ai.face_detection_backend`: "opencv"/"haar" or "yunet"/"dnn".
+The YuNet weights (face_detection_yunet_2023mar.onnx from the OpenCV model
+zoo) are read from `ai.face_detection_model`; without them the factory
+falls back to Haar.
+"""
+
+import abc
+import os
+
+import cv2
+import numpy as np
+
+from src.utils.config import get_settings
+from src.utils.logger import get_logger
+
+logger = get_logger("ai.faces")
+
+HAAR_BACKENDS = ('opencv', 'haar')
+DNN_BACKENDS = ('yunet', 'dnn')
+DEFAULT_DNN_MODEL = 'src/assets/models/face_detection_yunet_2023mar.onnx'
+
+
+class FaceDetector(abc.ABC):
+    name = 'base'
+
+    @abc.abstractmethod
+    def detect(self, frame, gray=None):
+        """Boxes (x, y, w, h) in frame pixels; gray is the frame's grayscale if already computed"""
+
+
+class HaarFaceDetector(FaceDetector):
+    name = 'haar'
+
+    def __init__(self, scale_factor=1.3, min_neighbors=5, min_size=(100, 100)):
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = tuple(min_size)
+        self.cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        )
+
+    def detect(self, frame, gray=None):
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        boxes = self.cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors,
+                                              minSize=self.min_size)
+        return [tuple(int(v) for v in box) for box in boxes]
+
+
+class DnnFaceDetector(FaceDetector):
+    name = 'yunet'
+
+    def __init__(self, model_path=DEFAULT_DNN_MODEL, score_threshold=0.7, nms_threshold=0.3,
+                 input_width=320, min_size=(100, 100)):
+        self.input_width = input_width
+        self.min_size = tuple(min_size)
+        self.model = cv2.FaceDetectorYN.create(model_path, "", (input_width, input_width),
+                                               score_threshold, nms_threshold, 50)
+        self._input = None
+        self._input_size = None
+
+    def detect(self, frame, gray=None):
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.input_width / w)
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        if size != self._input_size:
+            self._input_size = size
+            self._input = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            self.model.setInputSize(size)
+        if scale < 1.0:
+            cv2.resize(frame, size, dst=self._input, interpolation=cv2.INTER_LINEAR)
+            image = self._input
+        else:
+            image = frame
+
+        _, faces = self.model.detect(image)
+        if faces is None:
+            return []
+        boxes = []
+        for face in faces:
+            x, y, fw, fh = (int(round(v / scale)) for v in face[:4])
+            if fw >= self.min_size[0] and fh >= self.min_size[1]:
+                boxes.append((max(0, x), max(0, y), fw, fh))
+        return boxes
+
+
+def create_detector(backend=None, min_size=(100, 100), scale_factor=1.3, min_neighbors=5):
+    """
+    Detector for `ai.face_detection_backend` (or `backend`)
+    Haar parameters apply when the Haar cascade is used, including as fallback
+    """
+    settings = get_settings()
+    backend = (backend or settings.get('ai.face_detection_backend', 'opencv')).lower()
+
+    if backend in DNN_BACKENDS:
+        model_path = settings.get('ai.face_detection_model', DEFAULT_DNN_MODEL)
+        if not os.path.exists(model_path):
+            logger.warning(f"⚠️ Face model {model_path} not found, using the Haar cascade")
+        else:
+            try:
+                return DnnFaceDetector(
+                    model_path,
+                    score_threshold=settings.get('ai.face_detection_score', 0.7),
+                    input_width=settings.get('ai.face_detection_input_width', 320),
+                    min_size=min_size
+                )
+            except cv2.error as e:
+                logger.warning(f"⚠️ Face model failed to load ({e}), using the Haar cascade")
+    elif backend not in HAAR_BACKENDS:
+        logger.warning(f"⚠️ Unknown face detection backend '{backend}', using the Haar cascade")
+
+    return HaarFaceDetector(scale_factor, min_neighbors, min_size)
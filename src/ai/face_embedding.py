@@ -0,0 +1,184 @@
+"""
+Face embeddings and lookalike search for FIFA Photo Booth
+
+The player index is built offline from each player's `image` and stored
+as one contiguous float32 matrix of L2-normalised rows, grouped by gender
+so a gender filter is a slice. At runtime it is memory-mapped and searched
+with a single matrix-vector product (cosine similarity).
+
+Build: python -m src.ai.face_embedding [--images DIR] [--out PREFIX]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.ai import gender_detection
+from src.utils.logger import get_logger, setup_logger
+
+logger = get_logger("ai.embedding")
+
+INDEX_PATH = Path('src/data/player_embeddings')
+PLAYER_IMAGES_DIR = Path('src/assets/players')
+EMBEDDING_MODEL = 'Facenet'
+GENDER_ORDER = ('male', 'female')
+
+
+class FaceEmbedder:
+    def __init__(self, model_name=EMBEDDING_MODEL, detector_backend='opencv'):
+        self.model_name = model_name
+        self.detector_backend = detector_backend
+
+    def warm_up(self):
+        """Load the embedding model with a blank frame"""
+        return self.embed(np.zeros((160, 160, 3), dtype=np.uint8)) is not None
+
+    def embed(self, image):
+        """
+        Embed the most prominent face in an image path or BGR array
+        Returns: float32 vector, or None when DeepFace is unavailable
+        """
+        if not gender_detection._load_deepface():
+            return None
+
+        try:
+            result = gender_detection.DeepFace.represent(
+                img_path=image,
+                model_name=self.model_name,
+                enforce_detection=False,
+                detector_backend=self.detector_backend
+            )
+        except Exception as e:
+            logger.error(f"Face embedding failed: {e}")
+            return None
+
+        if isinstance(result, list):
+            result = result[0]  # Take first face
+        return np.asarray(result['embedding'], dtype=np.float32)
+
+
+class EmbeddingIndex:
+    def __init__(self, matrix, ids, gender_ranges, model_name=EMBEDDING_MODEL):
+        """
+        matrix: (n, dim) float32, rows L2-normalised
+        ids: (n,) player ids aligned with matrix rows
+        gender_ranges: {'male': (start, stop), ...} row slices per gender
+        """
+        self.matrix = matrix
+        self.ids = ids
+        self.gender_ranges = gender_ranges
+        self.model_name = model_name
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, embeddings, model_name=EMBEDDING_MODEL):
+        """embeddings: list of (player_id, gender, vector)"""
+        rows = sorted(embeddings, key=lambda item: GENDER_ORDER.index(item[1]))
+        matrix = np.ascontiguousarray(np.stack([vector for _, _, vector in rows]), dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        ids = np.array([player_id for player_id, _, _ in rows], dtype=np.int64)
+
+        gender_ranges = {}
+        start = 0
+        for gender in GENDER_ORDER:
+            count = sum(1 for _, g, _ in rows if g == gender)
+            gender_ranges[gender] = (start, start + count)
+            start += count
+        return cls(matrix, ids, gender_ranges, model_name)
+
+    def save(self, prefix=INDEX_PATH):
+        prefix = Path(prefix)
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        np.save(f"{prefix}.npy", self.matrix)
+        np.save(f"{prefix}_ids.npy", self.ids)
+        with open(f"{prefix}.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'model': self.model_name,
+                'dim': int(self.matrix.shape[1]),
+                'gender_ranges': self.gender_ranges
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, prefix=INDEX_PATH, mmap=True):
+        """Open a saved index; mmap keeps large rosters out of the heap"""
+        prefix = Path(prefix)
+        with open(f"{prefix}.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        matrix = np.load(f"{prefix}.npy", mmap_mode='r' if mmap else None)
+        ids = np.load(f"{prefix}_ids.npy")
+        gender_ranges = {g: tuple(r) for g, r in meta['gender_ranges'].items()}
+        return cls(matrix, ids, gender_ranges, meta.get('model', EMBEDDING_MODEL))
+
+    def search(self, query, k=1, gender=None, exclude_ids=()):
+        """
+        Nearest players by cosine similarity
+        Returns: list of (player_id, score), best first, skipping exclude_ids
+        """
+        start, stop = self.gender_ranges.get(gender, (0, len(self.ids)))
+        if stop <= start:
+            return []
+
+        query = np.asarray(query, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = self.matrix[start:stop] @ query
+
+        # Over-fetch so excluded (recently shown) players can be skipped
+        want = min(k + len(exclude_ids), len(scores))
+        if want == 1:
+            top = np.array([int(np.argmax(scores))])
+        else:
+            top = np.argpartition(-scores, want - 1)[:want]
+            top = top[np.argsort(-scores[top])]
+
+        results = []
+        for row in top:
+            player_id = int(self.ids[start + row])
+            if player_id in exclude_ids:
+                continue
+            results.append((player_id, float(scores[row])))
+            if len(results) == k:
+                break
+        return results
+
+
+def build_player_index(players_data, images_dir=PLAYER_IMAGES_DIR, embedder=None):
+    """Embed every player photo found in images_dir"""
+    embedder = embedder or FaceEmbedder()
+    embeddings = []
+    for gender in GENDER_ORDER:
+        for player in players_data.get(f"{gender}_players", []):
+            image_path = Path(images_dir) / player.get('image', '')
+            if not image_path.is_file():
+                logger.warning(f"⚠️ No photo for {player['name']}: {image_path}")
+                continue
+            vector = embedder.embed(str(image_path))
+            if vector is not None:
+                embeddings.append((player['id'], gender, vector))
+
+    if not embeddings:
+        raise RuntimeError("No player photos could be embedded")
+    logger.info(f"✅ Embedded {len(embeddings)} player photos")
+    return EmbeddingIndex.build(embeddings, embedder.model_name)
+
+
+def main():
+    from src.data.player_store import open_player_store
+
+    parser = argparse.ArgumentParser(description="Build the lookalike embedding index")
+    parser.add_argument('--images', default=str(PLAYER_IMAGES_DIR))
+    parser.add_argument('--out', default=str(INDEX_PATH))
+    parser.add_argument('--model', default=EMBEDDING_MODEL)
+    args = parser.parse_args()
+
+    setup_logger()
+    players_data = open_player_store().load_players_data()
+    index = build_player_index(players_data, args.images, FaceEmbedder(args.model))
+    index.save(args.out)
+
+
+if __name__ == "__main__":
+    main()
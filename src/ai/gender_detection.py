@@ -1,15 +1,30 @@
-try:
-    from deepface import DeepFace
-    DEEPFACE_AVAILABLE = True
-except Exception:
-    DEEPFACE_AVAILABLE = False
-
-import cv2
 import numpy as np
 import random
-from PIL import Image
-import json
-import time
+import threading
+
+from src.ai import workers
+from src.utils.logger import get_logger, log_event
+
+logger = get_logger("ai")
+
+# DeepFace pulls in TensorFlow, so it is imported on first use (see _load_deepface)
+DeepFace = None
+DEEPFACE_AVAILABLE = None
+_deepface_lock = threading.Lock()
+
+
+def _load_deepface():
+    """Import DeepFace once; returns True when it is usable"""
+    global DeepFace, DEEPFACE_AVAILABLE
+    with _deepface_lock:
+        if DEEPFACE_AVAILABLE is None:
+            try:
+                from deepface import DeepFace as _DeepFace
+                DeepFace = _DeepFace
+                DEEPFACE_AVAILABLE = True
+            except Exception:
+                DEEPFACE_AVAILABLE = False
+    return DEEPFACE_AVAILABLE
 
 
 class GenderDetector:
@@ -17,15 +32,35 @@ class GenderDetector:
         self.models = ["VGG-Face", "OpenFace", "Facenet", "DeepID"]
         self.backends = ["opencv", "ssd", "dlib", "mtcnn", "retinaface"]
         self.threshold = 0.7  # Confidence threshold
+        self.face_detector = None  # OpenCV fallback, built on first use
+        self._detector_lock = threading.Lock()
+
+    def warm_up(self):
+        """Import DeepFace and load the gender model with a blank frame"""
+        if not _load_deepface():
+            return False
+
+        blank = np.zeros((224, 224, 3), dtype=np.uint8)
+        try:
+            DeepFace.analyze(
+                img_path=blank,
+                actions=['gender'],
+                enforce_detection=False,
+                detector_backend=self.backends[0]
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Gender model warm-up failed: {e}")
+            return False
+        return True
 
     def detect_gender(self, image_path):
         """
         Detect gender from image
         Returns: 'male', 'female', or 'unknown'
         """
-        if not DEEPFACE_AVAILABLE:
+        if not _load_deepface():
             res = random.choice(['male', 'female'])
-            print(f"⚠️ DeepFace not available. Fallback detection: {res}")
+            logger.warning(f"⚠️ DeepFace not available. Fallback detection: {res}")
             return res
 
         try:
@@ -54,31 +89,100 @@ class GenderDetector:
                         return detected_gender
 
                 except Exception as e:
-                    print(f"Model {model} failed: {e}")
+                    logger.warning(f"Model {model} failed: {e}")
                     continue
 
             return 'unknown'
 
         except Exception as e:
-            print(f"Gender detection error: {e}")
+            logger.error(f"Gender detection error: {e}")
             return 'unknown'
 
+    def detect_faces(self, image_path):
+        """
+        Detect every face in the image (a path or a BGR array)
+        Returns: list of {'box': (x, y, w, h), 'gender': ..., 'confidence': ...}
+        ordered left to right; gender is 'unknown' below the threshold
+        """
+        pool = workers.get_pool()
+        if pool is not None and isinstance(image_path, str):
+            import cv2
+
+            image = cv2.imread(image_path)
+            if image is None:
+                return []
+            try:
+                return pool.detect_faces(image)
+            except workers.WorkerError as e:
+                logger.warning(f"⚠️ Face worker failed, detecting in-process: {e}")
+            image_path = image
+
+        if _load_deepface():
+            try:
+                results = DeepFace.analyze(
+                    img_path=image_path,
+                    actions=['gender'],
+                    enforce_detection=True,
+                    detector_backend=self.backends[0]
+                )
+                if isinstance(results, dict):
+                    results = [results]
+
+                faces = []
+                for result in results:
+                    region = result['region']
+                    gender = result['gender']
+                    confidence = max(gender['Man'], gender['Woman']) / 100
+                    detected_gender = 'unknown'
+                    if confidence > self.threshold:
+                        detected_gender = 'male' if gender['Man'] > gender['Woman'] else 'female'
+                        self.log_detection(image_path if isinstance(image_path, str) else 'frame',
+                                           detected_gender, confidence)
+
+                    faces.append({
+                        'box': (region['x'], region['y'], region['w'], region['h']),
+                        'gender': detected_gender,
+                        'confidence': confidence
+                    })
+                return sorted(faces, key=lambda face: face['box'][0])
+
+            except ValueError:
+                # DeepFace raises ValueError when no face could be detected
+                return []
+            except Exception as e:
+                logger.error(f"Multi-face detection error: {e}")
+
+        return self._detect_faces_cascade(image_path)
+
+    def _detect_faces_cascade(self, image_path):
+        """OpenCV fallback for detect_faces; boxes only, gender unknown"""
+        import cv2
+        from src.ai.face_detection import create_detector
+
+        image = cv2.imread(image_path) if isinstance(image_path, str) else image_path
+        if image is None:
+            return []
+        with self._detector_lock:
+            if self.face_detector is None:
+                # Still photos: finer scale steps and smaller faces than the live preview
+                self.face_detector = create_detector(min_size=(80, 80), scale_factor=1.1)
+            boxes = self.face_detector.detect(image)
+        faces = [{'box': box, 'gender': 'unknown', 'confidence': 0.0} for box in boxes]
+        return sorted(faces, key=lambda face: face['box'][0])
+
     def log_detection(self, image_path, gender, confidence):
-        """Log detection results"""
-        log_entry = {
-            'timestamp': time.time(),
-            'image': image_path,
-            'gender': gender,
-            'confidence': confidence,
-            'model': 'DeepFace'
-        }
-
-        with open('output/logs/gender_detection.log', 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        """Log detection results (queued, written by the logging thread)"""
+        log_event(
+            'gender_detection',
+            image=image_path,
+            gender=gender,
+            confidence=round(confidence, 4),
+            model='DeepFace'
+        )
 
     def validate_face(self, image_path):
         """Check if face is properly detected"""
-        if not DEEPFACE_AVAILABLE:
+        if not _load_deepface():
             return True
 
         try:
@@ -0,0 +1,376 @@
+"""
+Process-isolated ML workers for FIFA Photo Booth
+
+Background removal (rembg) and face attributes (DeepFace/OpenCV) run in a
+small pool of persistent worker processes instead of the Qt process, so
+inference neither holds the GIL against the UI and capture threads nor
+grows the kiosk's own memory.
+
+Frames travel through shared memory: the parent owns one input and one
+output block per worker and only shapes/names cross the pipe. Workers are
+pinged periodically and replaced when they crash, hang or their RSS passes
+max_rss_mb. Callers fall back to in-process inference on WorkerError.
+Workers send their log records back over a pipe, so only the parent
+writes the log files.
+"""
+
+import atexit
+import multiprocessing
+import queue
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.utils.config import get_settings
+from src.utils.logger import forward_to_parent, get_logger, log_event, receive_from_child
+from src.utils.memory import rss_mb
+
+logger = get_logger("ai.workers")
+
+TASK_SEGMENT = 'remove_background'
+TASK_FACES = 'detect_faces'
+STARTUP_TIMEOUT = 180.0  # Model loading on a slow PC
+
+
+class WorkerError(RuntimeError):
+    """The worker crashed, hung or failed the task"""
+
+
+class WorkerTaskError(WorkerError):
+    """The task raised inside a healthy worker"""
+
+
+# --- Worker process side ---
+
+class _Models:
+    """Models owned by one worker process, loaded once"""
+
+    def __init__(self):
+        self.session = None
+        self.detector = None
+
+    def warm_up(self):
+        try:
+            self._segmentation_session()
+        except Exception as e:
+            logger.warning(f"⚠️ Worker segmentation warm-up failed: {e}")
+        self._face_detector().warm_up()
+
+    def _segmentation_session(self):
+        if self.session is None:
+            from rembg import new_session
+            self.session = new_session()
+        return self.session
+
+    def _face_detector(self):
+        if self.detector is None:
+            from src.ai.gender_detection import GenderDetector
+            self.detector = GenderDetector()
+        return self.detector
+
+    def remove_background(self, image):
+        from PIL import Image
+        from rembg import remove
+
+        result = remove(Image.fromarray(image), session=self._segmentation_session())
+        return np.asarray(result.convert("RGBA"))
+
+    def detect_faces(self, image):
+        return self._face_detector().detect_faces(image)
+
+
+def _open_block(name):
+    """Attach to a parent-owned block; only the parent tracks and unlinks it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    # Older Pythons register on attach. A spawned worker reports to the parent's resource
+    # tracker, where that repeats the parent's own entry; unregistering here would remove
+    # the parent's entry and make its unlink fail in the tracker
+    return shared_memory.SharedMemory(name=name)
+
+
+def _attach(blocks, role, name):
+    """The block for 'in'/'out', closing the old one when the parent grew it"""
+    block = blocks.get(role)
+    if block is None or block.name != name:
+        if block is not None:
+            block.close()
+        block = blocks[role] = _open_block(name)
+    return block
+
+
+def _worker_main(conn, log_conn, warm):
+    forward_to_parent(log_conn)
+    models = _Models()
+    blocks = {}
+    if warm:
+        models.warm_up()
+    conn.send(('ready', rss_mb()))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        kind = message[0]
+        if kind == 'stop':
+            break
+        if kind == 'ping':
+            conn.send(('pong', rss_mb()))
+            continue
+
+        try:
+            _, in_name, shape = message[:3]
+            image = np.ndarray(shape, dtype=np.uint8, buffer=_attach(blocks, 'in', in_name).buf)
+            if kind == TASK_SEGMENT:
+                result = models.remove_background(image)
+                out_block = _attach(blocks, 'out', message[3])
+                if result.nbytes > out_block.size:
+                    raise ValueError("Output buffer too small")
+                np.ndarray(result.shape, dtype=np.uint8, buffer=out_block.buf)[...] = result
+                conn.send(('ok', result.shape, rss_mb()))
+            elif kind == TASK_FACES:
+                # Detectors may write into the frame; work on a private copy
+                conn.send(('ok', models.detect_faces(image.copy()), rss_mb()))
+            else:
+                conn.send(('error', f"Unknown task {kind}", rss_mb()))
+        except Exception as e:
+            conn.send(('error', str(e), rss_mb()))
+
+    for block in blocks.values():
+        block.close()
+
+
+# --- Parent side ---
+
+class _Worker:
+    def __init__(self, context, index, warm):
+        self.index = index
+        self.conn, child_conn = context.Pipe()
+        log_reader, log_writer = context.Pipe(duplex=False)
+        self.process = context.Process(target=_worker_main, args=(child_conn, log_writer, warm),
+                                       name=f"ml-worker-{index}", daemon=True)
+        self.process.start()
+        child_conn.close()
+        log_writer.close()
+        # Ends by itself once the worker exits or is killed
+        receive_from_child(log_reader, name=f"ml-worker-{index}-log")
+        self.ready = False
+        self.rss_mb = 0.0
+        self.tasks = 0
+        self.buffers = {}  # 'in'/'out' -> SharedMemory
+
+    def buffer(self, which, nbytes):
+        """Shared block of at least nbytes, grown with headroom when needed"""
+        block = self.buffers.get(which)
+        if block is None or block.size < nbytes:
+            if block is not None:
+                block.close()
+                block.unlink()
+            block = self.buffers[which] = shared_memory.SharedMemory(
+                create=True, size=int(nbytes * 1.25)
+            )
+        return block
+
+    def call(self, message, timeout):
+        if not self.ready:
+            self._receive(STARTUP_TIMEOUT)
+            self.ready = True
+        try:
+            self.conn.send(message)
+        except (OSError, ValueError) as e:
+            raise WorkerError(f"worker {self.index} unreachable: {e}") from e
+        return self._receive(timeout)
+
+    def _receive(self, timeout):
+        try:
+            if not self.conn.poll(timeout):
+                raise WorkerError(f"worker {self.index} timed out after {timeout:.0f} s")
+            reply = self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise WorkerError(f"worker {self.index} died: {e}") from e
+        self.rss_mb = reply[-1]
+        if reply[0] == 'error':
+            raise WorkerTaskError(f"worker {self.index}: {reply[1]}")
+        return reply
+
+    def stop(self, timeout=2.0):
+        try:
+            self.conn.send(('stop',))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout)
+        self.conn.close()
+        for block in self.buffers.values():
+            block.close()
+            block.unlink()
+        self.buffers = {}
+
+
+class MLWorkerPool:
+    def __init__(self, processes=2, max_rss_mb=2500, task_timeout=60.0,
+                 health_interval=10.0, warm=True):
+        self.processes = processes
+        self.max_rss_mb = max_rss_mb
+        self.task_timeout = task_timeout
+        self.health_interval = health_interval
+        self.warm = warm
+        # spawn: a fork of the Qt/TensorFlow process is not safe
+        self.context = multiprocessing.get_context('spawn')
+        self.idle = queue.Queue()
+        self.workers = {}
+        self.restarts = 0
+        self._next_index = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+
+    def start(self, wait=True):
+        for _ in range(self.processes):
+            self.idle.put(self._spawn())
+        if wait:
+            # Hold the caller (a warm-up task) until every model is loaded
+            workers = [self.idle.get() for _ in range(self.processes)]
+            for worker in workers:
+                self._ping(worker, STARTUP_TIMEOUT)
+                self.idle.put(worker)
+        self._health_thread = threading.Thread(target=self._health_loop, name="ml-health",
+                                               daemon=True)
+        self._health_thread.start()
+        logger.info(f"🧠 {self.processes} ML worker processes ready")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            workers, self.workers = list(self.workers.values()), {}
+        for worker in workers:
+            worker.stop()
+
+    def remove_background(self, image):
+        """image: HxWx3 (RGB) or HxWx4 uint8 array; returns HxWx4 RGBA array"""
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape[:2]
+
+        def send(worker):
+            in_block = worker.buffer('in', image.nbytes)
+            out_block = worker.buffer('out', height * width * 4)
+            np.ndarray(image.shape, dtype=np.uint8, buffer=in_block.buf)[...] = image
+            reply = worker.call((TASK_SEGMENT, in_block.name, image.shape, out_block.name),
+                                self.task_timeout)
+            shape = tuple(reply[1])
+            return np.ndarray(shape, dtype=np.uint8, buffer=out_block.buf).copy()
+
+        return self._run(send)
+
+    def detect_faces(self, image):
+        """image: BGR uint8 array; same result as GenderDetector.detect_faces"""
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+
+        def send(worker):
+            in_block = worker.buffer('in', image.nbytes)
+            np.ndarray(image.shape, dtype=np.uint8, buffer=in_block.buf)[...] = image
+            return worker.call((TASK_FACES, in_block.name, image.shape), self.task_timeout)[1]
+
+        return self._run(send)
+
+    def _run(self, send):
+        try:
+            worker = self.idle.get(timeout=self.task_timeout)
+        except queue.Empty:
+            raise WorkerError("no ML worker free")
+        try:
+            reply = send(worker)
+        except WorkerTaskError:
+            self._release(worker)
+            raise
+        except WorkerError as e:
+            self._replace(worker, str(e))
+            raise
+        except BaseException:
+            self._release(worker)
+            raise
+        self._release(worker)
+        return reply
+
+    def _release(self, worker, task=True):
+        if task:
+            worker.tasks += 1
+        if worker.rss_mb > self.max_rss_mb:
+            self._replace(worker, f"rss {worker.rss_mb:.0f} MB")
+        else:
+            self.idle.put(worker)
+
+    def _spawn(self):
+        with self._lock:
+            index = self._next_index
+            self._next_index += 1
+            worker = self.workers[index] = _Worker(self.context, index, self.warm)
+        return worker
+
+    def _replace(self, worker, reason):
+        logger.warning(f"⚠️ Restarting ML worker {worker.index}: {reason}")
+        log_event("ml_worker_restart", worker=worker.index, reason=reason,
+                  tasks=worker.tasks, rss_mb=round(worker.rss_mb, 1))
+        with self._lock:
+            self.workers.pop(worker.index, None)
+            self.restarts += 1
+        worker.stop(timeout=1.0)
+        if not self._stop.is_set():
+            self.idle.put(self._spawn())
+
+    def _ping(self, worker, timeout=5.0):
+        reply = worker.call(('ping',), timeout)
+        if reply[0] != 'pong':
+            raise WorkerError(f"worker {worker.index} answered {reply[0]}")
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            # Check the workers that are idle right now; busy ones report RSS on every reply
+            for _ in range(self.idle.qsize()):
+                try:
+                    worker = self.idle.get_nowait()
+                except queue.Empty:
+                    break
+                if not worker.ready:
+                    self.idle.put(worker)  # Still loading models
+                    continue
+                try:
+                    self._ping(worker)
+                except WorkerError as e:
+                    self._replace(worker, str(e))
+                    continue
+                self._release(worker, task=False)  # A ping is not a task
+
+
+_pool = None
+
+
+def get_pool():
+    """The running worker pool, or None when inference stays in-process"""
+    return _pool
+
+
+def start_pool():
+    """Start the pool described by `ml_workers` settings; returns None when disabled"""
+    global _pool
+    settings = get_settings()
+    if not settings.get('ml_workers.enabled', False):
+        return None
+    if _pool is None:
+        pool = MLWorkerPool(
+            processes=settings.get('ml_workers.processes', 2),
+            max_rss_mb=settings.get('ml_workers.max_rss_mb', 2500),
+            task_timeout=settings.get('ml_workers.task_timeout_seconds', 60),
+            health_interval=settings.get('ml_workers.health_interval_seconds', 10)
+        )
+        pool.start()
+        atexit.register(pool.stop)
+        _pool = pool
+    return _pool
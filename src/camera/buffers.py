@@ -0,0 +1,48 @@
+"""
+Reusable frame buffers for the preview path
+
+At 30 FPS every cv2 call that returns a new array costs a multi-MB
+allocation. FrameBufferPool hands out preallocated arrays to pass as cv2
+`dst` arguments instead:
+
+- get(name, shape): scratch buffer used by one thread only (gray, mirror)
+- next(name, shape): rotates through `slots` buffers, for frames published
+  to another thread; a consumer can read the latest frame while the
+  producer fills the next slot. Consumers that keep a frame must copy it
+  (or hold fewer references than there are slots, like BurstBuffer).
+
+A buffer is reallocated only when the requested shape changes.
+"""
+
+import numpy as np
+
+
+class FrameBufferPool:
+    def __init__(self, slots=3):
+        self.slots = slots
+        self.allocations = 0
+        self._scratch = {}
+        self._rings = {}  # name -> (buffers, next index)
+
+    def _allocate(self, shape, dtype):
+        self.allocations += 1
+        return np.empty(shape, dtype=dtype)
+
+    def get(self, name, shape, dtype=np.uint8):
+        buffer = self._scratch.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = self._scratch[name] = self._allocate(shape, dtype)
+        return buffer
+
+    def next(self, name, shape, dtype=np.uint8, slots=None):
+        slots = slots or self.slots
+        buffers, index = self._rings.get(name, ([], 0))
+        if (len(buffers) != slots or buffers[0].shape != tuple(shape)
+                or buffers[0].dtype != dtype):
+            buffers, index = [self._allocate(shape, dtype) for _ in range(slots)], 0
+        self._rings[name] = (buffers, (index + 1) % len(buffers))
+        return buffers[index]
+
+    def clear(self):
+        self._scratch.clear()
+        self._rings.clear()
@@ -0,0 +1,92 @@
+"""
+Burst capture: keep the last moments of preview and save the best frame
+
+Every published preview frame is scored cheaply on a small grayscale
+thumbnail plus the face boxes the preview detector already found:
+
+- sharpness: variance of the Laplacian (motion blur and focus)
+- exposure: how close mean brightness is to mid-gray
+- face: size of the centered face relative to the guide
+
+When the guest is captured, BurstBuffer.best() picks the highest scoring
+frame from the last `seconds` instead of whichever frame happened to be
+current. Sharpness is normalized within the burst, so the weights don't
+depend on the camera or the scene.
+"""
+
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+THUMB_WIDTH = 160
+
+# Relative weights of the score terms
+SHARPNESS_WEIGHT = 0.5
+EXPOSURE_WEIGHT = 0.2
+FACE_WEIGHT = 0.3
+
+
+class BurstBuffer:
+    def __init__(self, seconds=0.5, max_frames=12):
+        self.seconds = seconds
+        self.max_frames = max_frames
+        self.frames = deque(maxlen=max_frames)  # (timestamp, frame, metrics)
+        self._thumb = None
+        self._laplacian = None
+
+    @property
+    def slots(self):
+        """Ring slots the frame pool needs so buffered frames aren't overwritten"""
+        return self.max_frames + 2
+
+    def measure(self, gray, faces):
+        """Sharpness, exposure and face metrics for one frame (well under a ms)"""
+        h, w = gray.shape
+        thumb_size = (THUMB_WIDTH, max(1, THUMB_WIDTH * h // w))
+        if self._thumb is None or self._thumb.shape[::-1] != thumb_size:
+            self._thumb = np.empty(thumb_size[::-1], dtype=np.uint8)
+            self._laplacian = np.empty(thumb_size[::-1], dtype=np.int16)
+        cv2.resize(gray, thumb_size, dst=self._thumb, interpolation=cv2.INTER_AREA)
+        cv2.Laplacian(self._thumb, cv2.CV_16S, dst=self._laplacian)
+        mean, stddev = cv2.meanStdDev(self._laplacian)
+        brightness = float(self._thumb.mean())
+
+        face = 0.0
+        guide_radius = min(h, w) // 3
+        for (x, y, fw, fh) in faces:
+            dist = ((x + fw / 2 - w / 2) ** 2 + (y + fh / 2 - h / 2) ** 2) ** 0.5
+            centered = max(0.0, 1.0 - dist / guide_radius)
+            size = min(1.0, fw / guide_radius)
+            face = max(face, float(centered * size))
+
+        return {
+            'sharpness': float(stddev[0][0]) ** 2,
+            'exposure': 1.0 - abs(brightness - 128.0) / 128.0,
+            'face': face,
+        }
+
+    def add(self, frame, metrics, timestamp=None):
+        self.frames.append((timestamp or time.perf_counter(), frame, metrics))
+
+    def clear(self):
+        self.frames.clear()
+
+    def best(self, now=None):
+        """(frame, metrics, age_seconds) of the best recent frame, or None"""
+        now = now or time.perf_counter()
+        recent = [entry for entry in list(self.frames) if now - entry[0] <= self.seconds]
+        if not recent:
+            return None
+        top_sharpness = max(metrics['sharpness'] for _, _, metrics in recent) or 1.0
+
+        def score(entry):
+            metrics = entry[2]
+            return (SHARPNESS_WEIGHT * metrics['sharpness'] / top_sharpness
+                    + EXPOSURE_WEIGHT * metrics['exposure']
+                    + FACE_WEIGHT * metrics['face'])
+
+        timestamp, frame, metrics = max(recent, key=score)
+        metrics = dict(metrics, score=round(float(score((timestamp, frame, metrics))), 3))
+        return frame, metrics, now - timestamp
@@ -2,21 +2,80 @@ import cv2
 import numpy as np
 from datetime import datetime
 import os
-from threading import Thread
+from threading import Lock, Thread, current_thread
 import time
 
+from src.ai.face_detection import create_detector
+from src.camera.buffers import FrameBufferPool
+from src.camera.burst import BurstBuffer
+from src.camera.cutout import create_cutout
+from src.camera.sources import create_source
+from src.camera.tracking import FaceTracker
+from src.utils import telemetry
+from src.utils.config import get_settings
+from src.utils.logger import get_logger, log_event
+
+logger = get_logger("camera")
+
 
 class CameraManager:
+    IDLE = 'idle'
+    LIVE = 'live'
+    RECONNECTING = 'reconnecting'
+
     def __init__(self):
         self.camera = None
         self.is_capturing = False
         self.current_frame = None
         self.capture_thread = None
         self.face_in_guide = False
-        
-        # Load face cascade for auto-detection
-        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        self.face_cascade = cv2.CascadeClassifier(cascade_path)
+        self.face_detector = None
+        self.capture_sound = None  # Created on the GUI thread, reused per capture
+        self.buffers = FrameBufferPool()
+        settings = get_settings()
+        # Recent frames with quality scores; capture saves the best, not the latest
+        self.burst = BurstBuffer(settings.get('camera.burst_seconds', 0.5),
+                                 settings.get('camera.burst_frames', 12))
+
+        # Stall watchdog: a loop whose generation is stale exits and releases its device
+        self.state = self.IDLE
+        self.last_device = None  # (index, backend, name) that last opened: the fast path
+        self.last_frame_at = 0.0
+        self.stall_timeout = settings.get('camera.stall_timeout_seconds', 2.0)
+
+        # Detection runs at a reduced rate; the tracker smooths between passes
+        self.tracker = FaceTracker()
+        self.detection_interval = settings.get('camera.detection_interval_seconds', 0.1)
+        self.faces = ()
+        self._last_detection = 0.0
+        # Optional live background removal (`live_cutout`); the GUI composites its mask
+        self.cutout = create_cutout()
+        self.stalls = 0
+        self.recovery_times = []
+        self._generation = 0
+        self._watchdog_thread = None
+        self._release_thread = None
+        self._open_lock = Lock()  # Opening/starting: start_preview vs the watchdog
+
+    def warm_up(self):
+        """Load the face detector (and the live cutout model) before the first preview starts"""
+        self.load_face_detector()
+        if self.cutout is not None:
+            try:
+                self.cutout.warm_up()
+            except Exception as e:
+                logger.warning(f"⚠️ Live cutout warm-up failed: {e}")
+
+    def apply_settings(self, settings):
+        """Pick up reloaded camera timings; burst size and live cutout need a restart"""
+        self.stall_timeout = settings.get('camera.stall_timeout_seconds', 2.0)
+        self.detection_interval = settings.get('camera.detection_interval_seconds', 0.1)
+
+    def load_face_detector(self):
+        """Face detector for auto-capture (`ai.face_detection_backend`)"""
+        if self.face_detector is None:
+            self.face_detector = create_detector()
+        return self.face_detector
 
     def initialize_camera(self):
         """Try to find and initialize camera with multiple fallbacks"""
@@ -25,7 +84,22 @@ class CameraManager:
             self.camera.release()
             self.camera = None
 
-        print("🎥 Starting camera initialization...")
+        # Replay/synthetic sources stand in for a webcam on test boxes
+        source = create_source(get_settings())
+        if source is not None:
+            if source.isOpened():
+                self.camera = source
+                return True
+            return False
+
+        # Fast path: the device that worked last time, without the settle delay
+        if self.last_device is not None:
+            cam = self._open_device(*self.last_device, settle=0.1)
+            if cam is not None:
+                self.camera = cam
+                return True
+
+        logger.info("🎥 Starting camera initialization...")
         
         # Try different backends in order of preference for Windows
         backends = [
@@ -37,108 +111,227 @@ class CameraManager:
         # Try multiple camera indices
         for i in range(3):  # Try indices 0, 1, 2
             for backend, backend_name in backends:
-                print(f"🔄 Trying Camera {i} with {backend_name}...")
-                try:
-                    # Attempt to create VideoCapture with backend
-                    if backend is not None:
-                        cam = cv2.VideoCapture(i, backend)
-                    else:
-                        cam = cv2.VideoCapture(i)
-                    
-                    if cam.isOpened():
-                        # Set resolution
-                        cam.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-                        cam.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-                        cam.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                        
-                        # Wait for camera to stabilize
-                        time.sleep(0.5)
-                        
-                        # Try to read frames
-                        success = False
-                        for attempt in range(10):
-                            ret, frame = cam.read()
-                            if ret and frame is not None and frame.size > 0:
-                                avg_brightness = np.mean(frame)
-                                if avg_brightness > 5:
-                                    success = True
-                                    self.camera = cam
-                                    print(f"✅ Camera {i} initialized successfully with {backend_name}!")
-                                    return True
-                            time.sleep(0.1)
-                        
-                        if not success:
-                            print(f"⚠️ Camera {i} ({backend_name}) returned invalid frames")
-                            cam.release()
-                    
-                except Exception as e:
-                    print(f"❌ Error with camera {i} ({backend_name}): {str(e)[:100]}")
+                logger.info(f"🔄 Trying Camera {i} with {backend_name}...")
+                cam = self._open_device(i, backend, backend_name)
+                if cam is not None:
+                    self.camera = cam
+                    self.last_device = (i, backend, backend_name)
+                    return True
         
-        print("=" * 60)
-        print("❌ NO CAMERA FOUND!")
-        print("=" * 60)
-        print("💡 Troubleshooting steps:")
-        print("  1. Check Windows Camera permissions:")
-        print("     Settings > Privacy & Security > Camera")
-        print("  2. Close apps using camera (Teams, Zoom, Skype)")
-        print("  3. Try plugging in a USB webcam")
-        print("  4. Restart the application")
-        print("=" * 60)
+        logger.error("\n".join([
+            "=" * 60,
+            "❌ NO CAMERA FOUND!",
+            "=" * 60,
+            "💡 Troubleshooting steps:",
+            "  1. Check Windows Camera permissions:",
+            "     Settings > Privacy & Security > Camera",
+            "  2. Close apps using camera (Teams, Zoom, Skype)",
+            "  3. Try plugging in a USB webcam",
+            "  4. Restart the application",
+            "=" * 60,
+        ]))
         return False
 
+    def _open_device(self, i, backend, backend_name, settle=0.5):
+        """Open one index/backend and check it delivers real frames; returns the capture or None"""
+        try:
+            # Attempt to create VideoCapture with backend
+            if backend is not None:
+                cam = cv2.VideoCapture(i, backend)
+            else:
+                cam = cv2.VideoCapture(i)
+            
+            if cam.isOpened():
+                # Set resolution
+                cam.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
+                cam.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+                cam.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                
+                # Wait for camera to stabilize
+                time.sleep(settle)
+                
+                # Try to read frames
+                for attempt in range(10):
+                    ret, frame = cam.read()
+                    if ret and frame is not None and frame.size > 0:
+                        avg_brightness = np.mean(frame)
+                        if avg_brightness > 5:
+                            logger.info(f"✅ Camera {i} initialized successfully with {backend_name}!")
+                            return cam
+                    time.sleep(0.1)
+                
+                logger.warning(f"⚠️ Camera {i} ({backend_name}) returned invalid frames")
+            cam.release()
+            
+        except Exception as e:
+            logger.error(f"❌ Error with camera {i} ({backend_name}): {str(e)[:100]}")
+        return None
+
     def start_preview(self):
         """Start camera preview in separate thread"""
-        if not self.camera or not self.camera.isOpened():
-            if not self.initialize_camera():
-                return False
+        if self._release_thread is not None:
+            # The previous guest's device may still be closing
+            self._release_thread.join(timeout=3)
+            self._release_thread = None
+        self.load_face_detector()
+        with self._open_lock:
+            if not self.camera or not self.camera.isOpened():
+                with telemetry.span(telemetry.CAMERA_OPEN):
+                    opened = self.initialize_camera()
+                if not opened:
+                    return False
 
-        self.is_capturing = True
-        self.capture_thread = Thread(target=self._preview_loop)
-        self.capture_thread.start()
+            self.is_capturing = True
+            self._start_loop()
+        if self._watchdog_thread is None or not self._watchdog_thread.is_alive():
+            self._watchdog_thread = Thread(target=self._watchdog_loop, name="camera-watchdog",
+                                           daemon=True)
+            self._watchdog_thread.start()
         return True
 
-    def _preview_loop(self):
+    def _start_loop(self):
+        self._generation += 1
+        self.burst.clear()
+        self.tracker.reset()
+        self._last_detection = 0.0
+        self.last_frame_at = time.perf_counter()
+        self.state = self.LIVE
+        if self.cutout is not None:
+            self.cutout.start()
+        self.capture_thread = Thread(target=self._preview_loop,
+                                     args=(self._generation, self.camera),
+                                     name="camera-preview", daemon=True)
+        self.capture_thread.start()
+
+    def _preview_loop(self, generation, camera):
         """Main camera loop with face alignment detection"""
-        while self.is_capturing:
-            ret, frame = self.camera.read()
+        observe = telemetry.observe
+        clock = time.perf_counter
+        frame = None  # Handed back to read() so the driver refills the same array
+        while self.is_capturing and generation == self._generation:
+            started = clock()
+            ret, frame = camera.read(frame)
+            observe(telemetry.FRAME_READ, clock() - started)
+            if generation != self._generation:
+                break  # Replaced while read() hung; this frame is stale
             if ret:
-                # Mirror effect
-                frame = cv2.flip(frame, 1)
-                
-                # Detect face for guide alignment
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                # Use faster parameters for preview
-                faces = self.face_cascade.detectMultiScale(gray, 1.3, 5, minSize=(100, 100))
-                
-                h, w, _ = frame.shape
-                center_x, center_y = w // 2, h // 2
-                guide_radius = min(h, w) // 3
-                
-                self.face_in_guide = False
-                for (x, y, fw, fh) in faces:
-                    face_center_x = x + fw // 2
-                    face_center_y = y + fh // 2
-                    
-                    # Calculate distance from screen center
-                    dist = ((face_center_x - center_x)**2 + (face_center_y - center_y)**2)**0.5
-                    if dist < guide_radius // 3: # Face is well centered
-                        self.face_in_guide = True
-                        break
-
-                # Convert to RGB for PySide
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                self.current_frame = rgb_frame
+                self._process_frame(frame)
+                self.last_frame_at = clock()
+            else:
+                frame = None
 
             time.sleep(0.03)
 
+    def _watchdog_loop(self):
+        """Reopen the device when frames stop arriving (USB hiccup, driver hang)"""
+        while self.is_capturing:
+            time.sleep(self.stall_timeout / 4)
+            if (self.is_capturing and self.state == self.LIVE
+                    and time.perf_counter() - self.last_frame_at > self.stall_timeout):
+                self._recover()
+
+    def _recover(self):
+        started = time.perf_counter()
+        self.stalls += 1
+        self.state = self.RECONNECTING
+        self.face_in_guide = False  # No auto-capture from the frozen frame
+        self.tracker.reset()
+        logger.warning(f"⚠️ Camera stalled for {started - self.last_frame_at:.1f} s, reconnecting")
+        log_event("camera_stall", stalls=self.stalls)
+
+        # Abandon the loop; its device is released in the background, even if read() hangs
+        self._generation += 1
+        stalled, self.camera = self.camera, None
+        self._release_later(self.capture_thread, stalled)
+
+        delay = 0.5
+        while not self._reconnect_once(started):
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
+
+    def _reconnect_once(self, started):
+        """One reopen attempt; True when done (reconnected, stopped or restarted meanwhile)"""
+        with self._open_lock:
+            if not self.is_capturing or self.state != self.RECONNECTING:
+                return True
+            if not self.initialize_camera():
+                return False
+            if not self.is_capturing:
+                # stop_camera ran while the device was opening
+                camera, self.camera = self.camera, None
+                self._release_later(None, camera)
+                return True
+            elapsed = time.perf_counter() - started
+            self.recovery_times.append(elapsed)
+            telemetry.observe(telemetry.CAMERA_RECOVERY, elapsed)
+            log_event("camera_recovered", seconds=round(elapsed, 3), stalls=self.stalls)
+            logger.info(f"✅ Camera back after {elapsed:.1f} s")
+            self._start_loop()
+            return True
+
+    def _release_later(self, thread, camera):
+        """Join the old loop and release its device off the caller's thread"""
+        def release():
+            if thread is not None and thread is not current_thread():
+                thread.join(timeout=5)
+            if camera is not None:
+                camera.release()
+
+        try:
+            self._release_thread = Thread(target=release, name="camera-release", daemon=True)
+            self._release_thread.start()
+        except RuntimeError:
+            release()  # Interpreter shutting down (__del__): no new threads
+
+    def _process_frame(self, frame):
+        """Mirror a BGR camera frame, check face alignment and publish it as RGB"""
+        # Mirror effect (into pooled buffers: no per-frame allocations)
+        buffers = self.buffers
+        frame = cv2.flip(frame, 1, dst=buffers.get('mirror', frame.shape))
+        
+        # Detect face for guide alignment
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=buffers.get('gray', frame.shape[:2]))
+        now = time.perf_counter()
+        if now - self._last_detection >= self.detection_interval:
+            self._last_detection = now
+            self.faces = self.face_detector.detect(frame, gray)
+            telemetry.observe(telemetry.FACE_DETECTION, time.perf_counter() - now)
+            self.tracker.update(self.faces, frame.shape, now)
+        faces = self.faces
+        self.face_in_guide = self.tracker.in_guide
+
+        # Convert to RGB for PySide; published frames rotate through a ring so
+        # the GUI can read the latest one while the next is being written
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB,
+                                 dst=buffers.next('rgb', frame.shape, slots=self.burst.slots))
+        self.burst.add(rgb_frame, self.burst.measure(gray, faces))
+        if self.cutout is not None:
+            self.cutout.submit(rgb_frame)
+        self.current_frame = rgb_frame
+
+    def dwell_seconds(self):
+        """How long the guest's face has been held in the guide"""
+        return self.tracker.dwell() if self.state == self.LIVE else 0.0
+
     def capture_photo(self):
         """Capture single photo"""
         if self.current_frame is not None:
+            started = time.perf_counter()
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"output/captured/photo_{timestamp}.jpg"
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+            # Sharpest, best exposed, best framed frame of the last moments
+            frame = self.current_frame
+            picked = self.burst.best()
+            if picked is not None:
+                frame, metrics, age = picked
+                log_event("capture_pick", age_ms=round(age * 1000, 1), frames=len(self.burst.frames),
+                          **{k: round(v, 3) for k, v in metrics.items()})
 
-            # Save image
-            cv2.imwrite(filename, cv2.cvtColor(self.current_frame, cv2.COLOR_RGB2BGR))
+            # Save image (converting copies it out of the frame ring)
+            cv2.imwrite(filename, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+            telemetry.observe(telemetry.CAPTURE, time.perf_counter() - started)
 
             # Play capture sound
             self.play_capture_sound()
@@ -146,25 +339,38 @@ class CameraManager:
             return filename
         return None
 
+    def load_capture_sound(self):
+        """Decode the capture sound once; call from the GUI thread before the first capture"""
+        if self.capture_sound is None:
+            try:
+                from PySide6.QtMultimedia import QSoundEffect
+                from PySide6.QtCore import QUrl
+                self.capture_sound = QSoundEffect()
+                self.capture_sound.setSource(QUrl.fromLocalFile("src/assets/sounds/capture.wav"))
+            except Exception as e:
+                logger.debug(f"Capture sound unavailable: {e}")
+                self.capture_sound = False
+        return self.capture_sound
+
     def play_capture_sound(self):
         """Play capture sound effect"""
-        try:
-            from PySide6.QtMultimedia import QSoundEffect
-            from PySide6.QtCore import QUrl
-            sound = QSoundEffect()
-            sound.setSource(QUrl.fromLocalFile("src/assets/sounds/capture.wav"))
+        sound = self.load_capture_sound()
+        if sound:
             sound.play()
-        except:
-            print("Capture sound played (silent)")
+        else:
+            logger.debug("Capture sound played (silent)")
 
     def stop_camera(self):
-        """Stop camera and release resources"""
+        """Stop the preview; the device is released in the background"""
         self.is_capturing = False
-        if self.capture_thread:
-            self.capture_thread.join(timeout=2)
-
-        if self.camera:
-            self.camera.release()
+        self.state = self.IDLE
+        self._generation += 1
+        if self.cutout is not None:
+            self.cutout.stop()
+        camera, self.camera = self.camera, None
+        if self.capture_thread is not None or camera is not None:
+            self._release_later(self.capture_thread, camera)
+        self.capture_thread = None
 
     def __del__(self):
         self.stop_camera()
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Live background-removed preview
+
+Full-size segmentation takes far longer than a preview frame, so LiveCutout
+runs a light rembg model (u2netp by default) on a small copy of the latest
+frame in a background thread, a few times per second, and keeps the
+newest mask. Every preview frame is composited with that mask, upsampled to
+the preview size: the guest sees themselves on the card backdrop (and in the
+jersey, when src/assets/jersey.png exists) while the preview keeps its frame
+rate. The mask trails the frame by one segmentation pass.
+
+CPU use is bounded by `cpu_budget`, the share of wall time the worker may
+spend segmenting: after a pass of t seconds it idles for at least
+t * (1 - budget) / budget, and never runs faster than `max_fps`.
+"""
+
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from src.utils import telemetry
+from src.utils.config import get_settings
+from src.utils.logger import get_logger, log_event
+
+logger = get_logger("camera.cutout")
+
+JERSEY_PATH = 'src/assets/jersey.png'
+BACKDROP_COLOR = (200, 16, 46)  # Coca-Cola red (RGB), when no backdrop image loads
+
+
+class LiveCutout:
+    def __init__(self, model='u2netp', input_width=256, max_fps=5.0, cpu_budget=0.5,
+                 background='src/assets/bg_pattern.png', jersey=JERSEY_PATH):
+        self.model = model
+        self.input_width = input_width
+        self.max_fps = max_fps
+        self.cpu_budget = min(1.0, max(0.05, cpu_budget))
+        self.background_path = background
+        self.jersey_path = jersey
+
+        self.mask = None  # Latest mask (uint8, input size); swapped whole, never written in place
+        self.passes = 0
+        self.failed = False
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._pending = None  # Downscaled RGB frame waiting for the worker
+        self._wake = None  # Set by submit() when a frame is pending; None while stopped
+        self._generation = 0
+
+        # Preview-side buffers, rebuilt when the preview size changes (GUI thread only)
+        self._view_size = None
+        self._alpha = None
+        self._blend = None
+        self._backdrop = None
+        self._jersey = None
+
+    def warm_up(self):
+        """Load the segmentation model ahead of the first preview"""
+        self._get_session()
+
+    def _get_session(self):
+        with self._session_lock:
+            if self._session is None:
+                from rembg import new_session
+                self._session = new_session(self.model)
+            return self._session
+
+    # Camera thread
+    def start(self):
+        if self.failed:
+            return
+        # A worker still finishing its pass sees a stale generation and exits
+        self._generation += 1
+        self._wake = threading.Event()
+        self.mask = None  # The previous guest's outline
+        threading.Thread(target=self._run, args=(self._generation, self._wake),
+                         name="live-cutout", daemon=True).start()
+
+    def stop(self):
+        self._generation += 1
+        wake, self._wake = self._wake, None
+        if wake is not None:
+            wake.set()
+
+    def submit(self, frame):
+        """Offer the latest RGB preview frame; only copied when the worker is ready for it"""
+        wake = self._wake
+        if wake is None or wake.is_set():
+            return
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.input_width / w)
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        self._pending = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        wake.set()
+
+    # Worker thread
+    def _run(self, generation, wake):
+        from PIL import Image
+
+        min_interval = 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+        while True:
+            wake.wait()
+            if generation != self._generation:
+                break
+            small = self._pending
+            started = time.perf_counter()
+            try:
+                from rembg import remove
+                mask = remove(Image.fromarray(small), session=self._get_session(), only_mask=True)
+            except Exception as e:
+                # No model (offline first run, rembg missing): plain preview from now on
+                logger.warning(f"⚠️ Live cutout disabled: {e}")
+                self.failed = True
+                self.mask = None
+                break
+            if generation != self._generation:
+                break
+            self.mask = np.asarray(mask, dtype=np.uint8)
+            elapsed = time.perf_counter() - started
+            telemetry.observe(telemetry.LIVE_SEGMENTATION, elapsed)
+            self.passes += 1
+
+            # Stay within the CPU budget and the rate cap before taking the next frame
+            idle = max(min_interval - elapsed, elapsed * (1.0 - self.cpu_budget) / self.cpu_budget)
+            time.sleep(idle)
+            wake.clear()
+            # stop() bumps the generation before setting wake, so a stop that landed
+            # during the sleep (its wake already cleared above) is caught here
+            if generation != self._generation:
+                break
+
+    # GUI thread
+    def apply(self, view):
+        """Composite the cached mask onto a preview frame (RGB, in place); False without a mask"""
+        mask = self.mask
+        if mask is None:
+            return False
+        vh, vw = view.shape[:2]
+        if self._view_size != (vw, vh):
+            self._prepare(vw, vh)
+
+        alpha = self._alpha
+        cv2.resize(mask, (vw, vh), dst=alpha, interpolation=cv2.INTER_LINEAR)
+        # view * alpha + backdrop * (1 - alpha), in 8-bit fixed point
+        cv2.merge((alpha, alpha, alpha), dst=self._blend)
+        cv2.multiply(view, self._blend, dst=view, scale=1 / 255)
+        cv2.multiply(self._backdrop, cv2.bitwise_not(self._blend, dst=self._blend),
+                     dst=self._blend, scale=1 / 255)
+        cv2.add(view, self._blend, dst=view)
+
+        if self._jersey is not None:
+            (x, y), rgb, weight, inverse = self._jersey
+            roi = view[y:y + rgb.shape[0], x:x + rgb.shape[1]]
+            cv2.blendLinear(rgb, roi, weight, inverse, dst=roi)
+        return True
+
+    def _prepare(self, vw, vh):
+        """Mask, blend and backdrop buffers for a new preview size, plus the placed jersey"""
+        self._view_size = (vw, vh)
+        self._alpha = np.empty((vh, vw), dtype=np.uint8)
+        self._blend = np.empty((vh, vw, 3), dtype=np.uint8)
+
+        backdrop = cv2.imread(self.background_path) if self.background_path else None
+        if backdrop is not None:
+            self._backdrop = cv2.cvtColor(cv2.resize(backdrop, (vw, vh), interpolation=cv2.INTER_AREA),
+                                          cv2.COLOR_BGR2RGB)
+        else:
+            self._backdrop = np.empty((vh, vw, 3), dtype=np.uint8)
+            self._backdrop[:] = BACKDROP_COLOR
+
+        # Jersey below the guide circle, a little wider than the guide
+        self._jersey = None
+        jersey = (cv2.imread(self.jersey_path, cv2.IMREAD_UNCHANGED)
+                  if self.jersey_path and os.path.exists(self.jersey_path) else None)
+        if jersey is not None and jersey.ndim == 3 and jersey.shape[2] == 4:
+            radius = min(vh, vw) // 3
+            jw = min(vw, int(radius * 2.8))
+            jh = min(vh, max(1, jersey.shape[0] * jw // jersey.shape[1]))
+            jersey = cv2.resize(jersey, (jw, jh), interpolation=cv2.INTER_AREA)
+            x = (vw - jw) // 2
+            y = min(vh - jh, vh // 2 + int(radius * 0.7))
+            rgb = cv2.cvtColor(jersey[..., :3], cv2.COLOR_BGR2RGB)
+            weight = jersey[..., 3].astype(np.float32) / 255
+            # Both blend weights are fixed per view size; only the frame changes
+            self._jersey = ((x, max(0, y)), rgb, weight, 1.0 - weight)
+
+
+def create_cutout():
+    """LiveCutout from the `live_cutout` settings, or None when the mode is off"""
+    settings = get_settings()
+    if not settings.get('live_cutout.enabled', False):
+        return None
+    cutout = LiveCutout(
+        model=settings.get('live_cutout.model', 'u2netp'),
+        input_width=settings.get('live_cutout.input_width', 256),
+        max_fps=settings.get('live_cutout.max_fps', 5),
+        cpu_budget=settings.get('live_cutout.cpu_budget', 0.5),
+        background=settings.get('live_cutout.background', 'src/assets/bg_pattern.png'),
+    )
+    log_event("live_cutout", model=cutout.model, input_width=cutout.input_width,
+              max_fps=cutout.max_fps, cpu_budget=cutout.cpu_budget)
+    return cutout
@@ -0,0 +1,240 @@
+"""
+Virtual camera sources for FIFA Photo Booth
+
+Each source behaves like the part of cv2.VideoCapture that CameraManager
+uses (isOpened/read/set/get/release), so the preview loop, auto-capture and
+the whole pipeline run unchanged without a webcam:
+
+- ReplaySource plays a video file or an image sequence (directory or glob)
+  at its native or a fixed FPS, optionally looping and with timing jitter
+- SyntheticSource draws frames with a face that walks into the guide,
+  holds still for a few seconds and leaves
+
+Selected with `camera.source` in settings ("device", "replay", "synthetic").
+"""
+
+import abc
+import glob
+import os
+import random
+import time
+
+import cv2
+import numpy as np
+
+from src.utils.logger import get_logger
+
+logger = get_logger("camera")
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FrameSource(abc.ABC):
+    """Paces read() to the source FPS, with optional random jitter per frame"""
+
+    def __init__(self, fps=30.0, jitter_ms=0.0, seed=None):
+        self.fps = fps
+        self.jitter_ms = jitter_ms
+        self.random = random.Random(seed)
+        self._next_due = None
+        self._opened = True
+        self.frames_read = 0
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        return False  # Resolution/buffer hints don't apply
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return 0.0
+
+    def release(self):
+        self._opened = False
+
+    def read(self, image=None):
+        """Like VideoCapture.read: fills `image` in place when its shape matches"""
+        if not self._opened:
+            return False, None
+        self._wait_for_frame()
+        frame = self._next_frame(image)
+        if frame is None:
+            return False, None
+        self.frames_read += 1
+        return True, frame
+
+    def _wait_for_frame(self):
+        if not self.fps:
+            return  # Unpaced: as fast as the consumer reads
+        now = time.perf_counter()
+        if self._next_due is None:
+            self._next_due = now
+        delay = self._next_due - now
+        if self.jitter_ms:
+            delay += self.random.uniform(0, self.jitter_ms) / 1000
+        if delay > 0:
+            time.sleep(delay)
+        # Schedule from the ideal time so jitter doesn't accumulate into drift
+        self._next_due = max(self._next_due + 1.0 / self.fps, now)
+
+    @abc.abstractmethod
+    def _next_frame(self, out=None):
+        """The next frame (written into `out` when possible), or None at the end"""
+
+    @staticmethod
+    def _copy_into(frame, out):
+        if out is not None and out.shape == frame.shape and out.dtype == frame.dtype:
+            np.copyto(out, frame)
+            return out
+        return frame.copy()
+
+
+class ReplaySource(FrameSource):
+    def __init__(self, path, fps=0, loop=True, jitter_ms=0.0, size=None, seed=None):
+        """
+        path: video file, directory of images or glob pattern
+        fps: 0 plays at the recording's native rate (30 for image sequences)
+        size: (w, h) to resize frames to, e.g. to match the real camera
+        """
+        self.path = path
+        self.loop = loop
+        self.size = tuple(size) if size else None
+        self.video = None
+        self.images = []
+        self._index = 0
+
+        if os.path.isdir(path):
+            self.images = sorted(p for p in glob.glob(os.path.join(path, '*'))
+                                 if p.lower().endswith(IMAGE_EXTENSIONS))
+        elif any(ch in path for ch in '*?['):
+            self.images = sorted(glob.glob(path))
+        elif os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+            self.images = [path]
+        else:
+            self.video = cv2.VideoCapture(path)
+
+        native_fps = 30.0
+        if self.video is not None:
+            native_fps = self.video.get(cv2.CAP_PROP_FPS) or 30.0
+        super().__init__(fps or native_fps, jitter_ms, seed)
+
+        if self.video is not None:
+            self._opened = self.video.isOpened()
+        else:
+            # Decode once; replaying the sequence shouldn't be disk-bound
+            self.images = [self._fit(cv2.imread(p)) for p in self.images]
+            self.images = [img for img in self.images if img is not None]
+            self._opened = bool(self.images)
+        if not self._opened:
+            logger.error(f"❌ Replay source has no frames: {path}")
+
+    def _fit(self, frame):
+        if frame is not None and self.size and (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return frame
+
+    def _next_frame(self, out=None):
+        if self.video is not None:
+            ret, frame = self.video.read(None if self.size else out)
+            if not ret and self.loop:
+                self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.video.read(None if self.size else out)
+            return self._fit(frame) if ret else None
+
+        if self._index >= len(self.images):
+            if not self.loop:
+                return None
+            self._index = 0
+        frame = self.images[self._index]
+        self._index += 1
+        return self._copy_into(frame, out)  # Callers may draw on frames
+
+    def release(self):
+        super().release()
+        if self.video is not None:
+            self.video.release()
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames: noisy backdrop plus a face that comes and goes from the guide"""
+
+    def __init__(self, width=1280, height=720, fps=30.0, jitter_ms=0.0, face=True,
+                 noise=8, cycle_seconds=8.0, seed=0):
+        super().__init__(fps, jitter_ms, seed)
+        self.width = width
+        self.height = height
+        self.face = face
+        self.cycle_seconds = cycle_seconds
+        self.noise = noise
+        self.np_random = np.random.default_rng(seed)
+
+        gradient = np.linspace(60, 190, width, dtype=np.uint8)
+        self.background = np.dstack([np.tile(gradient, (height, 1))] * 3)
+        self.background[..., 0] = 150  # Blue-ish venue wall
+        self._noise = [self.np_random.integers(0, noise + 1, self.background.shape, dtype=np.uint8)
+                       for _ in range(8)] if noise else []
+
+    def _next_frame(self, out=None):
+        frame = self._copy_into(self.background, out)
+        if self._noise:
+            cv2.add(frame, self._noise[self.frames_read % len(self._noise)], dst=frame)
+        if self.face:
+            # Like a guest: walk in, hold still in the guide, walk out
+            # Unpaced sources still animate on a 30 FPS timeline
+            t = (self.frames_read / (self.fps or 30.0)) % self.cycle_seconds
+            walk = 1.5
+            if t < walk:
+                offset = 1 - t / walk
+            elif t > self.cycle_seconds - walk:
+                offset = -(t - self.cycle_seconds + walk) / walk
+            else:
+                offset = 0.0
+            sway = np.sin(t * 2.0) * 0.01
+            cx = int(self.width * (0.5 + 0.45 * offset + sway))
+            cy = int(self.height * (0.5 + sway))
+            draw_face(frame, cx, cy, int(min(self.width, self.height) * 0.2))
+        return frame
+
+
+def draw_face(frame, cx, cy, size):
+    """Cartoon face the Haar cascade picks up: skin oval, brows, eyes, nose, mouth"""
+    half_w, half_h = size // 2, int(size * 0.7)
+    cv2.ellipse(frame, (cx, cy - size // 3), (int(size * 0.62), size // 2), 0, 180, 360, (25, 30, 40), -1)
+    cv2.ellipse(frame, (cx, cy), (half_w, half_h), 0, 0, 360, (150, 180, 224), -1)
+    for dx in (-size // 5, size // 5):
+        cv2.rectangle(frame, (cx + dx - size // 8, cy - int(size * 0.34)),
+                      (cx + dx + size // 8, cy - int(size * 0.30)), (25, 35, 50), -1)
+        cv2.ellipse(frame, (cx + dx, cy - size // 5), (size // 11, size // 20), 0, 0, 360, (250, 250, 250), -1)
+        cv2.circle(frame, (cx + dx, cy - size // 5), size // 25, (10, 20, 30), -1)
+    nose = np.array([[cx, cy - size // 10], [cx - size // 14, cy + size // 7], [cx + size // 14, cy + size // 7]])
+    cv2.fillPoly(frame, [nose], (128, 153, 190))
+    cv2.ellipse(frame, (cx, cy + size // 4), (size // 5, size // 9), 0, 0, 180, (50, 50, 150), -1)
+    return frame
+
+
+def create_source(settings):
+    """
+    Build the configured virtual source
+    Returns: source object, or None for a physical device
+    """
+    kind = settings.get('camera.source', 'device')
+    # Same frame size the physical camera is opened at
+    width, height = settings.get('camera.virtual_resolution', [1280, 720])
+    jitter = settings.get('camera.jitter_ms', 0)
+
+    if kind == 'replay':
+        path = settings.get('camera.replay_path')
+        if not path:
+            raise ValueError("camera.source is 'replay' but camera.replay_path is not set")
+        logger.info(f"🎞️ Replaying camera frames from {path}")
+        return ReplaySource(path, fps=settings.get('camera.replay_fps', 0),
+                            loop=settings.get('camera.replay_loop', True),
+                            jitter_ms=jitter, size=(width, height))
+    if kind == 'synthetic':
+        logger.info("🧪 Using synthetic camera frames")
+        return SyntheticSource(width, height, fps=settings.get('camera.fps', 30), jitter_ms=jitter)
+    if kind != 'device':
+        raise ValueError(f"Unknown camera source: {kind}")
+    return None
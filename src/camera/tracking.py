@@ -0,0 +1,73 @@
+"""
+Smoothed face tracking for auto-capture
+
+The preview detector jitters: boxes shift by a few pixels between frames
+and a face is missed now and then, more so when detection runs at a
+reduced rate. FaceTracker keeps an exponentially smoothed face center and
+size, holds it through short misses, and decides "in the guide" with
+hysteresis. Auto-capture then waits on wall-clock dwell time in the guide
+rather than on a count of frames or UI ticks.
+"""
+
+import time
+
+
+class FaceTracker:
+    def __init__(self, smoothing=0.5, grace_seconds=0.4, enter=1 / 3, leave=0.45):
+        """
+        smoothing: weight of each new detection (1.0 = no smoothing)
+        grace_seconds: how long a face may go undetected before it's lost
+        enter/leave: distance from the frame center, as a fraction of the guide
+        radius, at which the face enters and leaves the guide
+        """
+        self.smoothing = smoothing
+        self.grace_seconds = grace_seconds
+        self.enter = enter
+        self.leave = leave
+        self.reset()
+
+    def reset(self):
+        self.face = None  # Smoothed (cx, cy, size)
+        self.last_seen = 0.0
+        self.in_guide = False
+        self.aligned_since = None
+
+    def update(self, faces, shape, now=None):
+        """Feed one detection pass (boxes as x, y, w, h) for a frame of `shape`"""
+        now = now or time.perf_counter()
+        h, w = shape[:2]
+        if len(faces):
+            centers = [(x + fw / 2, y + fh / 2, fw) for (x, y, fw, fh) in faces]
+            if self.face is None:
+                # New guest: start from the largest face
+                self.face = max(centers, key=lambda face: face[2])
+            else:
+                # Follow the face nearest the current estimate
+                cx, cy, _ = self.face
+                nearest = min(centers, key=lambda f: (f[0] - cx) ** 2 + (f[1] - cy) ** 2)
+                a = self.smoothing
+                self.face = tuple(a * new + (1 - a) * old for new, old in zip(nearest, self.face))
+            self.last_seen = now
+        elif self.face is not None and now - self.last_seen > self.grace_seconds:
+            self.face = None
+
+        if self.face is None:
+            inside = False
+        else:
+            guide_radius = min(h, w) // 3
+            dist = ((self.face[0] - w / 2) ** 2 + (self.face[1] - h / 2) ** 2) ** 0.5
+            limit = self.leave if self.in_guide else self.enter
+            inside = dist < guide_radius * limit
+
+        if inside and not self.in_guide:
+            self.aligned_since = now
+        elif not inside:
+            self.aligned_since = None
+        self.in_guide = inside
+
+    def dwell(self, now=None):
+        """Seconds the face has stayed in the guide, 0 when it isn't there"""
+        since = self.aligned_since  # Written by the camera thread
+        if since is None:
+            return 0.0
+        return (now or time.perf_counter()) - since
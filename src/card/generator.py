@@ -1,27 +1,85 @@
 import os
+import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import threading
+import time
+import numpy as np
 from PIL import Image
-from rembg import remove
+
+from src.ai import workers
+from src.utils import telemetry
+from src.utils.logger import get_logger
+
+logger = get_logger("card")
+
+PLACEHOLDER_RE = re.compile(r'\{\{([A-Z_]+)\}\}')
+
+
+def compile_template(html):
+    """Split a template into literal text (even items) and placeholder names (odd items)"""
+    return tuple(PLACEHOLDER_RE.split(html))
+
+
+def render_template(compiled, values):
+    """Fill a compiled template; unknown placeholders are left as they were"""
+    return ''.join(
+        part if i % 2 == 0 else values.get(part, f"{{{{{part}}}}}")
+        for i, part in enumerate(compiled)
+    )
+
 
 class CardGenerator:
     def __init__(self):
         self.template_path = Path('src/data/templates/index.html')
         self.output_dir = Path('output/cards')
         self.temp_img_dir = Path('output/cards/images')
+        self.template = None # Compiled on first card, swapped by hot reload
+        
+        # rembg (onnxruntime) is heavy, so the session is created on first use
+        self._session = None
+        self._session_lock = threading.Lock()
         
         # Ensure directories exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.temp_img_dir.mkdir(parents=True, exist_ok=True)
 
-    def generate_card(self, user_photo_path, player_data, stats):
+    def warm_up(self):
+        """Import rembg and load the segmentation model ahead of the first guest"""
+        self._get_session()
+
+    def _get_session(self):
+        with self._session_lock:
+            if self._session is None:
+                from rembg import new_session
+                self._session = new_session()
+            return self._session
+
+    def load_template(self, template_path=None):
+        """Read and compile the HTML card template"""
+        with open(template_path or self.template_path, 'r', encoding='utf-8') as f:
+            return compile_template(f.read())
+
+    def remove_background(self, img):
+        """Cut the subject out of a PIL image on an ML worker, or the shared rembg session"""
+        pool = workers.get_pool()
+        if pool is not None:
+            try:
+                return Image.fromarray(pool.remove_background(np.asarray(img)), "RGBA")
+            except workers.WorkerError as e:
+                logger.warning(f"⚠️ Segmentation worker failed, removing in-process: {e}")
+        from rembg import remove
+        return remove(img, session=self._get_session())
+
+    def generate_card(self, user_photo_path, player_data, stats, output_filename="current_card.html"):
         """
         Generate FIFA card as HTML file with animations
         Returns: Path to the generated HTML file
         """
         try:
             # 1. Process User Image (Remove Background)
-            print("🎨 Removing background...")
+            logger.info("🎨 Removing background...")
             # process_user_face already saves to output/cards/images/
             final_img_path = Path(self.process_user_face(user_photo_path))
             
@@ -31,42 +89,82 @@ class CardGenerator:
             img_filename = final_img_path.name
             rel_path = f"images/{img_filename}"
             
-            # 2. Read HTML Template
-            with open(self.template_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
+            # 2. Compiled HTML Template (read once, replaced on hot reload)
+            template = self.template
+            if template is None:
+                template = self.template = self.load_template()
             
             # 3. Replace Placeholders
             replacements = {
-                '{{NAME}}': player_data.get('name', 'PLAYER'),
-                '{{OVR}}': str(stats.get('OVR', 99)),
-                '{{POSITION}}': player_data.get('position', 'ST'),
-                '{{IMAGE_PATH}}': rel_path,  # Simple relative path usually works best
+                'NAME': player_data.get('name', 'PLAYER'),
+                'OVR': str(stats.get('OVR', 99)),
+                'POSITION': player_data.get('position', 'ST'),
+                'IMAGE_PATH': rel_path,  # Simple relative path usually works best
                 # Stats
-                '{{PAC}}': str(stats.get('PAC', 99)),
-                '{{SHO}}': str(stats.get('SHO', 99)),
-                '{{PAS}}': str(stats.get('PAS', 99)),
-                '{{DRI}}': str(stats.get('DRI', 99)),
-                '{{DEF}}': str(stats.get('DEF', 99)),
-                '{{PHY}}': str(stats.get('PHY', 99))
+                'PAC': str(stats.get('PAC', 99)),
+                'SHO': str(stats.get('SHO', 99)),
+                'PAS': str(stats.get('PAS', 99)),
+                'DRI': str(stats.get('DRI', 99)),
+                'DEF': str(stats.get('DEF', 99)),
+                'PHY': str(stats.get('PHY', 99))
             }
             
-            for key, value in replacements.items():
-                html_content = html_content.replace(key, value)
-            
-            # 4. Save HTML File (Always overwrite current_card.html)
-            output_filename = "current_card.html"
-            output_path = self.output_dir / output_filename
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            with telemetry.span(telemetry.TEMPLATE_RENDER):
+                html_content = render_template(template, replacements)
+                
+                # 4. Save HTML File (current_card.html unless a group card)
+                output_path = self.output_dir / output_filename
+                
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(html_content)
                 
-            print(f"✅ Card generated at: {output_path}")
+            logger.info(f"✅ Card generated at: {output_path}")
             return str(output_path.resolve())
 
         except Exception as e:
-            print(f"❌ Error generating card: {e}")
+            logger.error(f"❌ Error generating card: {e}")
             raise e
 
+    def generate_cards(self, photo_path, subjects, max_workers=None):
+        """
+        Generate one card per person in a group photo, concurrently
+        subjects: list of {'box': (x, y, w, h), 'player_data': ..., 'stats': ...}
+        Returns: list of HTML paths in the same order as subjects
+        """
+        if not subjects:
+            return []
+
+        n_workers = max_workers or min(len(subjects), os.cpu_count() or 1)
+        stem = Path(photo_path).stem
+
+        def render(index, subject):
+            crop_path = self.crop_subject(photo_path, subject['box'], index)
+            return self.generate_card(
+                crop_path, subject['player_data'], subject['stats'],
+                output_filename=f"card_{stem}_{index + 1}.html"
+            )
+
+        logger.info(f"👥 Generating {len(subjects)} cards with {n_workers} workers")
+        with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="card") as pool:
+            futures = [pool.submit(render, i, subject) for i, subject in enumerate(subjects)]
+            return [future.result() for future in futures]
+
+    def crop_subject(self, image_path, box, index):
+        """Crop head and shoulders around a face box so each person gets a selfie-like photo"""
+        img = Image.open(image_path)
+        x, y, w, h = box
+
+        # Leave room for hair above and shoulders below the face
+        left = max(0, int(x - w * 0.8))
+        right = min(img.width, int(x + w * 1.8))
+        top = max(0, int(y - h * 0.7))
+        bottom = min(img.height, int(y + h * 2.3))
+
+        source = Path(image_path)
+        crop_path = source.with_name(f"{source.stem}_face{index + 1}{source.suffix}")
+        img.crop((left, top, right, bottom)).save(crop_path)
+        return str(crop_path)
+
     def process_user_face(self, image_path):
         """Remove background and composite with jersey"""
         try:
@@ -78,13 +176,15 @@ class CardGenerator:
             output_path = output_path.with_suffix('.png') 
             
             # 1. Remove background
-            print("🎨 Removing background...")
-            img_no_bg = remove(img)
+            logger.info("🎨 Removing background...")
+            with telemetry.span(telemetry.BACKGROUND_REMOVAL):
+                img_no_bg = self.remove_background(img)
             
             # 2. Composite with Jersey
+            composite_started = time.perf_counter()
             jersey_path = 'src/assets/jersey.png'
             if os.path.exists(jersey_path):
-                print("👕 Applying Jersey...")
+                logger.info("👕 Applying Jersey...")
                 jersey = Image.open(jersey_path).convert("RGBA")
                 
                 # Resize user to fit nicely behind the jersey
@@ -117,11 +217,12 @@ class CardGenerator:
                 
                 final_comp.save(output_path, "PNG")
             else:
-                print("⚠️ Jersey template not found, using raw cutout")
+                logger.warning("⚠️ Jersey template not found, using raw cutout")
                 img_no_bg.save(output_path, "PNG")
+            telemetry.observe(telemetry.COMPOSITING, time.perf_counter() - composite_started)
             
             return str(output_path)
         except Exception as e:
-            print(f"Bg removal/Composite failed: {e}")
+            logger.error(f"Bg removal/Composite failed: {e}")
             return image_path # Fallback
 
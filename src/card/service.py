@@ -0,0 +1,331 @@
+"""
+Render service shared by several booth stations
+
+One machine runs the service with warmed segmentation/gender models and a
+worker pool; kiosks post card jobs over HTTP and receive the finished card
+HTML plus its composited image. A kiosk falls back to local generation
+whenever the service is unreachable, busy or errors (see RenderClient).
+
+API (JSON bodies, images base64-encoded):
+    POST /cards   {photo, photo_name, player_data, stats} -> {html, image_name, image}
+    POST /faces   {photo, photo_name}                      -> {faces: [...]}
+    GET  /status  queue depth, workers and per-job latency percentiles
+
+The service listens on 127.0.0.1 unless a host is configured. Listening
+on any other address also needs `render_service.token`: every request
+must then carry it in the X-Render-Token header, which RenderClient does.
+
+Run: python -m src.card.service [--host 0.0.0.0 --token SECRET] [--port 8765] [--workers 2]
+"""
+
+import argparse
+import base64
+import hmac
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.utils import telemetry
+from src.utils.config import get_settings
+from src.utils.logger import get_logger, log_event, setup_logger
+
+logger = get_logger("card.service")
+
+RENDER_JOB = 'render_job'
+TOKEN_HEADER = 'X-Render-Token'
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+class RenderServiceError(Exception):
+    """The service could not be reached or could not render the job"""
+
+
+class RenderService:
+    def __init__(self, workers=2, max_queue=16, work_dir=None):
+        from src.ai.gender_detection import GenderDetector
+        from src.card.generator import CardGenerator
+
+        self.work_dir = Path(work_dir or tempfile.mkdtemp(prefix="fifa_render_"))
+        self.generator = CardGenerator()
+        self.generator.output_dir = self.work_dir
+        self.generator.temp_img_dir = self.work_dir / "images"
+        self.generator.temp_img_dir.mkdir(parents=True, exist_ok=True)
+        self.detector = GenderDetector()
+
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+        self.latency = telemetry.StageHistogram()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._server = None
+
+    def warm_up(self):
+        """Load the segmentation and gender models before taking jobs"""
+        try:
+            self.generator.warm_up()
+        except Exception as e:
+            logger.warning(f"⚠️ Segmentation warm-up failed: {e}")
+        self.detector.warm_up()
+
+    def status(self):
+        summary = self.latency.summary()
+        return {
+            'workers': self.workers,
+            'queue_depth': self._queued,
+            'max_queue': self.max_queue,
+            'jobs': summary['count'],
+            'latency_ms': {f"p{int(q * 100)}": round(v * 1000, 1)
+                           for q, v in summary['quantiles'].items()},
+        }
+
+    def submit(self, fn, *args):
+        """Run fn on the pool; raises ServiceBusy when the queue is full"""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                raise ServiceBusy(f"{self._queued} jobs queued")
+            self._queued += 1
+        started = time.perf_counter()
+        try:
+            return self.pool.submit(fn, *args).result()
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._queued -= 1
+            self.latency.observe(elapsed)
+            telemetry.observe(RENDER_JOB, elapsed)
+
+    def render_card(self, job):
+        job_id = next(self._ids)
+        photo_path = self._save_photo(job, job_id)
+        try:
+            html_path = Path(self.generator.generate_card(
+                str(photo_path), job['player_data'], job['stats'],
+                output_filename=f"card_{job_id}.html"
+            ))
+            image_path = self.generator.temp_img_dir / f"nobg_{photo_path.stem}.png"
+            if not image_path.exists():
+                image_path = photo_path  # Segmentation failed, card shows the raw photo
+            result = {
+                'html': html_path.read_text(encoding='utf-8'),
+                'image_name': image_path.name,
+                'image': base64.b64encode(image_path.read_bytes()).decode('ascii'),
+            }
+            html_path.unlink()
+            if image_path != photo_path:
+                image_path.unlink()
+            return result
+        finally:
+            photo_path.unlink(missing_ok=True)
+
+    def detect_faces(self, job):
+        photo_path = self._save_photo(job, next(self._ids))
+        try:
+            return {'faces': self.detector.detect_faces(str(photo_path))}
+        finally:
+            photo_path.unlink(missing_ok=True)
+
+    def _save_photo(self, job, job_id):
+        suffix = Path(job.get('photo_name', 'photo.jpg')).suffix or '.jpg'
+        photo_path = self.work_dir / f"job{job_id}_{Path(job.get('photo_name', 'photo')).stem}{suffix}"
+        photo_path.write_bytes(base64.b64decode(job['photo']))
+        return photo_path
+
+    def serve(self, host='127.0.0.1', port=8765, token=None):
+        """Start answering HTTP requests on a background thread"""
+        if host not in LOOPBACK_HOSTS and not token:
+            raise ValueError(f"Serving on {host} needs render_service.token")
+        service = self
+        expected = token.encode('utf-8') if token else None
+
+        class Handler(BaseHTTPRequestHandler):
+            def _authorized(self):
+                if expected is None:
+                    return True
+                given = self.headers.get(TOKEN_HEADER, '').encode('utf-8')
+                if hmac.compare_digest(given, expected):
+                    return True
+                self._reply(401, {'error': 'unauthorized'})
+                return False
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                if self.path == '/status':
+                    self._reply(200, service.status())
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                routes = {'/cards': service.render_card, '/faces': service.detect_faces}
+                handler = routes.get(self.path)
+                if handler is None:
+                    self._reply(404, {'error': 'not found'})
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    job = json.loads(self.rfile.read(length))
+                    self._reply(200, service.submit(handler, job))
+                except ServiceBusy as e:
+                    self._reply(503, {'error': str(e)})
+                except Exception as e:
+                    logger.error(f"❌ Render job failed: {e}")
+                    self._reply(500, {'error': str(e)})
+
+            def _reply(self, code, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="render-http",
+                         daemon=True).start()
+        logger.info(f"🖥️ Render service on {host}:{self._server.server_port} "
+                    f"with {self.workers} workers")
+        return self._server
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+class RenderClient:
+    """Kiosk side: sends jobs to the render service and writes the results locally"""
+
+    def __init__(self, url, timeout=30.0, output_dir='output/cards', token=None):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.token = token
+        self.output_dir = Path(output_dir)
+        self.images_dir = self.output_dir / "images"
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+
+    def _request(self, path, payload=None, timeout=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers[TOKEN_HEADER] = self.token
+        request = urllib.request.Request(f"{self.url}{path}", data=data, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise RenderServiceError(f"{path}: HTTP {e.code}") from e
+        except (OSError, ValueError) as e:
+            raise RenderServiceError(f"{path}: {e}") from e
+
+    def status(self):
+        return self._request('/status', timeout=2)
+
+    def _photo_payload(self, photo_path):
+        with open(photo_path, 'rb') as f:
+            return {'photo': base64.b64encode(f.read()).decode('ascii'),
+                    'photo_name': os.path.basename(photo_path)}
+
+    def generate_card(self, photo_path, player_data, stats, output_filename="current_card.html"):
+        """Same contract as CardGenerator.generate_card; raises RenderServiceError"""
+        started = time.perf_counter()
+        payload = self._photo_payload(photo_path)
+        payload.update(player_data=player_data, stats=stats)
+        result = self._request('/cards', payload)
+
+        (self.images_dir / result['image_name']).write_bytes(base64.b64decode(result['image']))
+        output_path = self.output_dir / output_filename
+        output_path.write_text(result['html'], encoding='utf-8')
+
+        elapsed = time.perf_counter() - started
+        telemetry.observe('render_remote', elapsed)
+        log_event("render_remote", seconds=round(elapsed, 3), card=output_filename)
+        return str(output_path.resolve())
+
+    def generate_cards(self, photo_path, subjects, crop_subject):
+        """Group photo: crop locally, render every face on the service in parallel"""
+        stem = Path(photo_path).stem
+
+        def render(index, subject):
+            crop_path = crop_subject(photo_path, subject['box'], index)
+            return self.generate_card(crop_path, subject['player_data'], subject['stats'],
+                                      output_filename=f"card_{stem}_{index + 1}.html")
+
+        with ThreadPoolExecutor(max_workers=max(1, len(subjects))) as pool:
+            futures = [pool.submit(render, i, subject) for i, subject in enumerate(subjects)]
+            return [future.result() for future in futures]
+
+    def detect_faces(self, photo_path):
+        return self._request('/faces', self._photo_payload(photo_path))['faces']
+
+
+def create_client():
+    """RenderClient for `render_service.url`, or None when the service isn't configured"""
+    settings = get_settings()
+    url = settings.get('render_service.url')
+    if not url:
+        return None
+    client = RenderClient(url, settings.get('render_service.timeout_seconds', 30),
+                          settings.get('paths.generated_cards', 'output/cards'),
+                          settings.get('render_service.token') or None)
+    try:
+        status = client.status()
+        logger.info(f"🖥️ Render service at {url}: {status['workers']} workers, "
+                    f"{status['queue_depth']} queued")
+    except RenderServiceError as e:
+        logger.warning(f"⚠️ Render service not reachable yet: {e}")
+    return client
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Card render service for booth stations")
+    parser.add_argument('--host', default=settings.get('render_service.host', '127.0.0.1'))
+    parser.add_argument('--token', default=settings.get('render_service.token') or None,
+                        help="Shared secret; required when the host is not loopback")
+    parser.add_argument('--port', type=int, default=settings.get('render_service.port', 8765))
+    parser.add_argument('--workers', type=int, default=settings.get('render_service.workers', 2))
+    parser.add_argument('--max-queue', type=int, default=settings.get('render_service.max_queue', 16))
+    args = parser.parse_args()
+    if args.host not in LOOPBACK_HOSTS and not args.token:
+        parser.error(f"--host {args.host} exposes the service to the network; set --token too")
+
+    setup_logger()
+    service = RenderService(args.workers, args.max_queue)
+    service.warm_up()
+    service.serve(args.host, args.port, args.token)
+    try:
+        while True:
+            # Periodic queue report for whoever watches the service console
+            time.sleep(60)
+            log_event("render_service", **service.status())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+SQLite player database for FIFA Photo Booth
+
+players.json stays the hand-edited seed; the booth reads and appends to
+players.db, which is indexed on gender/position/club and written one row
+per transaction so a crash never leaves a half-written roster.
+
+Import manually: python -m src.data.player_store [--json PATH] [--replace]
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from src.utils.logger import get_logger, setup_logger
+
+logger = get_logger("player_store")
+
+DB_PATH = Path('src/data/players.db')
+JSON_PATH = Path('src/data/players.json')
+
+GENDER_KEYS = {'male': 'male_players', 'female': 'female_players'}
+COLUMNS = ('id', 'name', 'position', 'country', 'club', 'base_stats', 'image')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    gender TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position TEXT,
+    country TEXT,
+    club TEXT,
+    base_stats TEXT NOT NULL,
+    image TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_players_gender_position ON players(gender, position);
+CREATE INDEX IF NOT EXISTS idx_players_position ON players(position);
+CREATE INDEX IF NOT EXISTS idx_players_club ON players(club);
+"""
+
+
+class PlayerStore:
+    def __init__(self, path=DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        self.conn = sqlite3.connect(str(self.path), isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def count(self, gender=None):
+        with self._lock:
+            if gender is None:
+                row = self.conn.execute("SELECT COUNT(*) FROM players").fetchone()
+            else:
+                row = self.conn.execute(
+                    "SELECT COUNT(*) FROM players WHERE gender = ?", (gender,)
+                ).fetchone()
+        return row[0]
+
+    def query(self, gender=None, position=None, club=None):
+        """Players matching every given filter, ordered by id"""
+        clauses, params = [], []
+        for column, value in (('gender', gender), ('position', position), ('club', club)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        sql = "SELECT * FROM players"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._row_to_player(row) for row in rows]
+
+    def load_players_data(self):
+        """Whole roster in the players.json shape"""
+        data = {key: [] for key in GENDER_KEYS.values()}
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM players ORDER BY id").fetchall()
+        for row in rows:
+            key = GENDER_KEYS.get(row['gender'])
+            if key:
+                data[key].append(self._row_to_player(row))
+        return data
+
+    def add_player(self, player, gender):
+        """
+        Insert one player atomically; SQLite allocates the id from the
+        primary key index when the player has none
+        Returns: the stored player dict including its id
+        """
+        values = self._player_to_row(player, gender)
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self.conn.execute(
+                    "INSERT INTO players (id, gender, name, position, country, club,"
+                    " base_stats, image, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    values
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        stored = dict(player)
+        stored['id'] = cursor.lastrowid
+        return stored
+
+    def import_json(self, json_path=JSON_PATH, replace=False):
+        """One-shot import of players.json; replace=True drops the current roster first"""
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        rows = [
+            self._player_to_row(player, gender)
+            for gender, key in GENDER_KEYS.items()
+            for player in data.get(key, [])
+        ]
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if replace:
+                    self.conn.execute("DELETE FROM players")
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO players (id, gender, name, position, country,"
+                    " club, base_stats, image, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        logger.info(f"✅ Imported {len(rows)} players from {json_path}")
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    @staticmethod
+    def _player_to_row(player, gender):
+        extra = {k: v for k, v in player.items() if k not in COLUMNS}
+        return (
+            player.get('id'),
+            gender,
+            player['name'],
+            player.get('position'),
+            player.get('country'),
+            player.get('club'),
+            json.dumps(player.get('base_stats', {})),
+            player.get('image'),
+            json.dumps(extra) if extra else None,
+        )
+
+    @staticmethod
+    def _row_to_player(row):
+        player = {column: row[column] for column in COLUMNS}
+        player['base_stats'] = json.loads(row['base_stats'])
+        if row['extra']:
+            player.update(json.loads(row['extra']))
+        return player
+
+
+def open_player_store(db_path=DB_PATH, json_path=JSON_PATH):
+    """Open players.db, seeding it from players.json the first time"""
+    store = PlayerStore(db_path)
+    if store.count() == 0 and Path(json_path).exists():
+        store.import_json(json_path)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import players.json into players.db")
+    parser.add_argument('--json', default=str(JSON_PATH))
+    parser.add_argument('--db', default=str(DB_PATH))
+    parser.add_argument('--replace', action='store_true',
+                        help="drop existing players before importing")
+    args = parser.parse_args()
+
+    setup_logger()
+    store = PlayerStore(args.db)
+    store.import_json(args.json, replace=args.replace)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
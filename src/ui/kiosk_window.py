@@ -1,36 +1,311 @@
 import sys
 import os
+import json
+import queue
+import time
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton,
     QLabel, QStackedWidget, QHBoxLayout, QFrame, QLineEdit, QComboBox,
     QSizePolicy
 )
-from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, Slot, QSize
+from PySide6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, Slot, QSize, Signal
 from PySide6.QtGui import QFont, QPixmap, QColor, QImage
-from PySide6.QtMultimedia import QSoundEffect
 
-from src.camera.capture import CameraManager
-from src.card.generator import CardGenerator
+from src.data.player_store import JSON_PATH as PLAYERS_JSON_PATH
+from src.ui.session import Session, SessionPipeline
+from src.utils.config import SETTINGS_PATH, Settings, get_settings, replace_settings
+from src.utils.hot_reload import ReloadManager
+from src.utils.logger import get_logger, setup_logger
+from src.utils.memory import create_watchdog
 from src.utils.player_selector import PlayerSelector
-from src.ai.gender_detection import GenderDetector
-from src.utils.printer import CardPrinter
+from src.utils import telemetry
+from src.utils.startup import StartupTimeline, WarmupManager
+
+logger = get_logger("ui")
+
+
+PRINT_STATUS_TEXT = {
+    'waiting': "🖨️ VARAQ TO'LISHI KUTILMOQDA / ЖДЁМ ЗАПОЛНЕНИЯ ЛИСТА",
+    'queued': "🖨️ NAVBATDA / В ОЧЕРЕДИ",
+    'printing': "🖨️ CHOP ETILMOQDA... / ПЕЧАТЬ...",
+    'retrying': "🖨️ QAYTA URINISH... / ПОВТОР...",
+    'done': "✅ TAYYOR! / ГОТОВО!",
+    'failed': "❌ CHOP ETIB BO'LMADI / ОШИБКА ПЕЧАТИ",
+}
+
+SESSION_STATUS_ICON = {
+    Session.CAPTURED: "⏳",
+    Session.GENERATING: "⏳",
+    Session.READY: "✅",
+    Session.PRINTING: "🖨️",
+    Session.FAILED: "❌",
+}
+
+# Read once when their objects are built; a reload that changes them only logs a warning.
+# Everything else is read per use or passed on by _apply_settings
+RESTART_ONLY_SETTINGS = (
+    'camera.burst_seconds', 'camera.burst_frames', 'live_cutout',
+    'ai.face_detection_backend', 'ai.face_detection_model', 'ai.face_detection_score',
+    'ai.face_detection_input_width', 'ai.player_selection', 'ai.embedding_index',
+    'printing.backend', 'printing.paper_size', 'printing.printer_name', 'printing.raster_cache_mb',
+    'session', 'ml_workers', 'render_service', 'export', 'memory', 'telemetry',
+)
 
 
 class KioskWindow(QMainWindow):
-    def __init__(self):
+    # Emitted from the print spooler thread, delivered on the GUI thread
+    print_status_changed = Signal(object)
+    # Emitted from session render workers
+    session_updated = Signal(object)
+
+    def __init__(self, timeline=None):
         super().__init__()
-        self.camera_manager = CameraManager()
-        self.card_generator = CardGenerator()
+        # Heavy managers (cv2, rembg, DeepFace, win32) are built by warm-up
+        # tasks after the first paint; see _start_warmup
+        self.timeline = timeline or StartupTimeline()
+        self.warmup = WarmupManager(self.timeline)
+        self._warmup_started = False
+        self._first_paint_done = False
+        self._webengine_ready = False
         self.player_selector = PlayerSelector()
-        self.gender_detector = GenderDetector()
-        self.printer = CardPrinter()
+        
+        # Players, card template and settings reload between sessions
+        self.reloader = ReloadManager()
+        self.reloader.watch('players', [PLAYERS_JSON_PATH], self._reload_players, self._apply_players)
+        self.reloader.watch('settings', [SETTINGS_PATH], Settings, self._apply_settings)
         
         self.current_language = "uz" # Default language
         self.current_card_path = None
-        self.alignment_counter = 0 # To track how long face is aligned
+        self.card_paths = [] # One card per person in group photos
+        self.card_index = 0
+        self.card_snapshots = {}  # Card HTML -> printed PNG, for the guest on screen
+        self.current_print_job_id = None
+        self._card_load_started = None # For the WebEngine load span
+        self._auto_captured = False # Auto-capture fired for the current guest
+        self.auto_capture_delay = get_settings().get('camera.capture_delay_ms', 1000) / 1000
+        self.preview_buffers = None # Scaled preview frames, reused every tick
+        self.memory = create_watchdog()
+        
+        # Overlapped sessions: cards render in the background while the next guest captures
+        self.current_session = None
+        self.pipeline = None
+        settings = get_settings()
+        if settings.get('session.overlap', False):
+            self.pipeline = SessionPipeline(
+                self._render_session, self.session_updated.emit,
+                max_pending=settings.get('session.max_pending', 3),
+                workers=settings.get('session.render_workers', 1),
+                retries=settings.get('session.render_retries', 1),
+                failure_display_seconds=settings.get('session.failure_display_seconds', 60)
+            )
         
         self.setup_ui()
+        self.print_status_changed.connect(self._on_print_status)
+        self.session_updated.connect(self._on_session_update)
         self.setup_animations()
+
+    # Warmed-up managers; block only if a guest gets ahead of the warm-up
+    @property
+    def camera_manager(self):
+        return self._warmed('camera_manager')
+
+    @property
+    def card_generator(self):
+        return self._warmed('card_generator')
+
+    @property
+    def gender_detector(self):
+        return self._warmed('gender_detector')
+
+    @property
+    def printer(self):
+        return self._warmed('printer')
+
+    def _warmed(self, name):
+        self._start_warmup()
+        return self.warmup.get(name)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._first_paint_done:
+            self._first_paint_done = True
+            # Runs once the event loop has painted the home screen
+            QTimer.singleShot(0, self._on_first_paint)
+
+    def closeEvent(self, event):
+        # Cards waiting on a multi-up sheet or in the print queue go out before exit
+        if self.warmup.is_ready('printer'):
+            self.printer.shutdown()
+        super().closeEvent(event)
+
+    def _on_first_paint(self):
+        self.timeline.mark("first_paint")
+        self._start_warmup()
+        QTimer.singleShot(0, self._warm_webengine)
+        
+        self.reloader.start()
+        telemetry.start_telemetry()
+        self.reload_timer = QTimer(self)
+        self.reload_timer.timeout.connect(self._apply_pending_reloads)
+        self.reload_timer.start(1000)
+        
+        # Sampled on the GUI thread, where Qt object counts are safe to read
+        interval = get_settings().get('memory.sample_interval_seconds', 300)
+        if interval:
+            self.memory_timer = QTimer(self)
+            self.memory_timer.timeout.connect(self.memory.sample)
+            self.memory_timer.start(int(interval * 1000))
+
+    def _start_warmup(self):
+        """Build every heavy manager in parallel on background threads"""
+        if self._warmup_started:
+            return
+        self._warmup_started = True
+        self.warmup.submit('camera_manager', self._warm_camera)
+        self.warmup.submit('card_generator', self._warm_card_generator)
+        self.warmup.submit('gender_detector', self._warm_gender_detector)
+        self.warmup.submit('printer', self._warm_printer)
+        self.warmup.submit('lookalike', self._warm_lookalike)
+        self.warmup.submit('usb_exporter', self._warm_usb_exporter)
+        self.warmup.submit('render_client', self._warm_render_client)
+        self.warmup.submit('ml_workers', self._warm_ml_workers)
+
+    def _warm_camera(self):
+        self.timeline.timed_import('cv2')
+        capture = self.timeline.timed_import('src.camera.capture')
+        manager = capture.CameraManager()
+        manager.warm_up()
+        return manager
+
+    def _warm_card_generator(self):
+        generator_module = self.timeline.timed_import('src.card.generator')
+        generator = generator_module.CardGenerator()
+        self.reloader.watch('template', [generator.template_path],
+                            generator.load_template, self._apply_template)
+        if get_settings().get('render_service.url'):
+            return generator  # Cards render remotely; load rembg only if we fall back
+        if get_settings().get('ml_workers.enabled', False):
+            return generator  # Segmentation runs in the ML worker processes
+        try:
+            self.timeline.timed_import('rembg')
+            generator.warm_up()
+        except Exception as e:
+            logger.warning(f"⚠️ Segmentation warm-up failed: {e}")
+        return generator
+
+    def _warm_gender_detector(self):
+        detection = self.timeline.timed_import('src.ai.gender_detection')
+        detector = detection.GenderDetector()
+        if get_settings().get('ml_workers.enabled', False):
+            return detector  # DeepFace loads in the ML worker processes
+        try:
+            self.timeline.timed_import('deepface')
+        except Exception as e:
+            logger.warning(f"⚠️ DeepFace not available: {e}")
+        detector.warm_up()
+        return detector
+
+    def _warm_lookalike(self):
+        """Load the player embedding index and face model when lookalike mode is on"""
+        settings = get_settings()
+        if settings.get('ai.player_selection') != 'lookalike':
+            return None
+        embedding = self.timeline.timed_import('src.ai.face_embedding')
+        index = embedding.EmbeddingIndex.load(
+            settings.get('ai.embedding_index', str(embedding.INDEX_PATH))
+        )
+        embedder = embedding.FaceEmbedder(index.model_name)
+        embedder.warm_up()
+        return embedder, index
+
+    def _warm_printer(self):
+        printer_module = self.timeline.timed_import('src.utils.printer')
+        printer = printer_module.CardPrinter()
+        printer.spooler.add_listener(self.print_status_changed.emit)
+        return printer
+
+    def _warm_usb_exporter(self):
+        """Keep a plugged-in USB drive in sync with the generated cards"""
+        if not get_settings().get('export.auto_sync', False):
+            return None
+        export = self.timeline.timed_import('src.utils.usb_export')
+        exporter = export.create_exporter()
+        exporter.start()
+        return exporter
+
+    def _warm_render_client(self):
+        """Client for the shared render service, when one is configured"""
+        if not get_settings().get('render_service.url'):
+            return None
+        service = self.timeline.timed_import('src.card.service')
+        return service.create_client()
+
+    def _warm_ml_workers(self):
+        """Worker processes for segmentation and face inference, when enabled"""
+        workers = self.timeline.timed_import('src.ai.workers')
+        return workers.start_pool()
+
+    def _warm_webengine(self):
+        """Create the WebEngine view on the GUI thread so its profile is ready"""
+        if self._webengine_ready:
+            return
+        self._webengine_ready = True
+        try:
+            web_engine = self.timeline.timed_import('PySide6.QtWebEngineWidgets')
+            card_view = web_engine.QWebEngineView()
+            card_view.page().setBackgroundColor(Qt.transparent)
+            card_view.setObjectName("card_display")
+            card_view.loadFinished.connect(self._on_card_loaded)
+            # Loading a blank page spins up the profile and render process
+            card_view.setHtml("<html></html>")
+            self.result_layout.replaceWidget(self.card_display, card_view)
+            self.card_display.deleteLater()
+            self.card_display = card_view
+        except ImportError:
+            # Fallback (Should not happen if requirements correct)
+            self.card_display.setText("WebEngine Missing")
+        self.timeline.mark("ready:webengine")
+        self.warmup.on_all_done(self._on_fully_warm)
+
+    def _reload_players(self):
+        # Runs on the watcher thread: upsert the edited JSON and read the roster back
+        store = self.player_selector.store
+        if store is None:
+            with open(PLAYERS_JSON_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        store.import_json(PLAYERS_JSON_PATH)
+        return store.load_players_data()
+
+    def _apply_players(self, players_data):
+        # Same selector, so a player shown just before the reload still won't repeat
+        self.player_selector.replace_players(players_data)
+
+    def _apply_settings(self, settings):
+        """Swap in reloaded settings and hand them to objects that cached values at startup"""
+        previous = get_settings()
+        replace_settings(settings)
+        if self.warmup.is_ready('printer'):
+            self.printer.apply_settings(settings)
+        if self.warmup.is_ready('camera_manager'):
+            self.camera_manager.apply_settings(settings)
+        changed = [key for key in RESTART_ONLY_SETTINGS if previous.get(key) != settings.get(key)]
+        if changed:
+            logger.warning(f"⚠️ Settings changed that apply after a restart: {', '.join(changed)}")
+
+    def _apply_template(self, template):
+        self.card_generator.template = template
+
+    def _apply_pending_reloads(self):
+        """Swap in reloaded data, but only while no guest is mid-session"""
+        if self.stacked_widget.currentWidget() is not self.home_screen:
+            return
+        if self.reloader.has_pending():
+            applied = self.reloader.apply_pending()
+            logger.info(f"🔄 Reloaded: {', '.join(applied)}")
+
+    def _on_fully_warm(self):
+        self.timeline.mark("fully_warm")
+        self.timeline.report()
         
     def setup_ui(self):
         # Fullscreen kiosk mode
@@ -42,6 +317,13 @@ class KioskWindow(QMainWindow):
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
 
+        # Cards still rendering/printing for earlier guests (overlapped sessions)
+        self.pending_label = QLabel()
+        self.pending_label.setAlignment(Qt.AlignCenter)
+        self.pending_label.setStyleSheet("font-size: 22px; padding: 6px;")
+        self.pending_label.hide()
+        main_layout.addWidget(self.pending_label)
+
         # Stacked widget for different screens
         self.stacked_widget = QStackedWidget()
         main_layout.addWidget(self.stacked_widget)
@@ -163,7 +445,21 @@ class KioskWindow(QMainWindow):
         self.capture_btn = QPushButton("📸 SURATGA OLISH")
         self.capture_btn.clicked.connect(self.take_photo)
         
+        # Shown while the camera watchdog reopens a stalled device
+        self.camera_status_label = QLabel("KAMERA QAYTA ULANMOQDA...\nПЕРЕПОДКЛЮЧЕНИЕ КАМЕРЫ...")
+        self.camera_status_label.setAlignment(Qt.AlignCenter)
+        self.camera_status_label.setStyleSheet("""
+            color: white; 
+            font-size: 28px; 
+            font-weight: bold; 
+            background-color: rgba(200, 16, 46, 200);
+            padding: 16px;
+        """)
+        self.camera_status_label.hide()
+        self._camera_reconnecting = False
+        
         layout.addWidget(self.guide_label)
+        layout.addWidget(self.camera_status_label)
         layout.addWidget(self.video_label, 1)
         layout.addWidget(self.capture_btn)
         
@@ -186,19 +482,31 @@ class KioskWindow(QMainWindow):
     def create_result_screen(self):
         screen = QWidget()
         layout = QVBoxLayout(screen)
+        self.result_layout = layout
         
-        # Use Web View for animated HTML card
-        try:
-            from PySide6.QtWebEngineWidgets import QWebEngineView
-            self.card_display = QWebEngineView()
-            self.card_display.page().setBackgroundColor(Qt.transparent)
-        except ImportError:
-            # Fallback (Should not happen if requirements correct)
-            self.card_display = QLabel("WebEngine Missing")
-            self.card_display.setAlignment(Qt.AlignCenter)
-
+        # Placeholder until _warm_webengine swaps in the animated HTML view
+        self.card_display = QLabel()
+        self.card_display.setAlignment(Qt.AlignCenter)
         self.card_display.setObjectName("card_display")
         
+        # Paging for group photos (hidden for a single card)
+        nav_layout = QHBoxLayout()
+        self.prev_card_btn = QPushButton("◀")
+        self.prev_card_btn.clicked.connect(lambda: self.page_card(-1))
+        self.card_page_label = QLabel()
+        self.card_page_label.setAlignment(Qt.AlignCenter)
+        self.card_page_label.setStyleSheet("font-size: 28px;")
+        self.next_card_btn = QPushButton("▶")
+        self.next_card_btn.clicked.connect(lambda: self.page_card(1))
+        
+        nav_layout.addWidget(self.prev_card_btn)
+        nav_layout.addWidget(self.card_page_label, 1)
+        nav_layout.addWidget(self.next_card_btn)
+        
+        self.print_status_label = QLabel()
+        self.print_status_label.setAlignment(Qt.AlignCenter)
+        self.print_status_label.setStyleSheet("font-size: 24px;")
+        
         btn_layout = QHBoxLayout()
         
         self.print_btn = QPushButton("🖨️ CHOP ETISH / ПЕЧАТЬ")
@@ -213,6 +521,8 @@ class KioskWindow(QMainWindow):
         btn_layout.addWidget(self.finish_btn)
         
         layout.addWidget(self.card_display, 1)
+        layout.addLayout(nav_layout)
+        layout.addWidget(self.print_status_label)
         layout.addLayout(btn_layout)
         
         return screen
@@ -247,6 +557,10 @@ class KioskWindow(QMainWindow):
 
     def goto_camera(self):
         self.stacked_widget.setCurrentWidget(self.camera_screen)
+        # Read per guest so a settings reload between sessions applies
+        self.auto_capture_delay = get_settings().get('camera.capture_delay_ms', 1000) / 1000
+        self._auto_captured = False
+        self.camera_manager.load_capture_sound()
         if self.camera_manager.start_preview():
             if not hasattr(self, 'timer'):
                 self.timer = QTimer()
@@ -254,49 +568,81 @@ class KioskWindow(QMainWindow):
             if not self.timer.isActive():
                 self.timer.start(30)
         else:
-            print("❌ Failed to start camera preview")
+            logger.error("❌ Failed to start camera preview")
             self.show_demo_mode()
 
     def update_frame(self):
-        frame = self.camera_manager.current_frame
-        if frame is not None:
-            # Create a copy
+        camera = self.camera_manager
+        reconnecting = camera.state == camera.RECONNECTING
+        if reconnecting != self._camera_reconnecting:
+            self._set_camera_reconnecting(reconnecting)
+        frame = camera.current_frame
+        if frame is not None and not reconnecting:
             import cv2
-            frame = frame.copy()
+            from src.camera.buffers import FrameBufferPool
             
-            h, w, _ = frame.shape
-            center = (w // 2, h // 2)
-            radius = min(h, w) // 3
+            target_size = self.video_label.size()
+            if target_size.width() < 100 or target_size.height() < 100:
+                target_size = QSize(800, 600)
             
-            aligned = self.camera_manager.face_in_guide
+            # Scale into a reused buffer (keep aspect); the guide is drawn on it,
+            # so the camera's frame is never copied or modified
+            h, w, ch = frame.shape
+            scale = min(target_size.width() / w, target_size.height() / h)
+            size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            if self.preview_buffers is None:
+                self.preview_buffers = FrameBufferPool()
+            # The QImage below wraps this memory directly, without a copy
+            view = self.preview_buffers.get('preview', (size[1], size[0], ch))
+            # Bilinear, like Qt's SmoothTransformation (INTER_AREA costs ~2x here)
+            cv2.resize(frame, size, dst=view, interpolation=cv2.INTER_LINEAR)
+            if camera.cutout is not None:
+                # Guest on the card backdrop, with the latest mask from the cutout worker
+                camera.cutout.apply(view)
+            
+            vh, vw = view.shape[:2]
+            center = (vw // 2, vh // 2)
+            radius = min(vh, vw) // 3
+            
+            aligned = camera.face_in_guide
             
             # Guide color: Red for Coca-Cola theme by default, Green if aligned
             color = (0, 255, 0) if aligned else (255, 255, 255)
-            cv2.circle(frame, center, radius, color, 4)
+            thickness = max(2, round(4 * scale))
+            cv2.circle(view, center, radius, color, thickness)
             
-            # Auto-capture logic
-            if aligned:
-                self.alignment_counter += 1
-                if self.alignment_counter >= 30:
-                    self.alignment_counter = 0
+            # Auto-capture after the face has held in the guide long enough
+            # (wall-clock dwell, so it doesn't depend on camera or timer rate)
+            if aligned and not self._auto_captured:
+                remaining = self.auto_capture_delay - camera.dwell_seconds()
+                if remaining <= 0:
+                    self._auto_captured = True
                     QTimer.singleShot(0, self.take_photo)
-            else:
-                self.alignment_counter = 0
+                else:
+                    self._draw_countdown(view, center, radius, remaining, thickness)
             
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            q_img = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_img)
-            
-            target_size = self.video_label.size()
-            if target_size.width() < 100 or target_size.height() < 100:
-                target_size = QSize(800, 600)
-                
-            self.video_label.setPixmap(pixmap.scaled(
-                target_size, 
-                Qt.KeepAspectRatio, 
-                Qt.SmoothTransformation
-            ))
+            # One pixmap upload per tick; the label keeps its own reference to it
+            q_img = QImage(view.data, vw, vh, ch * vw, QImage.Format_RGB888)
+            self.video_label.setPixmap(QPixmap.fromImage(q_img))
+
+    def _draw_countdown(self, view, center, radius, remaining, thickness):
+        """Progress arc around the guide plus the seconds left"""
+        import cv2
+        
+        progress = 1.0 - remaining / self.auto_capture_delay
+        cv2.ellipse(view, center, (radius, radius), -90, 0, 360 * progress,
+                    (200, 16, 46), thickness * 2)
+        text = str(int(remaining) + 1)
+        font_scale = radius / 60
+        (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_DUPLEX, font_scale, thickness)
+        cv2.putText(view, text, (center[0] - tw // 2, center[1] - radius - th // 2),
+                    cv2.FONT_HERSHEY_DUPLEX, font_scale, (255, 255, 255), thickness, cv2.LINE_AA)
+
+    def _set_camera_reconnecting(self, reconnecting):
+        """Freeze the preview and block capture while the camera is being reopened"""
+        self._camera_reconnecting = reconnecting
+        self.camera_status_label.setVisible(reconnecting)
+        self.capture_btn.setEnabled(not reconnecting)
 
     def take_photo(self):
         if hasattr(self, 'timer') and self.timer.isActive():
@@ -309,20 +655,130 @@ class KioskWindow(QMainWindow):
 
     def select_gender(self, gender):
         if hasattr(self, 'current_photo_path') and self.current_photo_path:
-            self.process_card(self.current_photo_path, gender)
+            if self.pipeline is not None:
+                self._start_session(Session(self.current_photo_path, gender))
+            else:
+                self.process_card(self.current_photo_path, gender)
         else:
-            print("Error: No photo path found")
+            logger.error("No photo path found")
             self.reset_app()
 
+    def _start_session(self, session):
+        """Hand the capture to the render workers and free the screen for the next guest"""
+        try:
+            self.pipeline.submit(session)
+        except queue.Full:
+            # Too many cards in flight: hold this guest on the processing screen
+            self.stacked_widget.setCurrentWidget(self.processing_screen)
+            QTimer.singleShot(500, lambda: self._start_session(session))
+            return
+        logger.info(f"🎟️ Session {session.id} queued for rendering")
+        self.current_photo_path = None
+        self.reset_app()
+
+    def _render_session(self, session):
+        # Runs on a session worker thread
+        return self._render_cards(session.photo_path, session.gender,
+                                  output_filename=f"card_session{session.id}.html")
+
+    def _on_session_update(self, session):
+        self._update_pending_label()
+        if session.status in (Session.DONE, Session.PRINTED, Session.FAILED):
+            self.memory.session_finished()  # Only finish() reports these
+        if session.status == Session.FAILED:
+            # The guest may have walked away: keep "❌ #id" up, then drop it
+            QTimer.singleShot(int(self.pipeline.failure_display_seconds * 1000) + 100,
+                              self._update_pending_label)
+        if session.status == Session.READY and self.stacked_widget.currentWidget() is self.home_screen:
+            self._show_next_session()
+
+    def _show_next_session(self):
+        """Put the oldest rendered card on screen; False when none is waiting"""
+        session = self.pipeline.next_ready()
+        if session is None:
+            return False
+        self.current_session = session
+        session.set_status(Session.DISPLAYED)
+        self.show_results(session.card_paths)
+        self._update_pending_label()
+        return True
+
+    def _update_pending_label(self):
+        sessions = [s for s in self.pipeline.pending() if s is not self.current_session]
+        sessions += self.pipeline.recent_failures()
+        if not sessions:
+            self.pending_label.hide()
+            return
+        self.pending_label.setText("KARTALAR / КАРТЫ:  " + "   ".join(
+            f"{SESSION_STATUS_ICON.get(s.status, '')} #{s.id}" for s in sessions
+        ))
+        self.pending_label.show()
+
     def process_card(self, photo_path, selected_gender='male'):
         self.stacked_widget.setCurrentWidget(self.processing_screen)
         QTimer.singleShot(100, lambda: self._generate_card_async(photo_path, selected_gender))
 
     def _generate_card_async(self, photo_path, gender):
-        print(f"👤 Selected gender: {gender}")
+        try:
+            output_paths = self._render_cards(photo_path, gender)
+            self.show_results(output_paths)
+        except Exception as e:
+            logger.error(f"Error generating card: {e}")
+            self.reset_app()
+
+    def _render_cards(self, photo_path, gender, output_filename="current_card.html"):
+        """
+        Build the card(s) for one photo without touching the UI, so it can
+        also run on a session worker thread
+        Returns: list of HTML paths, one per person
+        """
+        logger.info(f"👤 Selected gender: {gender}")
             
-        # Select random base player based on SELECTED gender
-        base_player = self.player_selector.select_player(gender)
+        settings = get_settings()
+        if settings.get('ai.multi_subject', False):
+            faces = self._remote_or_local(
+                lambda client: client.detect_faces(photo_path),
+                lambda: self.gender_detector.detect_faces(photo_path)
+            )
+            if len(faces) > 1:
+                max_subjects = settings.get('ai.max_subjects', 4)
+                return self._generate_group_cards(photo_path, gender, faces[:max_subjects])
+        
+        # Select base player based on SELECTED gender
+        player_data, stats = self._build_player(gender, photo_path)
+        
+        output_path = self._remote_or_local(
+            lambda client: client.generate_card(photo_path, player_data, stats, output_filename),
+            lambda: self.card_generator.generate_card(photo_path, player_data, stats, output_filename)
+        )
+        return [output_path]
+
+    def _remote_or_local(self, remote, local):
+        """Run a job on the render service, or locally if it is off, down or busy"""
+        client = self.warmup.get('render_client')
+        if client is not None:
+            try:
+                return remote(client)
+            except Exception as e:
+                logger.warning(f"⚠️ Render service failed ({e}), rendering locally")
+        return local()
+
+    def _build_player(self, gender, photo_path=None):
+        """Pick a base player (a lookalike when enabled) and roll card stats for one guest"""
+        base_player = None
+        if photo_path and get_settings().get('ai.player_selection') == 'lookalike':
+            try:
+                lookalike = self.warmup.get('lookalike')
+            except Exception as e:
+                logger.warning(f"⚠️ Lookalike index unavailable: {e}")
+                lookalike = None
+            if lookalike is not None:
+                embedder, index = lookalike
+                base_player = self.player_selector.select_lookalike(
+                    gender, embedder.embed(photo_path), index
+                )
+        if base_player is None:
+            base_player = self.player_selector.select_player(gender)
         stats = self.player_selector.generate_stats(base_player['base_stats'])
         
         player_data = {
@@ -330,44 +786,175 @@ class KioskWindow(QMainWindow):
             'gender': gender,
             'position': base_player['position']
         }
+        return player_data, stats
+
+    def _generate_group_cards(self, photo_path, selected_gender, faces):
+        logger.info(f"👥 {len(faces)} faces detected, generating group cards")
+        subjects = []
+        for face in faces:
+            # The tapped gender only fills in faces the detector was unsure about
+            gender = face['gender'] if face['gender'] != 'unknown' else selected_gender
+            player_data, stats = self._build_player(gender)
+            subjects.append({'box': face['box'], 'player_data': player_data, 'stats': stats})
         
-        try:
-            output_path = self.card_generator.generate_card(photo_path, player_data, stats)
-            self.current_card_path = output_path
-            self.show_result(output_path)
-        except Exception as e:
-            print(f"Error generating card: {e}")
-            self.reset_app()
+        return self._remote_or_local(
+            lambda client: client.generate_cards(photo_path, subjects,
+                                                 self.card_generator.crop_subject),
+            lambda: self.card_generator.generate_cards(photo_path, subjects)
+        )
 
     def print_card(self):
         if self.current_card_path:
-            success = self.printer.print_card(self.current_card_path)
-            if success:
-                print("Card sent to printer")
+            image_path = self._render_card_image()
+            job = self.printer.print_card(image_path) if image_path else None
+            if job:
+                self.current_print_job_id = job.id
+                if self.current_session is not None:
+                    self.current_session.print_job_id = job.id
+                    self.current_session.set_status(Session.PRINTING)
+                logger.info("Card sent to printer")
             else:
-                print("Print failed")
+                self.print_status_label.setText(PRINT_STATUS_TEXT['failed'])
+                logger.error("Print failed")
+
+    def _render_card_image(self):
+        """
+        Snapshot the card as shown on screen; the printer needs a raster, not
+        HTML. These final cards are also the only files the USB export copies
+        """
+        # Reprints reuse the first snapshot, so the printer's raster cache hits
+        image_path = self.card_snapshots.get(self.current_card_path)
+        if image_path and os.path.exists(image_path):
+            return image_path
+        pixmap = self.card_display.grab()
+        if pixmap.isNull():
+            return None
+        stem = os.path.splitext(os.path.basename(self.current_card_path))[0]
+        final_dir = os.path.join('output', 'cards', 'final')
+        os.makedirs(final_dir, exist_ok=True)
+        image_path = os.path.join(final_dir, f"{stem}_{int(time.time() * 1000)}.png")
+        if not pixmap.save(image_path, "PNG"):
+            return None
+        self.card_snapshots[self.current_card_path] = image_path
+        return image_path
+
+    def _snapshot_for_export(self):
+        """Render the card on screen to output/cards/final/ so the USB export gets every card"""
+        if (self.current_card_path and self.stacked_widget.currentWidget() is self.result_screen
+                and self.warmup.is_ready('usb_exporter')
+                and self.warmup.get('usb_exporter') is not None):
+            self._render_card_image()  # Once per card; a print reuses it
+
+    def _on_print_status(self, job):
+        if job.id == self.current_print_job_id:
+            self.print_status_label.setText(PRINT_STATUS_TEXT.get(job.status, ""))
+        if self.pipeline is not None and job.status in ('done', 'failed'):
+            for session in self.pipeline.pending():
+                if session.print_job_id == job.id:
+                    status = Session.PRINTED if job.status == 'done' else Session.FAILED
+                    if session is self.current_session:
+                        session.set_status(status)  # Finished when the guest leaves
+                    else:
+                        self.pipeline.finish(session, status)
 
     def show_result(self, output_path):
+        self.show_results([output_path])
+
+    def show_results(self, output_paths):
+        self.card_paths = list(output_paths)
+        self.card_index = 0
+        self.card_snapshots = {}
+        self.current_print_job_id = None
+        self.print_status_label.clear()
+        self._show_card_page()
+        self.stacked_widget.setCurrentWidget(self.result_screen)
+
+    def page_card(self, step):
+        if self.card_paths:
+            self._snapshot_for_export()
+            self.card_index = (self.card_index + step) % len(self.card_paths)
+            self._show_card_page()
+
+    def _show_card_page(self):
+        output_path = self.card_paths[self.card_index]
+        self.current_card_path = output_path
+        
+        multiple = len(self.card_paths) > 1
+        self.prev_card_btn.setVisible(multiple)
+        self.next_card_btn.setVisible(multiple)
+        self.card_page_label.setVisible(multiple)
+        self.card_page_label.setText(f"{self.card_index + 1} / {len(self.card_paths)}")
+        
         from PySide6.QtCore import QUrl
+        self._warm_webengine()
         try:
              # Load local HTML file
              local_url = QUrl.fromLocalFile(output_path)
              if hasattr(self.card_display, 'load'):
+                 self._card_load_started = time.perf_counter()
                  self.card_display.load(local_url)
              else:
-                 print("WebEngine fallback: cannot show HTML in QLabel")
+                 logger.warning("WebEngine fallback: cannot show HTML in QLabel")
         except Exception as e:
-            print(f"Error showing result: {e}")
-            
-        self.stacked_widget.setCurrentWidget(self.result_screen)
+            logger.error(f"Error showing result: {e}")
+
+    def _on_card_loaded(self, ok):
+        if self._card_load_started is not None:
+            telemetry.observe(telemetry.WEBENGINE_LOAD, time.perf_counter() - self._card_load_started)
+            self._card_load_started = None
 
     def reset_app(self):
+        self._snapshot_for_export()
         if hasattr(self, 'timer') and self.timer.isActive():
             self.timer.stop()
         self.camera_manager.stop_camera()
+        if self.pipeline is None and self.card_paths:
+            self.memory.session_finished()  # A guest leaves with their card
         self.current_card_path = None
-        self.alignment_counter = 0
+        self.card_paths = []
+        self.card_index = 0
+        self.card_snapshots = {}
+        self._auto_captured = False
         self.stacked_widget.setCurrentWidget(self.home_screen)
+        self._apply_pending_reloads()
+        if self.pipeline is not None:
+            self._end_current_session()
+            self._show_next_session()
+        if self.warmup.is_ready('usb_exporter'):
+            exporter = self.warmup.get('usb_exporter')
+            if exporter is not None:
+                exporter.request_sync()
+        if self.memory.should_restart() and self._idle_between_sessions():
+            QTimer.singleShot(0, self._restart_for_memory)
+
+    def _idle_between_sessions(self):
+        """No guest card rendering or printing that a restart would lose"""
+        if self.pipeline is not None and self.pipeline.pending():
+            return False
+        if self.warmup.is_ready('printer') and self.printer.spooler.pending():
+            return False
+        return True
+
+    def _restart_for_memory(self):
+        if self.stacked_widget.currentWidget() is not self.home_screen:
+            return  # A guest started in the meantime; check again after their session
+        self.camera_manager.stop_camera()
+        if self.warmup.is_ready('printer'):
+            self.printer.shutdown(timeout=30)  # Partly filled sheet and queue go out first
+        if self.warmup.is_ready('ml_workers') and self.warmup.get('ml_workers') is not None:
+            self.warmup.get('ml_workers').stop()
+        self.memory.restart()
+
+    def _end_current_session(self):
+        session, self.current_session = self.current_session, None
+        if session is None:
+            return
+        if session.status == Session.PRINTING:
+            self._update_pending_label()  # Finished by _on_print_status
+        elif session.status == Session.DISPLAYED:
+            self.pipeline.finish(session)
+        else:
+            self.pipeline.finish(session, session.status)
 
     def show_demo_mode(self):
         """Show demo mode when camera is not available"""
@@ -404,7 +991,7 @@ class KioskWindow(QMainWindow):
         )
         
         if file_path:
-            print(f"📁 Selected file: {file_path}")
+            logger.info(f"📁 Selected file: {file_path}")
             # Store path and go to gender selection
             self.current_photo_path = file_path
             self.stacked_widget.setCurrentWidget(self.gender_screen)
@@ -412,18 +999,9 @@ class KioskWindow(QMainWindow):
             self.reset_app()
 
     def _save_new_player(self, name, gender):
-        """Save new player to players.json"""
+        """Save new player to the player database"""
         try:
-            import json
-            path = 'src/data/players.json'
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            key = 'male_players' if gender == 'male' else 'female_players'
-            new_id = max([p['id'] for p in data[key]]) + 1
-            
             new_player = {
-                "id": new_id,
                 "name": name,
                 "position": "ST",
                 "country": "Uzbekistan",
@@ -432,16 +1010,18 @@ class KioskWindow(QMainWindow):
                 "image": "default.png"
             }
             
-            data[key].append(new_player)
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            print(f"✅ Player {name} added to database")
+            # Single-row insert; the store allocates the id
+            gender = 'male' if gender == 'male' else 'female'
+            self.player_selector.add_player(new_player, gender)
+            logger.info(f"✅ Player {name} added to database")
         except Exception as e:
-            print(f"❌ Failed to save player: {e}")
+            logger.error(f"❌ Failed to save player: {e}")
 
 
 # Run application
 if __name__ == "__main__":
+    setup_logger()
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
 
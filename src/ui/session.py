@@ -0,0 +1,157 @@
+"""
+Guest sessions for overlapped operation
+
+A Session carries one guest from capture through generate, display and
+print. SessionPipeline renders cards on background workers from a bounded
+queue, so the kiosk can hand the screen to the next guest while earlier
+cards are still rendering or printing. A failed render is retried; a
+session that still fails is kept for a while so the kiosk can show it.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+
+from src.utils.logger import get_logger, log_event
+
+logger = get_logger("ui.session")
+
+
+class Session:
+    CAPTURED = 'captured'
+    GENERATING = 'generating'
+    READY = 'ready'
+    DISPLAYED = 'displayed'
+    PRINTING = 'printing'
+    PRINTED = 'printed'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    _ids = itertools.count(1)
+
+    def __init__(self, photo_path, gender):
+        self.id = next(self._ids)
+        self.photo_path = photo_path
+        self.gender = gender
+        self.card_paths = []
+        self.print_job_id = None
+        self.attempts = 0
+        self.status = self.CAPTURED
+        self.error = None
+        self.timestamps = {self.CAPTURED: time.time()}
+
+    def set_status(self, status, error=None):
+        self.status = status
+        self.error = error
+        self.timestamps[status] = time.time()
+
+    @property
+    def pending(self):
+        """Still needs the guest's attention or the printer"""
+        return self.status in (self.CAPTURED, self.GENERATING, self.READY, self.PRINTING)
+
+    def __repr__(self):
+        return f"Session({self.id}, {self.status})"
+
+
+class SessionPipeline:
+    def __init__(self, render, on_update, max_pending=3, workers=1, retries=1,
+                 failure_display_seconds=60):
+        """
+        render(session) -> list of card paths; runs on a worker thread
+        on_update(session) is called from worker threads on every change
+        max_pending bounds sessions captured but not yet rendered
+        retries: extra render attempts before a session fails
+        failure_display_seconds: how long recent_failures() reports a failed session
+        """
+        self.render = render
+        self.on_update = on_update
+        self.retries = retries
+        self.failure_display_seconds = failure_display_seconds
+        self.jobs = queue.Queue(maxsize=max_pending)
+        self.sessions = {}  # id -> Session, until done
+        self.ready = deque()  # Rendered, waiting for the screen
+        self.failed = deque()  # Failed sessions (render or print), newest last
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"session-render-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, session):
+        """Queue a captured session; raises queue.Full when too many are waiting"""
+        self.jobs.put_nowait(session)
+        with self._lock:
+            self.sessions[session.id] = session
+        self._notify(session)
+
+    def next_ready(self):
+        """Oldest rendered session not yet shown, or None"""
+        with self._lock:
+            return self.ready.popleft() if self.ready else None
+
+    def pending(self):
+        with self._lock:
+            return [s for s in self.sessions.values() if s.pending]
+
+    def recent_failures(self, now=None):
+        """Sessions that failed within failure_display_seconds, oldest first"""
+        cutoff = (now or time.time()) - self.failure_display_seconds
+        with self._lock:
+            while self.failed and self.failed[0].timestamps[Session.FAILED] < cutoff:
+                self.failed.popleft()
+            return list(self.failed)
+
+    def finish(self, session, status=Session.DONE):
+        session.set_status(status, session.error)
+        with self._lock:
+            self.sessions.pop(session.id, None)
+            if status == Session.FAILED:
+                self.failed.append(session)
+        log_event("session", session_id=session.id, status=status,
+                  seconds=round(time.time() - session.timestamps[Session.CAPTURED], 3),
+                  cards=len(session.card_paths))
+        self._notify(session)
+
+    def stop(self):
+        for _ in self._threads:
+            self.jobs.put(None)
+
+    def _run(self):
+        while True:
+            session = self.jobs.get()
+            if session is None:
+                break
+            session.set_status(Session.GENERATING)
+            self._notify(session)
+            if self._render(session):
+                session.set_status(Session.READY)
+                with self._lock:
+                    self.ready.append(session)
+                self._notify(session)
+                continue
+            self.finish(session, Session.FAILED)
+
+    def _render(self, session):
+        """Render with retries; False once every attempt has failed"""
+        while True:
+            session.attempts += 1
+            try:
+                session.card_paths = self.render(session)
+                return True
+            except Exception as e:
+                session.error = str(e)
+                if session.attempts > self.retries:
+                    logger.error(f"❌ Session {session.id} failed: {e}")
+                    return False
+                logger.warning(f"⚠️ Session {session.id} attempt {session.attempts} failed: {e}")
+
+    def _notify(self, session):
+        try:
+            self.on_update(session)
+        except Exception as e:
+            logger.error(f"Session listener failed: {e}")
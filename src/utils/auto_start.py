@@ -7,6 +7,10 @@ import sys
 import winreg
 from pathlib import Path
 
+from src.utils.logger import get_logger
+
+logger = get_logger("auto_start")
+
 
 def setup_auto_start():
     """Setup application to start automatically on Windows login"""
@@ -35,11 +39,11 @@ def setup_auto_start():
                 f'"{app_path}" --kiosk'
             )
 
-        print("✅ Auto-start configured")
+        logger.info("✅ Auto-start configured")
         return True
 
     except Exception as e:
-        print(f"❌ Failed to setup auto-start: {e}")
+        logger.error(f"❌ Failed to setup auto-start: {e}")
         return False
 
 
@@ -53,12 +57,12 @@ def remove_auto_start():
         with winreg.OpenKey(key, key_path, 0, winreg.KEY_ALL_ACCESS) as reg_key:
             try:
                 winreg.DeleteValue(reg_key, "FIFA_Photo_Booth")
-                print("✅ Auto-start removed")
+                logger.info("✅ Auto-start removed")
                 return True
             except FileNotFoundError:
-                print("⚠️  Auto-start entry not found")
+                logger.warning("⚠️  Auto-start entry not found")
                 return True
 
     except Exception as e:
-        print(f"❌ Failed to remove auto-start: {e}")
+        logger.error(f"❌ Failed to remove auto-start: {e}")
         return False
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Settings access for FIFA Photo Booth
+"""
+
+import json
+import threading
+from pathlib import Path
+
+from src.utils.logger import get_logger
+
+logger = get_logger("config")
+
+SETTINGS_PATH = Path("config/settings.json")
+
+
+class Settings:
+    """Read-only view of config/settings.json with dotted-key lookup"""
+
+    def __init__(self, path=SETTINGS_PATH):
+        self.path = Path(path)
+        self.data = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"⚠️ Settings file not found: {self.path}")
+            return {}
+
+    def get(self, key, default=None):
+        """get('camera.fps', 30) -> settings['camera']['fps'] or the default"""
+        value = self.data
+        for part in key.split('.'):
+            if not isinstance(value, dict) or part not in value:
+                return default
+            value = value[part]
+        return value
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_settings():
+    """Return the shared Settings instance, loading it on first use"""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = Settings()
+        return _settings
+
+
+def replace_settings(settings):
+    """Swap in a freshly loaded Settings instance (used by hot reload)"""
+    global _settings
+    with _settings_lock:
+        _settings = settings
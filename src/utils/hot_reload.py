@@ -0,0 +1,95 @@
+"""
+Hot reload of players, card template and settings for FIFA Photo Booth
+
+A polling watcher notices changed files and rebuilds the affected object
+on its own thread. The kiosk applies the rebuilt objects only between
+sessions, so warmed-up models and the open camera are never touched.
+"""
+
+import os
+import threading
+
+from src.utils.logger import get_logger, log_event
+
+logger = get_logger("hot_reload")
+
+
+class ReloadManager:
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self._targets = {}   # name -> (paths, loader, apply)
+        self._mtimes = {}    # path -> (mtime_ns, size)
+        self._pending = {}   # name -> freshly loaded object
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, name, paths, loader, apply):
+        """
+        loader() runs on the watcher thread and returns the new object;
+        apply(obj) runs from apply_pending() on the caller's thread
+        """
+        paths = [str(p) for p in paths]
+        with self._lock:
+            for path in paths:
+                self._mtimes[path] = self._stamp(path)
+            self._targets[name] = (paths, loader, apply)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll_loop, name="hot-reload", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check_now()
+
+    def check_now(self):
+        """Reload every target whose files changed since the last check"""
+        with self._lock:
+            targets = list(self._targets.items())
+        for name, (paths, loader, _) in targets:
+            stamps = [(path, self._stamp(path)) for path in paths]
+            changed = False
+            with self._lock:  # watch() may be re-stamping from a warm-up thread
+                for path, stamp in stamps:
+                    if stamp is not None and stamp != self._mtimes.get(path):
+                        self._mtimes[path] = stamp
+                        changed = True
+            if changed:
+                self._load(name, loader)
+
+    def _load(self, name, loader):
+        try:
+            obj = loader()
+        except Exception as e:
+            # Half-saved or invalid files keep the current version running
+            logger.error(f"❌ Reload of {name} failed, keeping current version: {e}")
+            return
+        with self._lock:
+            self._pending[name] = obj
+        logger.info(f"🔄 {name} changed, will apply between sessions")
+
+    def has_pending(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def apply_pending(self):
+        """Swap in everything reloaded so far; call only while no session is running"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for name, obj in pending.items():
+            self._targets[name][2](obj)
+            log_event("hot_reload", target=name)
+        return list(pending)
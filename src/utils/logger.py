@@ -1,27 +1,107 @@
 """
 Logging system for FIFA Photo Booth
+
+Every logger under FIFA_Photo_Booth feeds a single queue. One background
+listener thread owns the console and file handlers, so camera, UI and
+worker threads never block on disk I/O. Entry points (main.py, the render
+service, command-line tools) call setup_logger(); importing a module that
+calls get_logger() starts nothing. ML worker processes never open the log
+files themselves; they send their records to the parent.
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
 
+APP_LOGGER = "FIFA_Photo_Booth"
+EVENTS_LOGGER = f"{APP_LOGGER}.events"
+
+LOG_DIR = Path("output/logs")
+MAX_LOG_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+_listener = None
+_forwarding = False
+_setup_lock = threading.Lock()
+
+
+class DailyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Writes <prefix>_YYYYMMDD<suffix>, switching file at midnight and rotating by size"""
+
+    def __init__(self, log_dir, prefix, suffix=".log",
+                 max_bytes=MAX_LOG_BYTES, backup_count=BACKUP_COUNT):
+        self.log_dir = Path(log_dir)
+        self.prefix = prefix
+        self.suffix = suffix
+        self.current_date = self._today()
+        super().__init__(self._path_for(self.current_date), maxBytes=max_bytes,
+                         backupCount=backup_count, encoding="utf-8", delay=True)
+
+    @staticmethod
+    def _today():
+        return datetime.now().strftime("%Y%m%d")
+
+    def _path_for(self, date):
+        return self.log_dir / f"{self.prefix}_{date}{self.suffix}"
+
+    def shouldRollover(self, record):
+        if self._today() != self.current_date:
+            return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        today = self._today()
+        if today == self.current_date:
+            super().doRollover()
+            return
+
+        # New day: start a fresh dated file instead of renaming the old one
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self.current_date = today
+        self.baseFilename = os.path.abspath(self._path_for(today))
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line for structured events"""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event_name", record.getMessage()),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _PipeHandler(logging.handlers.QueueHandler):
+    """Sends prepared records over a one-way Pipe to the parent process"""
+
+    def __init__(self, conn):
+        super().__init__(None)
+        self.conn = conn
 
-def setup_logger(name="FIFA_Photo_Booth"):
-    """Setup application logger"""
+    def enqueue(self, record):
+        self.conn.send(record)
 
-    # Create logs directory
-    log_dir = Path("output/logs")
-    log_dir.mkdir(parents=True, exist_ok=True)
 
-    # Create logger
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+class _EventFilter(logging.Filter):
+    def filter(self, record):
+        return record.name == EVENTS_LOGGER
 
-    # Remove existing handlers
-    logger.handlers.clear()
 
+def _build_handlers(log_dir):
     # Create formatters
     detailed_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -30,9 +110,8 @@ def setup_logger(name="FIFA_Photo_Booth"):
 
     simple_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 
-    # File handler (detailed logs)
-    log_file = log_dir / f"system_{datetime.now().strftime('%Y%m%d')}.log"
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    # File handler (detailed logs, rotated daily and by size)
+    file_handler = DailyRotatingFileHandler(log_dir, "system")
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(detailed_formatter)
 
@@ -42,18 +121,95 @@ def setup_logger(name="FIFA_Photo_Booth"):
     console_handler.setFormatter(simple_formatter)
 
     # Error file handler
-    error_file = log_dir / "errors.log"
-    error_handler = logging.FileHandler(error_file, encoding='utf-8')
+    error_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "errors.log", maxBytes=MAX_LOG_BYTES, backupCount=BACKUP_COUNT,
+        encoding='utf-8', delay=True
+    )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(detailed_formatter)
 
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    logger.addHandler(error_handler)
+    # Structured events (JSONL)
+    events_handler = DailyRotatingFileHandler(log_dir, "events", suffix=".jsonl")
+    events_handler.setLevel(logging.DEBUG)
+    events_handler.setFormatter(JsonLinesFormatter())
+    events_handler.addFilter(_EventFilter())
+
+    return [file_handler, console_handler, error_handler, events_handler]
+
+
+def setup_logger(name=APP_LOGGER):
+    """Setup application logger (safe to call more than once)"""
+    global _listener
+
+    logger = logging.getLogger(APP_LOGGER)
+    with _setup_lock:
+        # Child processes wait for forward_to_parent() instead of opening the files
+        if _listener is None and not _forwarding and multiprocessing.parent_process() is None:
+            # Create logs directory
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+            log_queue = queue.SimpleQueue()
+            _listener = logging.handlers.QueueListener(
+                log_queue, *_build_handlers(LOG_DIR), respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(shutdown_logging)
+
+            logger.setLevel(logging.DEBUG)
+            logger.handlers.clear()
+            logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            logger.propagate = False
+
+    return logging.getLogger(name)
+
+
+def get_logger(name):
+    """Return a child logger, e.g. get_logger('camera') -> FIFA_Photo_Booth.camera"""
+    # No setup here: modules call this at import time
+    return logging.getLogger(f"{APP_LOGGER}.{name}")
+
+
+def log_event(event, level=logging.INFO, **fields):
+    """Write a structured event to events_YYYYMMDD.jsonl (and the system log)"""
+    message = event
+    if fields:
+        message += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+    get_logger("events").log(level, message, extra={"event_name": event, "fields": fields})
+
+
+def forward_to_parent(conn):
+    """Worker process side: send every record to the parent over conn"""
+    global _forwarding
+    shutdown_logging()
+    with _setup_lock:
+        _forwarding = True
+        logger = logging.getLogger(APP_LOGGER)
+        logger.setLevel(logging.DEBUG)
+        logger.handlers.clear()
+        logger.addHandler(_PipeHandler(conn))
+        logger.propagate = False
+
+
+def receive_from_child(conn, name="log-receiver"):
+    """Parent side: replay a child's records through our handlers until the child exits"""
+    def run():
+        while True:
+            try:
+                record = conn.recv()
+            except (EOFError, OSError):
+                break
+            logging.getLogger(record.name).handle(record)
+        conn.close()
 
-    return logger
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
 
 
-# Global logger instance
-logger = setup_logger()
\ No newline at end of file
+def shutdown_logging():
+    """Flush the queue and stop the writer thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,140 @@
+"""
+Memory instrumentation for long-running booths
+
+MemoryWatchdog logs process RSS, Python object totals and live Qt object
+counts on an interval, and (when enabled) diffs tracemalloc snapshots every
+N guest sessions so the allocation sites that keep growing show up in the
+logs. Between sessions the kiosk asks `should_restart()` and relaunches
+itself when RSS has crossed `memory.max_rss_mb`.
+
+Settings (`memory` section):
+    sample_interval_seconds   RSS / object count log interval (0 disables)
+    tracemalloc_every_sessions  snapshot diff every N sessions (0: tracemalloc off)
+    tracemalloc_top           lines of the diff to log
+    max_rss_mb                restart threshold (0: never)
+    restart_on_threshold      actually relaunch, rather than only warn
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+from collections import Counter
+
+from src.utils.config import get_settings
+from src.utils.logger import get_logger, log_event, shutdown_logging
+
+logger = get_logger("memory")
+
+
+def rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource  # Peak, not current, but better than nothing
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            return 0.0
+
+
+def qt_object_counts(top=8):
+    """Live widgets per class; call from the GUI thread"""
+    try:
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        return {}
+    app = QApplication.instance()
+    if app is None:
+        return {}
+    counts = Counter(type(widget).__name__ for widget in app.allWidgets())
+    summary = dict(counts.most_common(top))
+    summary['total'] = sum(counts.values())
+    summary['top_level'] = len(app.topLevelWidgets())
+    return summary
+
+
+class MemoryWatchdog:
+    def __init__(self, tracemalloc_every=0, tracemalloc_top=10, max_rss_mb=0,
+                 restart_on_threshold=False):
+        self.tracemalloc_every = tracemalloc_every
+        self.tracemalloc_top = tracemalloc_top
+        self.max_rss_mb = max_rss_mb
+        self.restart_on_threshold = restart_on_threshold
+        self.sessions = 0
+        self.baseline_mb = rss_mb()
+        self.peak_mb = self.baseline_mb
+        self._snapshot = None
+        if tracemalloc_every and not tracemalloc.is_tracing():
+            tracemalloc.start(1)  # One frame: cheap enough for a live booth
+
+    def sample(self):
+        """Log RSS and object counts; returns the sample"""
+        current = rss_mb()
+        self.peak_mb = max(self.peak_mb, current)
+        sample = {
+            'rss_mb': round(current, 1),
+            'growth_mb': round(current - self.baseline_mb, 1),
+            'peak_mb': round(self.peak_mb, 1),
+            'sessions': self.sessions,
+            'gc_objects': len(gc.get_objects()),
+            'qt': qt_object_counts(),
+        }
+        log_event("memory", **sample)
+        return sample
+
+    def session_finished(self):
+        """Count a finished guest; every N sessions log the tracemalloc growth"""
+        self.sessions += 1
+        if self.tracemalloc_every and self.sessions % self.tracemalloc_every == 0:
+            self._diff_snapshot()
+
+    def _diff_snapshot(self):
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        if self._snapshot is not None:
+            stats = snapshot.compare_to(self._snapshot, 'lineno')[:self.tracemalloc_top]
+            grown = [str(stat) for stat in stats if stat.size_diff > 0]
+            log_event("memory_growth", sessions=self.sessions,
+                      rss_mb=round(rss_mb(), 1), top=grown)
+            for line in grown:
+                logger.info(f"📈 {line}")
+        self._snapshot = snapshot
+
+    def should_restart(self):
+        """True when RSS is over the threshold and a relaunch is allowed"""
+        if not self.max_rss_mb:
+            return False
+        current = rss_mb()
+        if current < self.max_rss_mb:
+            return False
+        if not self.restart_on_threshold:
+            logger.warning(f"⚠️ RSS {current:.0f} MB over {self.max_rss_mb} MB "
+                           f"after {self.sessions} sessions")
+            return False
+        return True
+
+    def restart(self):
+        """Replace this process with a fresh copy of the app"""
+        log_event("memory_restart", rss_mb=round(rss_mb(), 1), sessions=self.sessions)
+        logger.warning(f"♻️ Restarting after {self.sessions} sessions at {rss_mb():.0f} MB")
+        shutdown_logging()  # execv skips atexit; flush the log queue first
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+def create_watchdog():
+    """MemoryWatchdog configured from the `memory` settings"""
+    settings = get_settings()
+    return MemoryWatchdog(
+        tracemalloc_every=settings.get('memory.tracemalloc_every_sessions', 0),
+        tracemalloc_top=settings.get('memory.tracemalloc_top', 10),
+        max_rss_mb=settings.get('memory.max_rss_mb', 0),
+        restart_on_threshold=settings.get('memory.restart_on_threshold', False)
+    )
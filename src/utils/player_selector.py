@@ -1,60 +1,296 @@
-import json
 import random
+import threading
+from collections import deque
 from datetime import datetime
 
+import numpy as np
+
+from src.data.player_store import open_player_store
+
+GENDER_KEYS = {'male': 'male_players', 'female': 'female_players'}
+
+# Stat layouts and OVR weights; row 0 of STAT_WEIGHTS is outfield, row 1 goalkeeper
+OUTFIELD_STATS = ('PAC', 'SHO', 'PAS', 'DRI', 'DEF', 'PHY')
+GOALKEEPER_STATS = ('DIV', 'HAN', 'KIC', 'REF', 'SPD', 'POS')
+STAT_WEIGHTS = np.array([
+    [0.1, 0.2, 0.15, 0.2, 0.15, 0.2],
+    [0.2, 0.2, 0.15, 0.2, 0.05, 0.2],
+])
+# The same weights as plain floats for the single-card path
+SCALAR_WEIGHTS = tuple(tuple(row) for row in STAT_WEIGHTS.tolist())
+
+# Random draws tried before falling back to a filtered scan of the pool
+MAX_DRAWS = 32
+
+
+class _AliasTable:
+    """Walker/Vose alias table: O(1) weighted draws after O(n) setup"""
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        self.size = n
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        if total <= 0:
+            return  # All-zero weights degrade to uniform sampling
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def draw(self, rng):
+        i = int(rng.random() * self.size)
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
 
 class PlayerSelector:
-    def __init__(self):
-        with open('src/data/players.json', 'r') as f:
-            self.players_data = json.load(f)
+    def __init__(self, players_data=None, weight_by=None, club_weights=None, seed=None, store=None):
+        """
+        players_data: {'male_players': [...], 'female_players': [...]}, loaded
+            from the player store (players.db) when omitted
+        weight_by: None (uniform), 'rating', 'club' or a callable(player) -> weight
+        club_weights: {'Club name': weight} used with weight_by='club'
+        store: PlayerStore that add_player persists to
+        """
+        if players_data is None:
+            store = store or open_player_store()
+            players_data = store.load_players_data()
+
+        self.store = store
+        self.players_data = players_data
+        self.weight_by = weight_by
+        self.club_weights = club_weights or {}
+        self.random = random.Random(seed)
+        self.np_random = np.random.default_rng(seed)
 
-        self.selected_history = []
+        # Recency window: deque keeps order, set gives O(1) membership
         self.max_history = 50
+        self.selected_history = deque()
+        self._recent = set()
+        # Session render workers select concurrently: guards the window, pools and RNGs
+        self._lock = threading.RLock()
 
-    def select_player(self, gender):
-        """Select random player based on gender"""
-        if gender == 'male':
-            pool = self.players_data['male_players']
-        elif gender == 'female':
-            pool = self.players_data['female_players']
-        else:
-            # If gender unknown, use both
-            pool = self.players_data['male_players'] + self.players_data['female_players']
+        self._build_index()
 
-        # Remove recently selected players
-        available = [p for p in pool if p['id'] not in self.selected_history]
+    def _build_index(self):
+        """Precompute per-gender and per-position index pools over a flat player list"""
+        self.players = []
+        self.pools = {}
+        self.id_to_index = {}
+        for gender, key in GENDER_KEYS.items():
+            for player in self.players_data.get(key, []):
+                self._index_player(player, gender)
 
-        if not available:
-            available = pool  # Reset if all have been selected
-            self.selected_history = []
+        self.weights = None
+        self.alias_tables = {}
+        if self.weight_by is not None:
+            self.weights = [self._weight(p) for p in self.players]
+            for pool_key in self.pools:
+                self._build_alias_table(pool_key)
 
-        selected = random.choice(available)
+    def _index_player(self, player, gender):
+        index = len(self.players)
+        self.players.append(player)
+        self.id_to_index[player['id']] = index
+        pool_keys = ((gender, None), (gender, player.get('position')),
+                     ('all', None), ('all', player.get('position')))
+        for pool_key in pool_keys:
+            self.pools.setdefault(pool_key, []).append(index)
+        return pool_keys
 
-        # Update history
-        self.selected_history.append(selected['id'])
-        if len(self.selected_history) > self.max_history:
-            self.selected_history.pop(0)
+    def _build_alias_table(self, pool_key):
+        self.alias_tables[pool_key] = _AliasTable([self.weights[i] for i in self.pools[pool_key]])
+
+    def add_player(self, player, gender):
+        """
+        Add a player to the pool (and the store, which assigns the id)
+        Returns: the stored player dict
+        """
+        if self.store is not None:
+            player = self.store.add_player(player, gender)
+
+        with self._lock:
+            if 'id' not in player:
+                player = dict(player, id=max((p['id'] for p in self.players), default=0) + 1)
+            self.players_data.setdefault(GENDER_KEYS[gender], []).append(player)
+            pool_keys = self._index_player(player, gender)
+            if self.weights is not None:
+                self.weights.append(self._weight(player))
+                for pool_key in pool_keys:
+                    self._build_alias_table(pool_key)
+        return player
+
+    def replace_players(self, players_data):
+        """Swap in a reloaded roster; the recency window, weighting and RNGs carry over"""
+        with self._lock:
+            self.players_data = players_data
+            self._build_index()
+
+    def _weight(self, player):
+        if callable(self.weight_by):
+            return self.weight_by(player)
+        if self.weight_by == 'rating':
+            if 'rating' in player:
+                return player['rating']
+            stats = player.get('base_stats', {})
+            return sum(stats.values()) / len(stats) if stats else 1.0
+        if self.weight_by == 'club':
+            return self.club_weights.get(player.get('club'), 1.0)
+        raise ValueError(f"Unknown weight_by: {self.weight_by}")
+
+    def _pool_key(self, gender, position):
+        gender = gender if gender in GENDER_KEYS else 'all'
+        if position is not None and (gender, position) in self.pools:
+            return (gender, position)
+        return (gender, None)
 
+    def select_player(self, gender, position=None):
+        """Select random player based on gender (and optionally position)"""
+        with self._lock:
+            return self._select_player(gender, position)
+
+    def _select_player(self, gender, position):
+        pool_key = self._pool_key(gender, position)
+        pool = self.pools.get(pool_key)
+        if not pool:
+            raise ValueError(f"No players available for gender '{gender}'")
+
+        index = None
+        # Rejection sampling stays O(1) while the recency window is small
+        # next to the pool; only tiny pools fall through to a scan
+        if len(pool) > 2 * len(self._recent):
+            for _ in range(MAX_DRAWS):
+                candidate = self._draw(pool_key, pool)
+                if self.players[candidate]['id'] not in self._recent:
+                    index = candidate
+                    break
+
+        if index is None:
+            # Remove recently selected players
+            available = [i for i in pool if self.players[i]['id'] not in self._recent]
+            if not available:
+                available = pool  # Reset if all have been selected
+                self.selected_history.clear()
+                self._recent.clear()
+            if self.weights is not None and any(self.weights[i] > 0 for i in available):
+                index = self.random.choices(available, [self.weights[i] for i in available])[0]
+            else:
+                index = self.random.choice(available)
+
+        selected = self.players[index]
+        self._remember(selected['id'])
         return selected
 
+    def select_lookalike(self, gender, embedding, index):
+        """
+        Pick the player whose face is closest to the guest's embedding,
+        skipping recently shown players; falls back to select_player
+        index: EmbeddingIndex built from the players' photos
+        """
+        if embedding is not None and index is not None:
+            search_gender = gender if gender in GENDER_KEYS else None
+            with self._lock:
+                for player_id, _ in index.search(embedding, k=5, gender=search_gender,
+                                                 exclude_ids=set(self._recent)):
+                    player_index = self.id_to_index.get(player_id)
+                    if player_index is not None:
+                        selected = self.players[player_index]
+                        self._remember(selected['id'])
+                        return selected
+        return self.select_player(gender)
+
+    def _draw(self, pool_key, pool):
+        table = self.alias_tables.get(pool_key)
+        if table is not None:
+            return pool[table.draw(self.random)]
+        return pool[int(self.random.random() * len(pool))]
+
+    def _remember(self, player_id):
+        # Update history (caller holds the lock)
+        self.selected_history.append(player_id)
+        self._recent.add(player_id)
+        if len(self.selected_history) > self.max_history:
+            self._recent.discard(self.selected_history.popleft())
+
     def generate_stats(self, base_stats):
         """Generate random stats based on base stats"""
+        # One card is the kiosk's hot path: plain Python beats NumPy's per-call overhead
+        with self._lock:  # Shares the selector's RNG with select_player
+            return self._generate_stats_scalar(base_stats, self.random.randint)
+
+    def generate_stats_batch(self, base_stats_list, seed=None, as_arrays=False):
+        """
+        Generate stats and OVR for many cards at once
+        seed: reproducible draws for this call (otherwise the selector's RNG)
+        as_arrays: return (stats, ovr, is_goalkeeper) NumPy arrays instead of
+            dicts; stats columns follow OUTFIELD_STATS / GOALKEEPER_STATS per row
+        Returns: list of {stat: value, ..., 'OVR': value} in input order
+        """
+        rng = self.np_random if seed is None else np.random.default_rng(seed)
+        count = len(base_stats_list)
+
+        is_goalkeeper = np.zeros(count, dtype=bool)
+        base = np.zeros((count, len(OUTFIELD_STATS)), dtype=np.int16)
+        irregular = []
+        for row, base_stats in enumerate(base_stats_list):
+            goalkeeper = 'DIV' in base_stats
+            schema = GOALKEEPER_STATS if goalkeeper else OUTFIELD_STATS
+            if len(base_stats) != len(schema) or any(s not in base_stats for s in schema):
+                irregular.append(row)
+                continue
+            is_goalkeeper[row] = goalkeeper
+            base[row] = [base_stats[s] for s in schema]
+
+        # Add random variation (-3 to +3)
+        stats = np.clip(base + rng.integers(-3, 4, size=base.shape, dtype=np.int16), 1, 99)
+
+        # Calculate overall rating with the weight row for each player's kind
+        weights = STAT_WEIGHTS[is_goalkeeper.astype(np.intp)]
+        overall = np.rint((stats * weights).sum(axis=1)).astype(np.int16)
+
+        if as_arrays:
+            if irregular:
+                raise ValueError("as_arrays needs every row to use a standard stat layout")
+            return stats, overall, is_goalkeeper
+
+        results = []
+        for row, base_stats in enumerate(base_stats_list):
+            schema = GOALKEEPER_STATS if is_goalkeeper[row] else OUTFIELD_STATS
+            values = dict(zip(schema, stats[row].tolist()))
+            card = {stat: values[stat] for stat in base_stats}
+            card['OVR'] = int(overall[row])
+            results.append(card)
+
+        # Non-standard layouts keep the per-stat path
+        for row in irregular:
+            results[row] = self._generate_stats_scalar(
+                base_stats_list[row], lambda low, high: int(rng.integers(low, high + 1))
+            )
+
+        return results
+
+    def _generate_stats_scalar(self, base_stats, randint):
+        """One card with Python ints; randint(low, high) includes both ends"""
         stats = {}
         for stat, value in base_stats.items():
             # Add random variation (-3 to +3)
-            variation = random.randint(-3, 3)
+            variation = randint(-3, 3)
             new_value = max(1, min(99, value + variation))
             stats[stat] = new_value
 
         # Calculate overall rating
-        if 'DIV' in stats: # Goalkeeper stats
-            weights = {'DIV': 0.2, 'HAN': 0.2, 'KIC': 0.15,
-                       'REF': 0.2, 'SPD': 0.05, 'POS': 0.2}
-        else: # Outfielder stats
-            weights = {'PAC': 0.1, 'SHO': 0.2, 'PAS': 0.15,
-                       'DRI': 0.2, 'DEF': 0.15, 'PHY': 0.2}
-
-        overall = sum(stats.get(s, 0) * weights.get(s, 0) for s in weights)
+        goalkeeper = 'DIV' in stats
+        schema = GOALKEEPER_STATS if goalkeeper else OUTFIELD_STATS
+        weights = SCALAR_WEIGHTS[1 if goalkeeper else 0]
+        overall = sum(stats.get(s, 0) * w for s, w in zip(schema, weights))
         stats['OVR'] = int(round(overall))
 
         return stats
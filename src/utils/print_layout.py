@@ -0,0 +1,151 @@
+"""
+Print sheet layouts and cached print rasters for FIFA Photo Booth
+
+A layout tiles one or more cards onto a sheet at print resolution, with
+optional crop marks for cutting card stock. Each card is resampled to its
+cell size once and kept in PrintRasterCache, so reprints and multi-up
+sheets reuse the raster instead of running LANCZOS again.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+PAPER_SIZES_MM = {'A5': (148, 210), 'A4': (210, 297)}
+PRINT_DPI = 300
+
+
+def mm_to_px(mm, dpi=PRINT_DPI):
+    return int(round(mm * dpi / 25.4))
+
+
+def paper_size_px(paper_size, dpi=PRINT_DPI):
+    width_mm, height_mm = PAPER_SIZES_MM.get(paper_size, PAPER_SIZES_MM['A5'])
+    return mm_to_px(width_mm, dpi), mm_to_px(height_mm, dpi)
+
+
+class PrintRasterCache:
+    """LRU of card images already resampled to a target size, bounded by memory"""
+
+    def __init__(self, max_mb=128):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.bytes = 0
+        self._items = OrderedDict()  # (path, size) -> (file stamp, image)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image_path, size):
+        """Card image fitted inside size (w, h); resampled again only when the file changes"""
+        stat = os.stat(image_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        # One entry per card and cell size: a rewritten file replaces its old raster
+        key = (os.path.abspath(image_path), tuple(size))
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Resample outside the lock so other cards can be served meanwhile
+        with Image.open(image_path) as source:
+            image = source.convert("RGB")
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.bytes -= _image_bytes(old[1])
+            self._items[key] = (stamp, image)
+            self.bytes += _image_bytes(image)
+            # Always keep the newest raster, even when it alone exceeds the budget
+            while self.bytes > self.max_bytes and len(self._items) > 1:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.bytes -= _image_bytes(evicted)
+        return image
+
+
+def _image_bytes(image):
+    return image.width * image.height * len(image.getbands())
+
+
+class SheetLayout:
+    def __init__(self, name, paper_size='A4', columns=1, rows=1, margin_mm=5,
+                 gutter_mm=3, cut_guides=False, dpi=PRINT_DPI):
+        self.name = name
+        self.paper_size = paper_size
+        self.columns = columns
+        self.rows = rows
+        self.margin = mm_to_px(margin_mm, dpi)
+        self.gutter = mm_to_px(gutter_mm, dpi)
+        self.cut_guides = cut_guides
+        self.sheet_size = paper_size_px(paper_size, dpi)
+
+        width, height = self.sheet_size
+        self.cell_size = (
+            (width - 2 * self.margin - (columns - 1) * self.gutter) // columns,
+            (height - 2 * self.margin - (rows - 1) * self.gutter) // rows,
+        )
+
+    @property
+    def slots(self):
+        return self.columns * self.rows
+
+    def cell_origin(self, slot):
+        row, column = divmod(slot, self.columns)
+        return (self.margin + column * (self.cell_size[0] + self.gutter),
+                self.margin + row * (self.cell_size[1] + self.gutter))
+
+    def compose(self, images):
+        """Place up to `slots` card images on a white sheet, left to right, top to bottom"""
+        if self.slots == 1 and len(images) == 1:
+            return images[0]  # Single card: the cached raster is the page
+
+        sheet = Image.new("RGB", self.sheet_size, "white")
+        placed = []
+        for slot, image in enumerate(images[:self.slots]):
+            x, y = self.cell_origin(slot)
+            # Centre the card in its cell
+            left = x + (self.cell_size[0] - image.width) // 2
+            top = y + (self.cell_size[1] - image.height) // 2
+            sheet.paste(image, (left, top))
+            placed.append((left, top, left + image.width, top + image.height))
+
+        if self.cut_guides:
+            self._draw_cut_guides(sheet, placed)
+        return sheet
+
+    def _draw_cut_guides(self, sheet, boxes):
+        """Short crop marks just outside each card corner"""
+        draw = ImageDraw.Draw(sheet)
+        length = max(self.gutter // 2, mm_to_px(2))
+        offset = max(2, self.gutter // 4)
+        for left, top, right, bottom in boxes:
+            for x, y, dx, dy in ((left, top, -1, -1), (right, top, 1, -1),
+                                 (left, bottom, -1, 1), (right, bottom, 1, 1)):
+                draw.line([(x + dx * offset, y), (x + dx * (offset + length), y)], fill="black", width=2)
+                draw.line([(x, y + dy * offset), (x, y + dy * (offset + length))], fill="black", width=2)
+
+
+LAYOUTS = {
+    'single_a5': SheetLayout('single_a5', 'A5', 1, 1, margin_mm=0, gutter_mm=0),
+    'single_a4': SheetLayout('single_a4', 'A4', 1, 1, margin_mm=0, gutter_mm=0),
+    'a5_2up': SheetLayout('a5_2up', 'A5', 2, 1),
+    'a4_2up': SheetLayout('a4_2up', 'A4', 1, 2),
+    'a4_4up': SheetLayout('a4_4up', 'A4', 2, 2),
+    'a4_4up_cut': SheetLayout('a4_4up_cut', 'A4', 2, 2, margin_mm=8, gutter_mm=6, cut_guides=True),
+    'a4_9up_cut': SheetLayout('a4_9up_cut', 'A4', 3, 3, margin_mm=8, gutter_mm=6, cut_guides=True),
+}
+
+
+def get_layout(name, paper_size='A5'):
+    """Layout by name; 'single' means one card per sheet of the configured paper"""
+    if name in (None, 'single'):
+        name = f"single_{paper_size.lower()}"
+    if name not in LAYOUTS:
+        raise ValueError(f"Unknown print layout: {name}")
+    return LAYOUTS[name]
@@ -1,94 +1,426 @@
-import win32print
-import win32ui
-from PIL import Image, ImageWin
+"""
+Card printing for FIFA Photo Booth
+
+Print jobs go onto a queue served by one spooler thread, so a slow or
+offline printer never blocks the UI. The spooler talks to a backend:
+Windows GDI, CUPS (`lp`) or a file sink that stands in for a printer in
+tests and benchmarks. Multi-up layouts collect several cards per sheet
+(see print_layout).
+"""
+
+import abc
+import itertools
 import os
+import queue
+import shutil
+import subprocess
 import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
 
+from src.utils import telemetry
+from src.utils.config import get_settings
+from src.utils.logger import get_logger, log_event
+from src.utils.print_layout import PRINT_DPI, PrintRasterCache, get_layout
+
+logger = get_logger("printer")
 
-class CardPrinter:
-    def __init__(self):
-        self.printer_name = None
-        self.paper_size = 'A5'
+
+class PrinterBackend(abc.ABC):
+    name = "base"
+
+    def get_available_printers(self):
+        return []
+
+    @abc.abstractmethod
+    def print_image(self, image, job_name, copies=1):
+        """Send a PIL image at print resolution to the printer; raise on failure"""
+
+
+class GdiPrinterBackend(PrinterBackend):
+    """Windows GDI printing through pywin32"""
+    name = "gdi"
+
+    def __init__(self, printer_name=None):
+        import win32print
+        import win32ui
+        self.win32print = win32print
+        self.win32ui = win32ui
+        self.printer_name = printer_name
 
     def get_available_printers(self):
         """Get list of available printers"""
         printers = []
-        for printer in win32print.EnumPrinters(win32print.PRINTER_ENUM_LOCAL):
+        for printer in self.win32print.EnumPrinters(self.win32print.PRINTER_ENUM_LOCAL):
             printers.append(printer[2])
         return printers
 
-    def print_card(self, image_path, copies=1):
-        """Print card to default printer"""
-        try:
-            # Get default printer
-            printer_name = win32print.GetDefaultPrinter()
-
-            # Open image
-            image = Image.open(image_path)
-
-            # Calculate print size (A5 = 148x210mm)
-            if self.paper_size == 'A5':
-                target_width = int(148 * 300 / 25.4)  # 300 DPI
-                target_height = int(210 * 300 / 25.4)
-            else:  # A4
-                target_width = int(210 * 300 / 25.4)
-                target_height = int(297 * 300 / 25.4)
-
-            # Resize image maintaining aspect ratio
-            image.thumbnail((target_width, target_height), Image.Resampling.LANCZOS)
-
-            # Create temporary file for printing
-            temp_file = tempfile.NamedTemporaryFile(suffix='.bmp', delete=False)
-            image.save(temp_file.name, 'BMP')
-            temp_file.close()
-
-            # Print using Windows GDI
-            hDC = win32ui.CreateDC()
+    def print_image(self, image, job_name, copies=1):
+        from PIL import ImageWin
+
+        printer_name = self.printer_name or self.win32print.GetDefaultPrinter()
+        dib = ImageWin.Dib(image)
+        for _ in range(copies):
+            hDC = self.win32ui.CreateDC()
             hDC.CreatePrinterDC(printer_name)
-            hDC.StartDoc("FIFA Card")
-            hDC.StartPage()
+            try:
+                hDC.StartDoc(job_name)
+                hDC.StartPage()
+                dib.draw(hDC.GetHandleOutput(), (0, 0, image.width, image.height))
+                hDC.EndPage()
+                hDC.EndDoc()
+            finally:
+                hDC.DeleteDC()
 
-            # Draw image
-            dib = ImageWin.Dib(image)
-            dib.draw(hDC.GetHandleOutput(), (0, 0, target_width, target_height))
 
-            hDC.EndPage()
-            hDC.EndDoc()
-            hDC.DeleteDC()
+class CupsPrinterBackend(PrinterBackend):
+    """Linux/macOS printing through the CUPS `lp` command"""
+    name = "cups"
 
-            # Cleanup
-            os.unlink(temp_file.name)
+    def __init__(self, printer_name=None, paper_size='A5'):
+        if shutil.which('lp') is None:
+            raise RuntimeError("CUPS 'lp' command not found")
+        self.printer_name = printer_name
+        self.paper_size = paper_size
 
-            return True
+    def get_available_printers(self):
+        try:
+            output = subprocess.run(['lpstat', '-e'], capture_output=True, text=True,
+                                    timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            return []
+        return [line.strip() for line in output.splitlines() if line.strip()]
 
-        except Exception as e:
-            print(f"Print error: {e}")
-            return False
+    def print_image(self, image, job_name, copies=1):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "card.png")
+            image.save(path, "PNG", dpi=(PRINT_DPI, PRINT_DPI))
+            command = ['lp', '-t', job_name, '-n', str(copies),
+                       '-o', f"media={self.paper_size}", '-o', 'fit-to-page']
+            if self.printer_name:
+                command += ['-d', self.printer_name]
+            result = subprocess.run(command + [path], capture_output=True, text=True, timeout=60)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip() or f"lp exited with {result.returncode}")
+
+
+class FileSinkPrinterBackend(PrinterBackend):
+    """Writes each printed page to a directory; delay/fail_every simulate a real printer"""
+    name = "file"
+
+    def __init__(self, directory='output/printed', delay=0.0, fail_every=0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.delay = delay
+        self.fail_every = fail_every
+        self.pages_printed = 0
+        self._calls = 0
+
+    def get_available_printers(self):
+        return [f"file:{self.directory}"]
+
+    def print_image(self, image, job_name, copies=1):
+        self._calls += 1
+        if self.fail_every and self._calls % self.fail_every == 0:
+            raise RuntimeError("Simulated printer failure")
+        if self.delay:
+            time.sleep(self.delay)
+        for copy in range(copies):
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            image.save(self.directory / f"{job_name}_{stamp}_{copy + 1}.png", "PNG")
+            self.pages_printed += 1
+
+
+def create_backend(name='auto', paper_size='A5', printer_name=None):
+    """'auto' picks GDI on Windows, CUPS where `lp` exists, otherwise the file sink"""
+    if name in ('auto', 'gdi'):
+        try:
+            return GdiPrinterBackend(printer_name)
+        except ImportError:
+            if name == 'gdi':
+                raise
+    if name in ('auto', 'cups'):
+        try:
+            return CupsPrinterBackend(printer_name, paper_size)
+        except RuntimeError:
+            if name == 'cups':
+                raise
+    sink_dir = get_settings().get('printing.file_sink_dir', 'output/printed')
+    logger.warning(f"⚠️ No system printer backend, printing to {sink_dir}")
+    return FileSinkPrinterBackend(sink_dir)
+
+
+class PrintJob:
+    WAITING = 'waiting'  # Multi-up sheet still collecting cards
+    QUEUED = 'queued'
+    PRINTING = 'printing'
+    RETRYING = 'retrying'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    _ids = itertools.count(1)
+
+    def __init__(self, image_paths, copies=1, layout=None):
+        """image_paths: one card path, or several for a multi-up sheet layout"""
+        if isinstance(image_paths, (str, os.PathLike)):
+            image_paths = [image_paths]
+        self.id = next(self._ids)
+        self.image_paths = [str(p) for p in image_paths]
+        self.copies = copies
+        self.layout = layout
+        self.status = self.QUEUED
+        self.attempts = 0
+        self.error = None
+        self.created = time.time()
+        self.finished = None
 
-    def save_to_usb(self, image_path, usb_drive='D:'):
-        """Save card to USB drive"""
+    def __repr__(self):
+        return f"PrintJob({self.id}, {self.status}, attempts={self.attempts})"
+
+
+class PrintSpooler:
+    def __init__(self, backend, paper_size='A5', max_retries=3, retry_delay=2.0, max_queue=20,
+                 raster_cache=None):
+        self.backend = backend
+        self.paper_size = paper_size
+        self.raster_cache = raster_cache or PrintRasterCache()
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.jobs = queue.Queue(maxsize=max_queue)
+        self.current_job = None  # Taken off the queue, not yet back from the backend
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="print-spooler", daemon=True)
+        self._thread.start()
+
+    def add_listener(self, callback):
+        """callback(job) is called from the spooler thread on every status change"""
+        self._listeners.append(callback)
+
+    def submit(self, image_paths, copies=1, layout=None):
+        """Queue a job; raises queue.Full when the printer is far behind"""
+        return self.submit_job(PrintJob(image_paths, copies, layout))
+
+    def submit_job(self, job):
+        job.status = PrintJob.QUEUED
+        self.jobs.put_nowait(job)
+        self.notify(job)
+        return job
+
+    def pending(self):
+        """Jobs not finished yet: queued ones plus the one at the printer"""
+        return self.jobs.qsize() + (self.current_job is not None)
+
+    def stop(self, timeout=None, drain=False):
+        """Stop the spooler thread within timeout in total; with drain, queued jobs print first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not drain:
+            self._stop.set()
         try:
-            if not os.path.exists(usb_drive):
-                # Try to find USB drive
-                for drive in ['E:', 'F:', 'G:', 'H:']:
-                    if os.path.exists(drive):
-                        usb_drive = drive
-                        break
-                else:
-                    return False
+            self.jobs.put(None, timeout=timeout)
+        except queue.Full:
+            self._stop.set()
+        self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def prepare_image(self, job):
+        """Sheet for a job at 300 DPI, built from cached per-card rasters"""
+        layout = job.layout or get_layout('single', self.paper_size)
+        images = [self.raster_cache.get(path, layout.cell_size) for path in job.image_paths]
+        return layout.compose(images)
+
+    def notify(self, job):
+        """Tell listeners about a job status change"""
+        for callback in self._listeners:
+            try:
+                callback(job)
+            except Exception as e:
+                logger.error(f"Print status listener failed: {e}")
+
+    def _set_status(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        if status in (PrintJob.DONE, PrintJob.FAILED):
+            job.finished = time.time()
+            log_event("print_job", job_id=job.id, status=status, attempts=job.attempts,
+                      seconds=round(job.finished - job.created, 3), error=error)
+        self.notify(job)
+
+    def _run(self):
+        while not self._stop.is_set():
+            job = self.jobs.get()
+            if job is None:
+                break
+            self.current_job = job
+            try:
+                self._process(job)
+            finally:
+                self.current_job = None
+
+    def _process(self, job):
+        while True:
+            job.attempts += 1
+            self._set_status(job, PrintJob.PRINTING)
+            try:
+                with telemetry.span(telemetry.PRINTING):
+                    image = self.prepare_image(job)
+                    self.backend.print_image(image, f"FIFA_Card_{job.id}", job.copies)
+                self._set_status(job, PrintJob.DONE)
+                logger.info(f"✅ Print job {job.id} done")
+                return
+            except Exception as e:
+                if job.attempts > self.max_retries or self._stop.is_set():
+                    self._set_status(job, PrintJob.FAILED, str(e))
+                    logger.error(f"❌ Print job {job.id} failed: {e}")
+                    return
+                self._set_status(job, PrintJob.RETRYING, str(e))
+                logger.warning(f"⚠️ Print job {job.id} attempt {job.attempts} failed: {e}")
+                # Back off a little more each time the printer refuses
+                self._stop.wait(self.retry_delay * job.attempts)
+
+
+class CardPrinter:
+    def __init__(self, backend=None):
+        settings = get_settings()
+        self.printer_name = None
+        self.paper_size = settings.get('printing.paper_size', 'A5')
+        self.layout = get_layout(settings.get('printing.layout', 'single'), self.paper_size)
+        self._sheet_job = None  # Multi-up sheet still being filled
+        self._unsent = []  # Full sheets the spooler had no room for
+        self._sheet_lock = threading.Lock()
+        self._sheet_timer = None
+        # A sheet nobody adds to for this long prints partly filled
+        self.sheet_timeout = settings.get('printing.sheet_timeout_seconds', 120)
+        self.backend = backend or create_backend(
+            settings.get('printing.backend', 'auto'), self.paper_size,
+            settings.get('printing.printer_name')
+        )
+        self.spooler = PrintSpooler(
+            self.backend,
+            paper_size=self.paper_size,
+            max_retries=settings.get('printing.max_retries', 3),
+            retry_delay=settings.get('printing.retry_delay_seconds', 2.0),
+            raster_cache=PrintRasterCache(settings.get('printing.raster_cache_mb', 128))
+        )
+        logger.info(f"🖨️ Printer backend: {self.backend.name}, layout: {self.layout.name}")
+
+    def apply_settings(self, settings):
+        """Pick up reloaded print settings; backend, paper size and cache size need a restart"""
+        layout = get_layout(settings.get('printing.layout', 'single'), self.paper_size)
+        if layout.name != self.layout.name:
+            self.flush_sheet()  # A partly filled sheet prints with the layout it started with
+            self.layout = layout
+        self.sheet_timeout = settings.get('printing.sheet_timeout_seconds', 120)
+        self.spooler.max_retries = settings.get('printing.max_retries', 3)
+        self.spooler.retry_delay = settings.get('printing.retry_delay_seconds', 2.0)
 
-            filename = os.path.basename(image_path)
-            destination = os.path.join(usb_drive, 'FIFA_Cards', filename)
+    def get_available_printers(self):
+        """Get list of available printers"""
+        return self.backend.get_available_printers()
+
+    def print_card(self, image_path, copies=1):
+        """
+        Queue a card image for printing; with a multi-up layout the card
+        joins the current sheet, which prints once every slot is filled
+        Returns: PrintJob, or None if the queue is full
+        """
+        if self.layout.slots == 1:
+            return self._submit(PrintJob(image_path, copies, self.layout))
+
+        self._resubmit_unsent()
+        with self._sheet_lock:
+            job = self._sheet_job
+            if job is None:
+                job = self._sheet_job = PrintJob([], copies, self.layout)
+            job.image_paths.append(str(image_path))
+            full = len(job.image_paths) >= self.layout.slots
+            if full:
+                self._sheet_job = None
 
-            # Create directory if doesn't exist
-            os.makedirs(os.path.dirname(destination), exist_ok=True)
+        if full and self._submit_sheet(job):
+            return job
+        job.status = PrintJob.WAITING
+        self.spooler.notify(job)
+        self._schedule_flush()
+        return job
 
-            # Copy file
-            with open(image_path, 'rb') as src, open(destination, 'wb') as dst:
-                dst.write(src.read())
+    def print_sheet(self, image_paths, layout_name, copies=1):
+        """Print specific cards (e.g. recent ones) on one sheet of the given layout"""
+        return self._submit(PrintJob(image_paths, copies, get_layout(layout_name, self.paper_size)))
 
+    def flush_sheet(self):
+        """Print a partly filled multi-up sheet now (idle timeout, shutdown, restart)"""
+        self._resubmit_unsent()
+        with self._sheet_lock:
+            job, self._sheet_job = self._sheet_job, None
+        if job is None:
+            if self._unsent:
+                self._schedule_flush()  # Queue still full: try again later
+            return None
+        logger.info(f"🖨️ Printing sheet {job.id} with {len(job.image_paths)}/{self.layout.slots} cards")
+        if self._submit_sheet(job):
+            return job
+        self._schedule_flush()
+        return None
+
+    def shutdown(self, timeout=10):
+        """Print what is waiting on the sheet and in the queue, then stop the spooler"""
+        if self._sheet_timer is not None:
+            self._sheet_timer.cancel()
+        self.flush_sheet()
+        self.spooler.stop(timeout=timeout, drain=True)
+        with self._sheet_lock:
+            lost = sum(len(job.image_paths) for job in self._unsent)
+        if lost or self.spooler.pending():
+            logger.error(f"❌ Printer stopped with {lost + self.spooler.pending()} job(s) unprinted")
+
+    def _schedule_flush(self):
+        """(Re)start the idle timer of the sheet being filled"""
+        if not self.sheet_timeout:
+            return
+        with self._sheet_lock:
+            if self._sheet_timer is not None:
+                self._sheet_timer.cancel()
+            self._sheet_timer = threading.Timer(self.sheet_timeout, self.flush_sheet)
+            self._sheet_timer.daemon = True
+            self._sheet_timer.start()
+
+    def _submit_sheet(self, job):
+        """Queue a sheet; when the queue is full it is kept and retried, never dropped"""
+        if self._submit(job) is not None:
+            return True
+        with self._sheet_lock:
+            self._unsent.append(job)
+        return False
+
+    def _resubmit_unsent(self):
+        with self._sheet_lock:
+            unsent, self._unsent = self._unsent, []
+        for job in unsent:
+            self._submit_sheet(job)
+
+    def _submit(self, job):
+        try:
+            return self.spooler.submit_job(job)
+        except queue.Full:
+            logger.error("Print error: print queue is full")
+            return None
+
+    def save_to_usb(self, image_path, usb_drive=None):
+        """Save card to USB drive (streamed copy; see usb_export for bulk sync)"""
+        from src.utils.usb_export import copy_file, resolve_target
+
+        try:
+            target = resolve_target(usb_drive or 'auto')
+            if target is None:
+                return False
+            if usb_drive:
+                target = target / 'FIFA_Cards'
+
+            copy_file(image_path, target / os.path.basename(image_path))
             return True
 
         except Exception as e:
-            print(f"USB save error: {e}")
-            return False
\ No newline at end of file
+            logger.error(f"USB save error: {e}")
+            return False
@@ -0,0 +1,126 @@
+"""
+Startup timeline and background warm-up for FIFA Photo Booth
+"""
+
+import importlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.logger import log_event
+
+
+class StartupTimeline:
+    """Collects import timings and startup milestones relative to process start"""
+
+    def __init__(self, logger_name="FIFA_Photo_Booth.startup"):
+        self.t0 = time.perf_counter()
+        self.imports = {}
+        self.marks = {}
+        self.logger = logging.getLogger(logger_name)
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.t0) * 1000
+
+    def timed_import(self, module_name):
+        """Import a module and record how long it took"""
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        duration = (time.perf_counter() - start) * 1000
+        with self._lock:
+            # Keep the first (cold) measurement only
+            self.imports.setdefault(module_name, duration)
+        self.logger.debug(f"import {module_name}: {duration:.1f} ms")
+        return module
+
+    def mark(self, name):
+        """Record a milestone, e.g. 'first_paint' or 'fully_warm'"""
+        with self._lock:
+            self.marks.setdefault(name, self.elapsed_ms())
+        self.logger.info(f"⏱️ {name} at {self.marks[name]:.0f} ms")
+
+    def report(self):
+        """Write the full timeline to the log"""
+        with self._lock:
+            imports = sorted(self.imports.items(), key=lambda kv: kv[1], reverse=True)
+            marks = sorted(self.marks.items(), key=lambda kv: kv[1])
+
+        lines = ["Startup timeline:"]
+        for name, ms in imports:
+            lines.append(f"  import {name:<28} {ms:8.1f} ms")
+        for name, ms in marks:
+            lines.append(f"  {name:<35} {ms:8.1f} ms")
+        self.logger.info("\n".join(lines))
+        log_event(
+            "startup_timeline",
+            imports_ms={name: round(ms, 1) for name, ms in imports},
+            marks_ms={name: round(ms, 1) for name, ms in marks},
+        )
+
+
+class WarmupManager:
+    """Runs warm-up tasks in parallel and hands out their results on demand"""
+
+    def __init__(self, timeline, max_workers=4):
+        self.timeline = timeline
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="warmup")
+        self.futures = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._done_callbacks = []
+
+    def submit(self, name, fn, *args, **kwargs):
+        """Schedule a warm-up task; its result is later fetched with get(name)"""
+        with self._lock:
+            self._pending += 1
+        future = self.executor.submit(self._run, name, fn, *args, **kwargs)
+        self.futures[name] = future
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _run(self, name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            self.timeline.logger.error(f"❌ Warm-up '{name}' failed: {e}")
+            raise
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.timeline.logger.debug(f"warm-up {name}: {duration:.1f} ms")
+            self.timeline.mark(f"ready:{name}")
+
+    def _task_done(self, future):
+        with self._lock:
+            self._pending -= 1
+            finished = self._pending == 0
+            callbacks = self._done_callbacks if finished else []
+            if finished:
+                self._done_callbacks = []
+        for callback in callbacks:
+            callback()
+
+    def on_all_done(self, callback):
+        """
+        Register a callback fired once nothing is pending.
+        Call after submitting every task; runs immediately if all are done.
+        """
+        with self._lock:
+            if self._pending:
+                self._done_callbacks.append(callback)
+                return
+        callback()
+
+    def get(self, name, timeout=None):
+        """Return a task result, blocking until it has finished"""
+        return self.futures[name].result(timeout=timeout)
+
+    def is_ready(self, name):
+        future = self.futures.get(name)
+        return future is not None and future.done()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,229 @@
+"""
+Per-stage latency telemetry for FIFA Photo Booth
+
+Code wraps each stage of a guest's session in `span(stage)` (or calls
+`observe(stage, seconds)` where even a context manager is too much, as in
+the preview loop). Each stage keeps a rolling window of recent samples for
+p50/p95/p99 plus lifetime count/sum. The numbers are served as Prometheus
+text on a local HTTP port and written to output/logs/telemetry.json
+periodically.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.utils.config import get_settings
+from src.utils.logger import LOG_DIR, get_logger
+
+logger = get_logger("telemetry")
+
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_NAME = 'fifa_stage_latency_seconds'
+
+# Stages instrumented across the app
+CAMERA_OPEN = 'camera_open'
+FRAME_READ = 'frame_read'
+FACE_DETECTION = 'face_detection'
+CAPTURE = 'capture'
+BACKGROUND_REMOVAL = 'background_removal'
+COMPOSITING = 'compositing'
+TEMPLATE_RENDER = 'template_render'
+WEBENGINE_LOAD = 'webengine_load'
+PRINTING = 'printing'
+CAMERA_RECOVERY = 'camera_recovery'
+LIVE_SEGMENTATION = 'live_segmentation'
+
+
+class StageHistogram:
+    """Rolling window of recent durations plus lifetime count and sum"""
+
+    def __init__(self, window=2048):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def summary(self):
+        with self._lock:
+            samples = sorted(self.samples)
+            count, total = self.count, self.total
+        quantiles = {}
+        if samples:
+            last = len(samples) - 1
+            for q in QUANTILES:
+                quantiles[q] = samples[min(last, int(round(q * last)))]
+        return {'count': count, 'sum': total, 'window': len(samples), 'quantiles': quantiles}
+
+
+class _Span:
+    __slots__ = ('telemetry', 'stage', 'start')
+
+    def __init__(self, telemetry, stage):
+        self.telemetry = telemetry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.telemetry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Telemetry:
+    def __init__(self, window=2048):
+        self.window = window
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._snapshot_stop = threading.Event()
+        self._snapshot_thread = None
+
+    def histogram(self, stage):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stages.setdefault(stage, StageHistogram(self.window))
+        return histogram
+
+    def observe(self, stage, seconds):
+        self.histogram(stage).observe(seconds)
+
+    def span(self, stage):
+        """Context manager timing the enclosed block as one sample of `stage`"""
+        return _Span(self, stage)
+
+    def _stage_items(self):
+        # observe() may add a stage from another thread while a scrape runs
+        with self._lock:
+            return sorted(self.stages.items())
+
+    def snapshot(self):
+        """{stage: {count, sum, window, p50/p95/p99 in ms}}"""
+        result = {}
+        for stage, histogram in self._stage_items():
+            summary = histogram.summary()
+            entry = {'count': summary['count'], 'sum_s': round(summary['sum'], 6),
+                     'window': summary['window']}
+            for q, value in summary['quantiles'].items():
+                entry[f"p{int(q * 100)}_ms"] = round(value * 1000, 3)
+            result[stage] = entry
+        return result
+
+    def prometheus_text(self):
+        lines = [
+            f"# HELP {METRIC_NAME} Latency of each photo booth stage (rolling window quantiles)",
+            f"# TYPE {METRIC_NAME} summary",
+        ]
+        for stage, histogram in self._stage_items():
+            summary = histogram.summary()
+            for q, value in summary['quantiles'].items():
+                lines.append(f'{METRIC_NAME}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {summary["sum"]:.6f}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {summary["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def start_server(self, host='127.0.0.1', port=9464):
+        """Serve /metrics (Prometheus text) and /metrics.json on a daemon thread"""
+        if self._server is not None:
+            return self._server
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = telemetry.prometheus_text().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body = json.dumps(telemetry.snapshot()).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would flood the system log
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="telemetry-http",
+                         daemon=True).start()
+        logger.info(f"📈 Telemetry at http://{host}:{self._server.server_port}/metrics")
+        return self._server
+
+    def start_snapshots(self, interval=60.0, path=None):
+        """Rewrite a JSON snapshot every `interval` seconds"""
+        if self._snapshot_thread is not None:
+            return
+        path = path or LOG_DIR / 'telemetry.json'
+
+        def run():
+            while not self._snapshot_stop.wait(interval):
+                self.write_snapshot(path)
+
+        self._snapshot_thread = threading.Thread(target=run, name="telemetry-snapshot", daemon=True)
+        self._snapshot_thread.start()
+
+    def write_snapshot(self, path=None):
+        path = path or LOG_DIR / 'telemetry.json'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp = f"{path}.tmp"
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump({'timestamp': time.time(), 'stages': self.snapshot()}, f, indent=2)
+            os.replace(temp, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write telemetry snapshot: {e}")
+
+    def stop(self):
+        self._snapshot_stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+_telemetry = Telemetry()
+
+
+def get_telemetry():
+    return _telemetry
+
+
+def observe(stage, seconds):
+    _telemetry.observe(stage, seconds)
+
+
+def span(stage):
+    return _telemetry.span(stage)
+
+
+def start_telemetry():
+    """Start the metrics endpoint and snapshots as configured in `telemetry` settings"""
+    settings = get_settings()
+    if not settings.get('telemetry.enabled', True):
+        return None
+    if settings.get('telemetry.http_port'):
+        try:
+            _telemetry.start_server(settings.get('telemetry.http_host', '127.0.0.1'),
+                                    settings.get('telemetry.http_port'))
+        except OSError as e:
+            logger.warning(f"⚠️ Telemetry endpoint not started: {e}")
+    _telemetry.start_snapshots(settings.get('telemetry.snapshot_interval_seconds', 60))
+    return _telemetry
@@ -0,0 +1,285 @@
+"""
+Background export of session cards to a USB stick or mounted directory
+
+The exporter keeps a manifest (relative path -> size and SHA-256) on the
+target. Files are streamed in chunks into a `.part` file and renamed only
+after the checksum matches, so a pulled drive leaves at most one partial
+file, which is resumed from where it stopped once the drive is back.
+Cards already on the target with the same checksum are skipped.
+
+Guest images only leave the machine when export is switched on. An
+auto-discovered drive is only written to when it already has the export
+folder (FIFA_Cards/ by default) on it, so a data disk or a stranger's
+stick is never filled with photos.
+
+What is exported are the PNG renders of the cards in output/cards/final/:
+one per card a guest saw, printed or not. Files land directly in the
+export folder (FIFA_Cards/<card>.png); subfolders of a source directory
+are kept below it.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import string
+import sys
+import threading
+import time
+from pathlib import Path
+
+from src.utils.config import get_settings
+from src.utils.logger import get_logger, log_event
+
+logger = get_logger("export")
+
+MANIFEST_NAME = '.fifa_export.json'
+PART_SUFFIX = '.part'
+CHUNK_SIZE = 1024 * 1024
+REMOVABLE_MOUNT_ROOTS = ('/media/', '/run/media/', '/mnt/')
+PSEUDO_FILESYSTEMS = {'proc', 'sysfs', 'tmpfs', 'devtmpfs', 'overlay', 'squashfs', 'autofs'}
+
+
+def find_mount_points():
+    """Writable removable drives/mounts, most likely first"""
+    if sys.platform == 'win32':
+        # Skip A:-C:, which are floppies and the system drive
+        drives = [f"{letter}:\\" for letter in string.ascii_uppercase[3:]]
+        return [d for d in drives if os.path.exists(d)]
+
+    if sys.platform == 'darwin':
+        volumes = Path('/Volumes')
+        candidates = [str(p) for p in volumes.iterdir()] if volumes.is_dir() else []
+    else:
+        candidates = []
+        try:
+            with open('/proc/mounts', 'r', encoding='utf-8') as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 3 or fields[2] in PSEUDO_FILESYSTEMS:
+                        continue
+                    # /proc/mounts escapes spaces as \040
+                    mount_point = fields[1].replace('\\040', ' ')
+                    if mount_point.startswith(REMOVABLE_MOUNT_ROOTS):
+                        candidates.append(mount_point)
+        except OSError:
+            pass
+    return [path for path in candidates if os.access(path, os.W_OK)]
+
+
+def resolve_target(target='auto', subdir='FIFA_Cards'):
+    """
+    Directory to export into: an explicit path if it exists (or its
+    drive/mount does), otherwise the first discovered removable mount
+    that already has a `subdir` folder, which marks it as the kiosk's drive
+    Returns: Path, or None when no such drive is plugged in
+    """
+    if target and target != 'auto':
+        path = Path(target)
+        if path.exists() or path.parent.exists():
+            return path
+        return None
+    for mount in find_mount_points():
+        path = Path(mount) / subdir
+        if path.is_dir():
+            return path
+    return None
+
+
+def file_sha256(path, chunk_size=CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_file(source, destination, chunk_size=CHUNK_SIZE, expected_sha256=None):
+    """
+    Stream source into destination via a .part file, resuming a partial
+    copy left by an earlier attempt; the rename happens only once the
+    checksum matches
+    Returns: SHA-256 of the copied file
+    """
+    source = Path(source)
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    part = destination.with_name(destination.name + PART_SUFFIX)
+
+    digest = hashlib.sha256()
+    offset = part.stat().st_size if part.exists() else 0
+    if offset > source.stat().st_size:
+        offset = 0
+
+    if offset:
+        # Re-hash what already reached the drive instead of copying it again
+        with open(part, 'rb') as f:
+            remaining = offset
+            while remaining:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+
+    with open(source, 'rb') as src, open(part, 'r+b' if offset else 'wb') as dst:
+        src.seek(offset)
+        dst.seek(offset)
+        dst.truncate()
+        for chunk in iter(lambda: src.read(chunk_size), b''):
+            dst.write(chunk)
+            digest.update(chunk)
+        dst.flush()
+        os.fsync(dst.fileno())
+
+    checksum = digest.hexdigest()
+    expected = expected_sha256 or file_sha256(source, chunk_size)
+    if checksum != expected:
+        part.unlink()
+        raise IOError(f"Checksum mismatch copying {source.name}")
+    os.replace(part, destination)
+    return checksum
+
+
+class UsbExporter:
+    """Syncs new files from the card directories to the export target on a background thread"""
+
+    def __init__(self, source_dirs, target='auto', subdir='FIFA_Cards', interval=60.0,
+                 chunk_size=CHUNK_SIZE, patterns=('*.png',)):
+        self.source_dirs = [Path(d) for d in source_dirs]
+        self.patterns = tuple(patterns)  # File names that are exported; everything else stays
+        self.target = target
+        self.subdir = subdir
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self._hashes = {}  # Source path -> (mtime_ns, size, sha256)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_result = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="usb-export", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def request_sync(self):
+        """Sync soon instead of waiting for the next interval (e.g. between sessions)"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"USB export error: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def pending_files(self):
+        """(path under the export folder, source path) of every exportable file"""
+        files = []
+        for source_dir in self.source_dirs:
+            if not source_dir.is_dir():
+                continue
+            for path in sorted(source_dir.rglob('*')):
+                if (path.is_file() and not path.name.endswith(PART_SUFFIX)
+                        and any(fnmatch.fnmatch(path.name, p) for p in self.patterns)):
+                    files.append((path.relative_to(source_dir), path))
+        return files
+
+    def sync(self):
+        """
+        Copy every file not yet on the target; stops early if the drive goes away
+        Returns: dict with copied/skipped/failed counts, or None without a target
+        """
+        target = resolve_target(self.target, self.subdir)
+        if target is None:
+            return None
+
+        manifest = self._load_manifest(target)
+        result = {'copied': 0, 'skipped': 0, 'failed': 0, 'bytes': 0}
+        start = time.perf_counter()
+
+        for relative, source in self.pending_files():
+            if self._stop.is_set():
+                break
+            key = relative.as_posix()
+            try:
+                stat = source.stat()
+                checksum = self._source_hash(source, stat)
+                destination = target / relative
+                entry = manifest.get(key)
+                if (entry and entry['sha256'] == checksum and destination.exists()
+                        and destination.stat().st_size == stat.st_size):
+                    result['skipped'] += 1
+                    continue
+
+                copy_file(source, destination, self.chunk_size, checksum)
+                manifest[key] = {'size': stat.st_size, 'sha256': checksum}
+                result['copied'] += 1
+                result['bytes'] += stat.st_size
+            except FileNotFoundError:
+                continue  # Card deleted while we were scanning
+            except OSError as e:
+                result['failed'] += 1
+                if not target.exists():
+                    # Drive pulled: the .part file is resumed next time it is mounted
+                    logger.warning(f"⚠️ Export target disappeared: {e}")
+                    break
+                logger.error(f"USB export of {key} failed: {e}")
+            if result['copied'] and result['copied'] % 100 == 0:
+                self._save_manifest(target, manifest)
+
+        self._save_manifest(target, manifest)
+        result['seconds'] = round(time.perf_counter() - start, 3)
+        self.last_result = result
+        if result['copied'] or result['failed']:
+            logger.info(f"💾 Exported {result['copied']} files to {target} "
+                        f"({result['skipped']} already there, {result['failed']} failed)")
+            log_event("usb_export", target=str(target), **result)
+        return result
+
+    def _source_hash(self, path, stat):
+        cached = self._hashes.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        checksum = file_sha256(path, self.chunk_size)
+        self._hashes[path] = (stat.st_mtime_ns, stat.st_size, checksum)
+        return checksum
+
+    def _load_manifest(self, target):
+        try:
+            with open(target / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, target, manifest):
+        try:
+            target.mkdir(parents=True, exist_ok=True)
+            temp = target / (MANIFEST_NAME + PART_SUFFIX)
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            os.replace(temp, target / MANIFEST_NAME)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write export manifest: {e}")
+
+
+def create_exporter():
+    """Exporter configured from the `export` and `paths` settings"""
+    settings = get_settings()
+    return UsbExporter(
+        settings.get('export.source_dirs', ['output/cards/final/']),
+        target=settings.get('export.target', 'auto'),
+        subdir=settings.get('export.subdir', 'FIFA_Cards'),
+        interval=settings.get('export.interval_seconds', 60),
+        chunk_size=settings.get('export.chunk_size_kb', 1024) * 1024,
+        patterns=settings.get('export.patterns', ['*.png'])
+    )
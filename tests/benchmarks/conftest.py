@@ -0,0 +1,115 @@
+"""
+Minimal benchmark harness with stored baselines
+
+`bench(fn, *args)` times fn over a number of rounds and compares the fastest
+round with tests/benchmarks/baselines.json; the test fails when it is slower
+than baseline x --bench-threshold (plus a small absolute slack so microsecond
+stages don't flap). The fastest round is far steadier than the median on a
+shared machine; the median is stored alongside for reading. Refresh
+baselines on the reference machine with:
+
+    python -m pytest tests/benchmarks --bench-save
+"""
+
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINES_PATH = BENCH_DIR / "baselines.json"
+DATA_DIR = BENCH_DIR / "data"
+SLACK_MS = 0.05
+
+
+def _load_baselines():
+    if BASELINES_PATH.exists():
+        with open(BASELINES_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'machine': None, 'benchmarks': {}}
+
+
+@pytest.fixture(scope="session")
+def bench_results(request):
+    """Timings measured in this run, written as baselines with --bench-save"""
+    results = {}
+    yield results
+    if request.config.getoption("--bench-save") and results:
+        baselines = _load_baselines()
+        baselines['machine'] = f"{platform.node()} {platform.machine()} {platform.python_version()}"
+        baselines['benchmarks'].update(results)
+        baselines['benchmarks'] = dict(sorted(baselines['benchmarks'].items()))
+        with open(BASELINES_PATH, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2)
+            f.write("\n")
+
+
+@pytest.fixture
+def bench(request, bench_results):
+    baselines = _load_baselines()['benchmarks']
+    threshold = request.config.getoption("--bench-threshold")
+    saving = request.config.getoption("--bench-save")
+    name = request.node.name
+
+    def run(fn, *args, rounds=20, warmup=2, **kwargs):
+        for _ in range(warmup):
+            fn(*args, **kwargs)
+        timings = []
+        result = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        best = min(timings)
+        median = statistics.median(timings)
+        bench_results[name] = {'min_ms': round(best, 4), 'median_ms': round(median, 4),
+                               'rounds': rounds}
+        request.node.user_properties.append(('bench_ms', (best, median)))
+
+        baseline = baselines.get(name)
+        if baseline and not saving:
+            limit = baseline['min_ms'] * threshold + SLACK_MS
+            if best > limit:
+                pytest.fail(f"{name} regressed: best {best:.3f} ms > "
+                            f"{limit:.3f} ms (baseline {baseline['min_ms']:.3f} ms x {threshold})")
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    rows = []
+    for report in terminalreporter.stats.get('passed', []) + terminalreporter.stats.get('failed', []):
+        for key, value in getattr(report, 'user_properties', []):
+            if key == 'bench_ms' and report.when == 'call':
+                rows.append((report.nodeid.split("::")[-1], *value))
+    if rows:
+        terminalreporter.write_sep("-", "benchmarks (best / median)")
+        for name, best, median in sorted(rows):
+            terminalreporter.write_line(f"{name:<40} {best:10.3f} ms {median:10.3f} ms")
+
+
+@pytest.fixture(scope="session")
+def synthetic_frame():
+    """720p BGR camera frame: noisy gradient like a dim venue"""
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(40, 200, 1280, dtype=np.float32)[None, :, None]
+    frame = np.broadcast_to(gradient, (720, 1280, 3)) + rng.normal(0, 12, (720, 1280, 3))
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+@pytest.fixture(scope="session")
+def sample_photos():
+    """Bundled sample guest photos: one face and a group of three"""
+    return {path.stem: str(path) for path in sorted(DATA_DIR.glob("*.jpg"))}
+
+
+@pytest.fixture(scope="session")
+def sample_frame(sample_photos):
+    return cv2.imread(sample_photos['guest_single'])
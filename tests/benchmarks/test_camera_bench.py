@@ -0,0 +1,41 @@
+"""
+Per-frame cost of the camera preview loop
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.camera.capture import CameraManager
+from src.camera.cutout import LiveCutout
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def camera_manager():
+    manager = CameraManager()
+    manager.warm_up()
+    manager.detection_interval = 0  # Detect on every frame: measure the full path
+    return manager
+
+
+def test_preview_frame_synthetic(bench, camera_manager, synthetic_frame):
+    bench(camera_manager._process_frame, synthetic_frame, rounds=30)
+    assert camera_manager.current_frame.shape == synthetic_frame.shape
+
+
+def test_preview_frame_with_face(bench, camera_manager, sample_frame):
+    bench(camera_manager._process_frame, sample_frame, rounds=30)
+    assert camera_manager.face_in_guide
+
+
+def test_live_cutout_composite(bench, synthetic_frame):
+    # Preview-side cost of the live cutout: upsample the cached mask and composite
+    cutout = LiveCutout(input_width=256)
+    mask = np.zeros((144, 256), dtype=np.uint8)
+    cv2.ellipse(mask, (128, 80), (50, 70), 0, 0, 360, 255, -1)
+    cutout.mask = mask
+    view = cv2.resize(cv2.cvtColor(synthetic_frame, cv2.COLOR_BGR2RGB), (800, 450))
+    bench(cutout.apply, view, rounds=30)
+    assert tuple(view[5, 5]) == tuple(cutout._backdrop[5, 5])
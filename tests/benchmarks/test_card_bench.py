@@ -0,0 +1,35 @@
+"""
+Card generation: background removal, compositing and template render
+"""
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+pytest.importorskip("rembg")
+
+from src.card.generator import CardGenerator  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def generator(tmp_path_factory):
+    generator = CardGenerator()
+    output_dir = tmp_path_factory.mktemp("cards")
+    generator.output_dir = output_dir
+    generator.temp_img_dir = output_dir / "images"
+    generator.temp_img_dir.mkdir()
+    generator.warm_up()
+    return generator
+
+
+def test_process_user_face(bench, generator, sample_photos):
+    path = bench(generator.process_user_face, sample_photos['guest_single'], rounds=5, warmup=1)
+    assert path.endswith('.png')
+
+
+def test_generate_card(bench, generator, sample_photos):
+    player = {'name': 'BENCH', 'position': 'ST'}
+    stats = {'OVR': 90, 'PAC': 91, 'SHO': 88, 'PAS': 80, 'DRI': 87, 'DEF': 40, 'PHY': 78}
+    path = bench(generator.generate_card, sample_photos['guest_single'], player, stats,
+                 rounds=5, warmup=1)
+    assert path.endswith('.html')
@@ -0,0 +1,30 @@
+"""
+Player selection and stat generation
+"""
+
+import json
+
+import pytest
+
+from src.data.player_store import JSON_PATH
+from src.utils.player_selector import PlayerSelector
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def selector():
+    with open(JSON_PATH, 'r', encoding='utf-8') as f:
+        players_data = json.load(f)
+    return PlayerSelector(players_data, seed=0)
+
+
+def test_select_player(bench, selector):
+    player = bench(lambda: [selector.select_player('male') for _ in range(1000)], rounds=20)[-1]
+    assert player['name']
+
+
+def test_generate_stats(bench, selector):
+    base = selector.select_player('female')['base_stats']
+    stats = bench(lambda: [selector.generate_stats(base) for _ in range(1000)], rounds=20)[-1]
+    assert set(base) <= set(stats)
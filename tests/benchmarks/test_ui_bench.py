@@ -0,0 +1,32 @@
+"""
+Preview rendering in the kiosk window (offscreen)
+"""
+
+import cv2
+import pytest
+
+QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+
+from PySide6.QtCore import QCoreApplication, Qt  # noqa: E402
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def window():
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    from src.ui.kiosk_window import KioskWindow
+
+    window = KioskWindow()
+    window.camera_manager.face_in_guide = False  # Don't trigger auto-capture
+    yield window
+    window.close()
+    window.warmup.shutdown()
+    app.processEvents()
+
+
+def test_update_frame(bench, window, sample_frame):
+    window.camera_manager.current_frame = cv2.cvtColor(sample_frame, cv2.COLOR_BGR2RGB)
+    bench(window.update_frame, rounds=30)
+    assert not window.video_label.pixmap().isNull()
@@ -0,0 +1,33 @@
+"""
+Shared pytest setup: run headless from the repository root
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# No display on CI or the build box
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-save", action="store_true",
+                    help="Store the measured timings as the new benchmark baselines")
+    group.addoption("--bench-threshold", type=float,
+                    default=float(os.environ.get("BENCH_THRESHOLD", 2.0)),
+                    help="Fail when the fastest round exceeds baseline x threshold (default 2.0)")
+
+
+@pytest.fixture(autouse=True, scope="session")
+def repo_cwd():
+    """The app resolves config/, src/data/ and output/ relative to the working directory"""
+    previous = os.getcwd()
+    os.chdir(ROOT)
+    yield ROOT
+    os.chdir(previous)
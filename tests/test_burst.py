@@ -0,0 +1,66 @@
+"""
+Burst capture: the best recent frame wins
+"""
+
+import cv2
+import numpy as np
+
+from src.camera.burst import BurstBuffer
+
+
+def scene(blur=0, brightness=0):
+    rng = np.random.default_rng(0)
+    frame = rng.integers(60, 200, (360, 640), dtype=np.uint8)
+    frame = cv2.resize(cv2.resize(frame, (64, 36)), (640, 360), interpolation=cv2.INTER_NEAREST)
+    if blur:
+        frame = cv2.GaussianBlur(frame, (0, 0), blur)
+    return cv2.convertScaleAbs(frame, beta=brightness)
+
+
+def add(burst, gray, faces=(), timestamp=1.0, label=None):
+    metrics = burst.measure(gray, faces)
+    burst.add(label or gray, metrics, timestamp)
+    return metrics
+
+
+def test_measure_ranks_sharpness_and_exposure():
+    burst = BurstBuffer()
+    sharp = burst.measure(scene(), ())
+    blurred = burst.measure(scene(blur=4), ())
+    dark = burst.measure(scene(brightness=-100), ())
+    assert sharp['sharpness'] > blurred['sharpness']
+    assert sharp['exposure'] > dark['exposure']
+
+
+def test_centered_face_scores_higher():
+    burst = BurstBuffer()
+    centered = burst.measure(scene(), [(220, 80, 200, 200)])
+    offside = burst.measure(scene(), [(180, 100, 100, 100)])
+    assert centered['face'] > offside['face'] > 0
+
+
+def test_best_picks_sharpest_frame():
+    burst = BurstBuffer(seconds=0.5)
+    add(burst, scene(blur=3), timestamp=1.0, label="blurred")
+    add(burst, scene(), timestamp=1.1, label="sharp")
+    add(burst, scene(blur=5), timestamp=1.2, label="very blurred")
+    frame, metrics, age = burst.best(now=1.3)
+    assert frame == "sharp"
+    assert 0 < metrics['score'] <= 1
+    assert abs(age - 0.2) < 1e-9
+
+
+def test_best_ignores_frames_older_than_the_burst():
+    burst = BurstBuffer(seconds=0.5)
+    add(burst, scene(), timestamp=1.0, label="old sharp")
+    add(burst, scene(blur=3), timestamp=2.0, label="recent")
+    assert burst.best(now=2.1)[0] == "recent"
+    assert burst.best(now=5.0) is None
+
+
+def test_buffer_is_bounded():
+    burst = BurstBuffer(max_frames=3)
+    for i in range(5):
+        add(burst, scene(), timestamp=1.0 + i * 0.01)
+    assert len(burst.frames) == 3
+    assert burst.slots == 5
@@ -0,0 +1,49 @@
+"""
+Live cutout worker: start/stop cycles leave no threads behind
+"""
+
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.camera.cutout import LiveCutout
+
+
+@pytest.fixture
+def fake_rembg(monkeypatch):
+    """rembg stand-in that returns a full mask instantly"""
+    module = types.ModuleType("rembg")
+    module.new_session = lambda model: object()
+    module.remove = lambda image, session=None, only_mask=False: Image.new("L", image.size, 255)
+    monkeypatch.setitem(sys.modules, "rembg", module)
+
+
+def cutout_threads():
+    return [t for t in threading.enumerate() if t.name == "live-cutout"]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_stop_during_idle_ends_worker(fake_rembg):
+    # max_fps=5: after each pass the worker idles ~0.2 s, where stop() lands
+    cutout = LiveCutout(max_fps=5, cpu_budget=1.0, background=None, jersey=None)
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    for cycle in range(3):
+        cutout.start()
+        cutout.submit(frame)
+        assert wait_for(lambda: cutout.passes == cycle + 1)
+        cutout.stop()
+    assert wait_for(lambda: not cutout_threads())
+    assert cutout.mask is not None and not cutout.failed
@@ -0,0 +1,60 @@
+"""
+Hot reload: changed files are loaded in the background and applied on request
+"""
+
+import os
+
+from src.utils.hot_reload import ReloadManager
+
+
+def touch(path, text):
+    path.write_text(text, encoding='utf-8')
+    # Make the change visible even on filesystems with coarse mtimes
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+
+
+def test_changed_file_is_applied_only_on_request(tmp_path):
+    path = tmp_path / "players.json"
+    path.write_text("1", encoding='utf-8')
+    applied = []
+    manager = ReloadManager()
+    manager.watch('players', [path], lambda: int(path.read_text()), applied.append)
+
+    manager.check_now()
+    assert not manager.has_pending()  # Unchanged since watch()
+
+    touch(path, "2")
+    manager.check_now()
+    assert manager.has_pending()
+    assert applied == []
+
+    assert manager.apply_pending() == ['players']
+    assert applied == [2]
+    assert not manager.has_pending()
+
+
+def test_failed_load_keeps_current_version(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text("ok", encoding='utf-8')
+    manager = ReloadManager()
+
+    def loader():
+        raise ValueError("half-saved file")
+
+    manager.watch('settings', [path], loader, lambda obj: None)
+    touch(path, "{")
+    manager.check_now()
+    assert not manager.has_pending()
+
+
+def test_missing_file_is_ignored_until_it_appears(tmp_path):
+    path = tmp_path / "template.html"
+    manager = ReloadManager()
+    manager.watch('template', [path], lambda: path.read_text(), lambda obj: None)
+    manager.check_now()
+    assert not manager.has_pending()
+
+    path.write_text("<html>", encoding='utf-8')
+    manager.check_now()
+    assert manager.has_pending()
@@ -0,0 +1,122 @@
+"""
+Player selection: weighted alias sampling and the no-repeat window
+"""
+
+import random
+import threading
+from collections import Counter
+
+import pytest
+
+from src.utils.player_selector import PlayerSelector, _AliasTable
+
+STATS = {'PAC': 80, 'SHO': 80, 'PAS': 75, 'DRI': 78, 'DEF': 40, 'PHY': 70}
+
+
+def roster(male=60, female=5):
+    return {
+        'male_players': [{'id': i, 'name': f"M{i}", 'position': 'ST' if i % 2 else 'CB',
+                          'club': 'A' if i < 10 else 'B', 'base_stats': dict(STATS)}
+                         for i in range(male)],
+        'female_players': [{'id': 1000 + i, 'name': f"F{i}", 'position': 'ST',
+                            'club': 'A', 'base_stats': dict(STATS)}
+                           for i in range(female)],
+    }
+
+
+def test_alias_table_follows_weights():
+    table = _AliasTable([1, 2, 3, 4])
+    rng = random.Random(1)
+    counts = Counter(table.draw(rng) for _ in range(40000))
+    for index, weight in enumerate([1, 2, 3, 4]):
+        assert counts[index] / 40000 == pytest.approx(weight / 10, abs=0.01)
+
+
+def test_alias_table_never_draws_zero_weight():
+    table = _AliasTable([0, 5, 0, 5])
+    rng = random.Random(2)
+    assert {table.draw(rng) for _ in range(2000)} == {1, 3}
+
+
+def test_alias_table_all_zero_is_uniform():
+    table = _AliasTable([0, 0, 0])
+    rng = random.Random(3)
+    assert {table.draw(rng) for _ in range(300)} == {0, 1, 2}
+
+
+def test_no_repeat_within_window():
+    selector = PlayerSelector(roster(), seed=4)
+    picks = [selector.select_player('male')['id'] for _ in range(selector.max_history)]
+    assert len(set(picks)) == selector.max_history
+
+
+def test_small_pool_resets_window_when_exhausted():
+    selector = PlayerSelector(roster(female=5), seed=5)
+    first = {selector.select_player('female')['id'] for _ in range(5)}
+    assert len(first) == 5
+    # Every female player is recent now; the next pick starts a new round
+    assert selector.select_player('female')['id'] in first
+
+
+def test_position_pool():
+    selector = PlayerSelector(roster(), seed=6)
+    assert all(selector.select_player('male', 'ST')['position'] == 'ST' for _ in range(20))
+
+
+def test_club_weighting_prefers_weighted_club():
+    selector = PlayerSelector(roster(), weight_by='club', club_weights={'A': 50.0, 'B': 1.0},
+                              seed=7)
+    selector.max_history = 0  # Sample freely
+    counts = Counter(selector.select_player('male')['club'] for _ in range(2000))
+    # 10 players at weight 50 against 50 at weight 1
+    assert counts['A'] / 2000 == pytest.approx(500 / 550, abs=0.03)
+
+
+def test_concurrent_selection_keeps_window_consistent():
+    selector = PlayerSelector(roster(), seed=8)
+    errors = []
+
+    def select():
+        try:
+            for _ in range(500):
+                player = selector.select_player('male')
+                selector.generate_stats(player['base_stats'])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=select) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(selector.selected_history) == selector.max_history
+    assert selector._recent == set(selector.selected_history)
+
+
+def test_generate_stats_stays_in_range():
+    selector = PlayerSelector(roster(), seed=9)
+    stats = selector.generate_stats(STATS)
+    assert set(stats) == set(STATS) | {'OVR'}
+    assert all(abs(stats[k] - v) <= 3 for k, v in STATS.items())
+
+
+def test_batch_matches_single_card_layout():
+    selector = PlayerSelector(roster(), seed=10)
+    keeper = {'DIV': 80, 'HAN': 78, 'KIC': 70, 'REF': 82, 'SPD': 50, 'POS': 79}
+    legacy = {'PAC': 80, 'SHO': 80}  # Non-standard layout takes the per-stat path
+    cards = selector.generate_stats_batch([STATS, keeper, legacy], seed=1)
+    single = [selector.generate_stats(base) for base in (STATS, keeper, legacy)]
+    for batch_card, single_card in zip(cards, single):
+        assert list(batch_card) == list(single_card)
+    assert all(abs(cards[1][k] - v) <= 3 for k, v in keeper.items())
+
+
+def test_reloaded_roster_keeps_recency_window():
+    selector = PlayerSelector(roster(female=3), seed=11)
+    shown = selector.select_player('female')['id']
+    data = roster(female=3)
+    data['female_players'][0]['name'] = "Renamed"
+    selector.replace_players(data)
+    assert selector.players[selector.id_to_index[1000]]['name'] == "Renamed"
+    assert all(selector.select_player('female')['id'] != shown for _ in range(2))
@@ -0,0 +1,89 @@
+"""
+SQLite player store: import, queries and atomic inserts
+"""
+
+import json
+import threading
+
+import pytest
+
+from src.data.player_store import PlayerStore, open_player_store
+
+
+def player(name, position='ST', club='Pakhtakor', **extra):
+    return dict(name=name, position=position, country='Uzbekistan', club=club,
+                base_stats={'PAC': 80, 'SHO': 80, 'PAS': 75, 'DRI': 78, 'DEF': 40, 'PHY': 70},
+                image='default.png', **extra)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PlayerStore(tmp_path / "players.db")
+    yield store
+    store.close()
+
+
+def test_add_player_allocates_increasing_ids(store):
+    first = store.add_player(player("A"), 'male')
+    second = store.add_player(player("B"), 'female')
+    assert second['id'] == first['id'] + 1
+    assert store.count() == 2
+    assert store.count('female') == 1
+
+
+def test_round_trip_keeps_extra_fields(store):
+    stored = store.add_player(player("A", rating=88), 'male')
+    assert store.query(gender='male') == [dict(stored)]
+
+
+def test_duplicate_id_rolls_back(store):
+    store.add_player(player("A", id=7), 'male')
+    with pytest.raises(Exception):
+        store.add_player(player("B", id=7), 'male')
+    # The failed transaction left the connection usable and the roster unchanged
+    assert store.count() == 1
+    assert store.add_player(player("C"), 'male')['id'] == 8
+
+
+def test_concurrent_inserts_get_unique_ids(store):
+    ids = []
+
+    def insert(n):
+        for i in range(20):
+            ids.append(store.add_player(player(f"{n}-{i}"), 'male')['id'])
+
+    threads = [threading.Thread(target=insert, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(ids)) == 80
+    assert store.count() == 80
+
+
+def test_query_filters(store):
+    store.add_player(player("A", position='GK'), 'male')
+    store.add_player(player("B", club='Nasaf'), 'male')
+    store.add_player(player("C"), 'female')
+    assert [p['name'] for p in store.query(position='GK')] == ["A"]
+    assert [p['name'] for p in store.query(gender='male', club='Nasaf')] == ["B"]
+    assert [p['name'] for p in store.query()] == ["A", "B", "C"]
+
+
+def test_open_seeds_from_json_once(tmp_path):
+    seed = tmp_path / "players.json"
+    seed.write_text(json.dumps({
+        'male_players': [player("A", id=1)],
+        'female_players': [player("B", id=2)],
+    }), encoding='utf-8')
+    db = tmp_path / "players.db"
+
+    store = open_player_store(db, seed)
+    store.add_player(player("C"), 'male')
+    store.close()
+
+    store = open_player_store(db, seed)  # Not re-imported over the added player
+    data = store.load_players_data()
+    store.close()
+    assert [p['name'] for p in data['male_players']] == ["A", "C"]
+    assert [p['name'] for p in data['female_players']] == ["B"]
@@ -0,0 +1,48 @@
+"""
+Print raster cache: one entry per card, bounded by memory
+"""
+
+import os
+
+from PIL import Image
+
+from src.utils.print_layout import PrintRasterCache
+
+CELL = (120, 168)  # 120 * 168 * 3 bytes, about 0.06 MB per raster
+
+
+def save_card(path, color="red"):
+    Image.new("RGB", (240, 336), color).save(path)
+    return str(path)
+
+
+def test_reprint_of_same_card_hits(tmp_path):
+    cache = PrintRasterCache()
+    card = save_card(tmp_path / "card.png")
+    first = cache.get(card, CELL)
+    assert cache.get(card, CELL) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_rewritten_card_replaces_its_entry(tmp_path):
+    cache = PrintRasterCache()
+    card = save_card(tmp_path / "card.png")
+    cache.get(card, CELL)
+    save_card(card, "blue")
+    stat = os.stat(card)
+    os.utime(card, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+
+    assert cache.get(card, CELL).getpixel((0, 0)) == (0, 0, 255)
+    assert len(cache._items) == 1
+    assert cache.bytes == CELL[0] * CELL[1] * 3
+
+
+def test_cache_is_bounded_by_bytes(tmp_path):
+    raster = CELL[0] * CELL[1] * 3
+    cache = PrintRasterCache(max_mb=2.5 * raster / (1024 * 1024))
+    cards = [save_card(tmp_path / f"card_{i}.png") for i in range(4)]
+    for card in cards:
+        cache.get(card, CELL)
+    assert len(cache._items) == 2 and cache.bytes == 2 * raster
+    cache.get(cards[-1], CELL)
+    assert cache.hits == 1  # The newest cards survived
@@ -0,0 +1,202 @@
+"""
+Print spooler driven through the file sink backend
+"""
+
+import queue
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from src.utils.config import Settings
+from src.utils.print_layout import get_layout
+from src.utils.printer import (CardPrinter, FileSinkPrinterBackend, PrinterBackend, PrintJob,
+                               PrintSpooler)
+
+
+class FlakyBackend(FileSinkPrinterBackend):
+    """File sink that refuses the first `failures` pages"""
+
+    def __init__(self, directory, failures):
+        super().__init__(directory)
+        self.failures = failures
+
+    def print_image(self, image, job_name, copies=1):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Printer offline")
+        super().print_image(image, job_name, copies)
+
+
+class GatedBackend(FileSinkPrinterBackend):
+    """File sink that holds every page until the test opens the gate"""
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def print_image(self, image, job_name, copies=1):
+        self.started.set()
+        self.gate.wait(5)
+        super().print_image(image, job_name, copies)
+
+
+@pytest.fixture
+def card(tmp_path):
+    path = tmp_path / "card.png"
+    Image.new("RGB", (60, 84), "red").save(path)
+    return str(path)
+
+
+def run_job(spooler, card):
+    """Submit one job and wait for it to finish; returns (job, statuses seen)"""
+    statuses = []
+    finished = threading.Event()
+
+    def listener(job):
+        statuses.append(job.status)
+        if job.status in (PrintJob.DONE, PrintJob.FAILED):
+            finished.set()
+
+    spooler.add_listener(listener)
+    job = spooler.submit(card)
+    assert finished.wait(10)
+    return job, statuses
+
+
+def test_backend_must_implement_print_image():
+    with pytest.raises(TypeError):
+        PrinterBackend()
+
+
+def test_job_prints_to_file_sink(tmp_path, card):
+    backend = FileSinkPrinterBackend(tmp_path / "printed")
+    spooler = PrintSpooler(backend, retry_delay=0)
+    try:
+        job, statuses = run_job(spooler, card)
+    finally:
+        spooler.stop(timeout=5)
+
+    assert statuses == [PrintJob.QUEUED, PrintJob.PRINTING, PrintJob.DONE]
+    assert job.attempts == 1 and job.finished is not None
+    assert backend.pages_printed == 1
+    assert len(list((tmp_path / "printed").glob(f"FIFA_Card_{job.id}_*.png"))) == 1
+
+
+def test_failing_backend_is_retried(tmp_path, card):
+    backend = FlakyBackend(tmp_path / "printed", failures=2)
+    spooler = PrintSpooler(backend, max_retries=3, retry_delay=0)
+    try:
+        job, statuses = run_job(spooler, card)
+    finally:
+        spooler.stop(timeout=5)
+
+    assert job.status == PrintJob.DONE
+    assert job.attempts == 3
+    assert statuses.count(PrintJob.RETRYING) == 2
+    assert backend.pages_printed == 1
+
+
+def test_job_fails_after_max_retries(tmp_path, card):
+    backend = FlakyBackend(tmp_path / "printed", failures=10)
+    spooler = PrintSpooler(backend, max_retries=1, retry_delay=0)
+    try:
+        job, statuses = run_job(spooler, card)
+    finally:
+        spooler.stop(timeout=5)
+
+    assert statuses[-1] == PrintJob.FAILED
+    assert job.attempts == 2
+    assert job.error == "Printer offline"
+    assert backend.pages_printed == 0
+
+
+def test_full_queue_raises(tmp_path, card):
+    backend = GatedBackend(tmp_path / "printed")
+    spooler = PrintSpooler(backend, max_queue=1, retry_delay=0)
+    try:
+        spooler.submit(card)
+        assert backend.started.wait(5)  # First job is at the printer, out of the queue
+        spooler.submit(card)
+        with pytest.raises(queue.Full):
+            spooler.submit(card)
+        assert spooler.pending() == 2  # One queued, one at the printer
+    finally:
+        backend.gate.set()
+        spooler.stop(timeout=5, drain=True)
+    assert backend.pages_printed == 2
+
+
+def settings_with(**sections):
+    settings = Settings.__new__(Settings)
+    settings.data = sections
+    return settings
+
+
+@pytest.fixture
+def sheet_printer(tmp_path):
+    printer = CardPrinter(backend=FileSinkPrinterBackend(tmp_path / "printed"))
+    printer.layout = get_layout('a4_4up')
+    yield printer
+    printer.shutdown(timeout=5)
+
+
+def test_partly_filled_sheet_prints_after_idle_timeout(sheet_printer, card):
+    done = threading.Event()
+    sheet_printer.spooler.add_listener(lambda job: job.status == PrintJob.DONE and done.set())
+    sheet_printer.sheet_timeout = 0.1
+    job = sheet_printer.print_card(card)
+    sheet_printer.print_card(card)
+    assert job.status == PrintJob.WAITING
+
+    assert done.wait(5)
+    assert job.status == PrintJob.DONE
+    assert job.image_paths == [card, card]
+
+
+def test_sheet_is_kept_when_queue_is_full(sheet_printer, card):
+    sheet_printer.sheet_timeout = 0
+    sheet_printer.spooler.stop(timeout=5)
+    sheet_printer.spooler.jobs = queue.Queue(maxsize=1)
+    sheet_printer.spooler.jobs.put(None)  # No room
+
+    for _ in range(4):
+        job = sheet_printer.print_card(card)
+    assert job.status == PrintJob.WAITING
+    assert sheet_printer._unsent == [job]
+
+    sheet_printer.spooler.jobs.get()
+    assert sheet_printer.flush_sheet() is None  # Nothing new; the kept sheet goes out
+    assert job.status == PrintJob.QUEUED
+    assert len(job.image_paths) == 4
+    assert sheet_printer.spooler.jobs.get_nowait() is job
+
+
+def test_reloaded_layout_flushes_the_open_sheet(sheet_printer, card):
+    sheet_printer.sheet_timeout = 0
+    job = sheet_printer.print_card(card)
+    assert job.status == PrintJob.WAITING
+
+    sheet_printer.apply_settings(settings_with(printing={'layout': 'single', 'max_retries': 5}))
+    assert sheet_printer.layout.slots == 1
+    assert sheet_printer.spooler.max_retries == 5
+    assert job.status != PrintJob.WAITING  # Went out on its 4-up layout
+    assert job.layout.slots == 4
+
+
+def test_stop_bounds_the_total_wait(tmp_path, card):
+    backend = GatedBackend(tmp_path / "printed")
+    spooler = PrintSpooler(backend, max_queue=1, retry_delay=0)
+    try:
+        spooler.submit(card)
+        assert backend.started.wait(5)
+        spooler.submit(card)  # Queue full behind a stuck printer
+
+        started = time.monotonic()
+        spooler.stop(timeout=0.3, drain=True)
+        assert time.monotonic() - started < 0.5
+        assert spooler.pending() == 2
+    finally:
+        backend.gate.set()
@@ -0,0 +1,99 @@
+"""
+Session pipeline: bounded queue, ordering, retries and failures
+"""
+
+import queue
+import threading
+
+import pytest
+
+from src.ui.session import Session, SessionPipeline
+
+
+class Recorder:
+    """on_update listener that lets a test wait for a session status"""
+
+    def __init__(self):
+        self.updates = []
+        self._changed = threading.Condition()
+
+    def __call__(self, session):
+        with self._changed:
+            self.updates.append((session.id, session.status))
+            self._changed.notify_all()
+
+    def wait_for(self, session, status, timeout=5):
+        with self._changed:
+            return self._changed.wait_for(lambda: (session.id, status) in self.updates, timeout)
+
+
+def test_queue_is_bounded():
+    gate = threading.Event()
+    recorder = Recorder()
+    pipeline = SessionPipeline(lambda session: gate.wait(5) and [], recorder, max_pending=1)
+    try:
+        first = Session("a.jpg", 'male')
+        pipeline.submit(first)
+        assert recorder.wait_for(first, Session.GENERATING)  # Taken off the queue
+        pipeline.submit(Session("b.jpg", 'male'))
+        with pytest.raises(queue.Full):
+            pipeline.submit(Session("c.jpg", 'male'))
+    finally:
+        gate.set()
+        pipeline.stop()
+
+
+def test_rendered_sessions_are_shown_in_order():
+    recorder = Recorder()
+    pipeline = SessionPipeline(lambda session: [f"{session.photo_path}.html"], recorder)
+    sessions = [Session(f"{i}.jpg", 'female') for i in range(3)]
+    for session in sessions:
+        pipeline.submit(session)
+    assert recorder.wait_for(sessions[-1], Session.READY)
+    pipeline.stop()
+
+    assert [pipeline.next_ready() for _ in range(3)] == sessions
+    assert pipeline.next_ready() is None
+    assert sessions[0].card_paths == ["0.jpg.html"]
+
+    pipeline.finish(sessions[0])
+    assert sessions[0] not in pipeline.pending()
+    assert sessions[1] in pipeline.pending()
+
+
+def test_failed_render_is_retried():
+    attempts = []
+
+    def render(session):
+        attempts.append(session.id)
+        if len(attempts) == 1:
+            raise RuntimeError("segmentation crashed")
+        return ["card.html"]
+
+    recorder = Recorder()
+    pipeline = SessionPipeline(render, recorder, retries=1)
+    session = Session("a.jpg", 'male')
+    pipeline.submit(session)
+    assert recorder.wait_for(session, Session.READY)
+    pipeline.stop()
+    assert session.attempts == 2
+    assert pipeline.recent_failures() == []
+
+
+def test_failed_session_is_reported_for_a_while():
+    def render(session):
+        raise RuntimeError("no model")
+
+    recorder = Recorder()
+    pipeline = SessionPipeline(render, recorder, retries=1, failure_display_seconds=60)
+    session = Session("a.jpg", 'male')
+    pipeline.submit(session)
+    assert recorder.wait_for(session, Session.FAILED)
+    pipeline.stop()
+
+    assert session.attempts == 2
+    assert session.error == "no model"
+    assert session not in pipeline.pending()
+    assert pipeline.recent_failures() == [session]
+    failed_at = session.timestamps[Session.FAILED]
+    assert pipeline.recent_failures(now=failed_at + 61) == []
@@ -0,0 +1,71 @@
+"""
+Face tracker: smoothing, grace period, hysteresis and dwell time
+"""
+
+from src.camera.tracking import FaceTracker
+
+SHAPE = (720, 1280, 3)
+# Guide radius is 720 // 3 = 240 px around (640, 360)
+
+
+def box(cx, cy, size=200):
+    return (cx - size // 2, cy - size // 2, size, size)
+
+
+def test_centered_face_enters_guide_and_dwells():
+    tracker = FaceTracker()
+    tracker.update([box(640, 360)], SHAPE, now=10.0)
+    assert tracker.in_guide
+    assert tracker.dwell(now=11.5) == 1.5
+
+
+def test_hysteresis_holds_face_near_the_edge():
+    tracker = FaceTracker(smoothing=1.0)
+    # 100 px from center: outside enter (80 px) while not yet in the guide
+    tracker.update([box(740, 360)], SHAPE, now=1.0)
+    assert not tracker.in_guide
+
+    tracker.update([box(640, 360)], SHAPE, now=2.0)
+    assert tracker.in_guide
+    # Same 100 px offset is inside the leave limit (108 px) once in the guide
+    tracker.update([box(740, 360)], SHAPE, now=3.0)
+    assert tracker.in_guide
+    assert tracker.aligned_since == 2.0
+
+    tracker.update([box(760, 360)], SHAPE, now=4.0)
+    assert not tracker.in_guide
+    assert tracker.dwell(now=4.0) == 0.0
+
+
+def test_short_miss_is_bridged_and_long_miss_loses_face():
+    tracker = FaceTracker(grace_seconds=0.4)
+    tracker.update([box(640, 360)], SHAPE, now=1.0)
+    tracker.update([], SHAPE, now=1.3)
+    assert tracker.in_guide and tracker.aligned_since == 1.0
+
+    tracker.update([], SHAPE, now=1.5)
+    assert tracker.face is None
+    assert not tracker.in_guide
+
+
+def test_smoothing_damps_jitter():
+    tracker = FaceTracker(smoothing=0.5)
+    tracker.update([box(640, 360)], SHAPE, now=1.0)
+    tracker.update([box(700, 360)], SHAPE, now=1.1)
+    assert tracker.face[0] == 670
+
+
+def test_follows_face_nearest_the_track():
+    tracker = FaceTracker(smoothing=1.0)
+    tracker.update([box(640, 360)], SHAPE, now=1.0)
+    # A bystander appears at the edge; the tracked guest stays put
+    tracker.update([box(1100, 300, 260), box(650, 360)], SHAPE, now=1.1)
+    assert tracker.face[:2] == (650, 360)
+    assert tracker.in_guide
+
+
+def test_reset_forgets_guest():
+    tracker = FaceTracker()
+    tracker.update([box(640, 360)], SHAPE, now=1.0)
+    tracker.reset()
+    assert tracker.face is None and tracker.dwell() == 0.0
@@ -0,0 +1,82 @@
+"""
+USB export: resumable copies, skip-if-identical and opt-in targets
+"""
+
+import pytest
+
+from src.utils import usb_export
+from src.utils.usb_export import PART_SUFFIX, UsbExporter, copy_file, file_sha256
+
+
+@pytest.fixture
+def cards(tmp_path):
+    source = tmp_path / "final"
+    source.mkdir()
+    (source / "card_1.png").write_bytes(b"\x89PNG" + bytes(range(256)) * 40)
+    (source / "card_2.png").write_bytes(b"\x89PNG" + b"2" * 5000)
+    (source / "current_card.html").write_text("<html>", encoding='utf-8')
+    (tmp_path / "stick").mkdir()
+    return source
+
+
+def test_copy_resumes_partial_file(tmp_path, cards):
+    source = cards / "card_1.png"
+    destination = tmp_path / "stick" / "card_1.png"
+    data = source.read_bytes()
+    part = destination.with_name(destination.name + PART_SUFFIX)
+    part.write_bytes(data[:3000])  # Drive pulled mid-copy
+
+    checksum = copy_file(source, destination, chunk_size=1024)
+    assert destination.read_bytes() == data
+    assert checksum == file_sha256(source)
+    assert not part.exists()
+
+
+def test_corrupt_partial_file_is_not_renamed(tmp_path, cards):
+    source = cards / "card_1.png"
+    destination = tmp_path / "stick" / "card_1.png"
+    destination.with_name(destination.name + PART_SUFFIX).write_bytes(b"garbage")
+
+    with pytest.raises(IOError):
+        copy_file(source, destination)
+    assert not destination.exists()
+    # The bad partial copy is gone, so the next attempt starts clean
+    copy_file(source, destination)
+    assert destination.read_bytes() == source.read_bytes()
+
+
+def test_sync_copies_cards_once(tmp_path, cards):
+    target = tmp_path / "stick" / "FIFA_Cards"
+    exporter = UsbExporter([cards], target=str(target))
+
+    first = exporter.sync()
+    assert (first['copied'], first['skipped'], first['failed']) == (2, 0, 0)
+    # Flat layout: cards sit directly in the export folder, next to the manifest
+    exported = sorted(p.name for p in target.iterdir() if p.suffix == ".png")
+    assert exported == ["card_1.png", "card_2.png"]
+
+    second = exporter.sync()
+    assert (second['copied'], second['skipped']) == (0, 2)
+
+    (cards / "card_2.png").write_bytes(b"\x89PNG" + b"3" * 6000)
+    third = exporter.sync()
+    assert (third['copied'], third['skipped']) == (1, 1)
+    assert (target / "card_2.png").read_bytes() == (cards / "card_2.png").read_bytes()
+
+
+def test_sync_recopies_missing_destination(tmp_path, cards):
+    target = tmp_path / "stick" / "FIFA_Cards"
+    exporter = UsbExporter([cards], target=str(target))
+    exporter.sync()
+    (target / "card_1.png").unlink()
+    assert exporter.sync()['copied'] == 1
+
+
+def test_auto_target_needs_marker_folder(tmp_path, monkeypatch):
+    mount = tmp_path / "stick"
+    mount.mkdir()
+    monkeypatch.setattr(usb_export, 'find_mount_points', lambda: [str(mount)])
+    assert usb_export.resolve_target('auto') is None
+
+    (mount / "FIFA_Cards").mkdir()
+    assert usb_export.resolve_target('auto') == mount / "FIFA_Cards"
@@ -0,0 +1,18 @@
+"""
+ML worker pool: health pings are not counted as tasks
+"""
+
+import time
+
+from src.ai.workers import MLWorkerPool
+
+
+def test_health_pings_are_not_tasks():
+    pool = MLWorkerPool(processes=1, warm=False, health_interval=0.05).start()
+    try:
+        worker = next(iter(pool.workers.values()))
+        time.sleep(0.5)  # Several health rounds
+        assert worker.ready and worker.tasks == 0
+        assert pool.restarts == 0
+    finally:
+        pool.stop()